@@ -32,20 +32,32 @@ class Settings:
     # Stock data cache TTL in seconds (default: 30 minutes)
     STOCK_CACHE_TTL: int = int(os.getenv("STOCK_CACHE_TTL", "1800"))
 
+    # On-disk cache for downloaded EDINET documents (filings are immutable
+    # once published).  Empty = disabled.
+    DOWNLOAD_CACHE_DIR: str = os.getenv("DOWNLOAD_CACHE_DIR", "")
+
+    # Max XBRL downloads in flight while enriching newly polled filings
+    XBRL_CONCURRENCY: int = max(1, int(os.getenv("XBRL_CONCURRENCY", "4")))
+    # Minimum seconds between the starts of any two XBRL downloads from
+    # EDINET (the API v2 spec asks for several seconds between downloads)
+    XBRL_MIN_INTERVAL: float = max(0.0, float(os.getenv("XBRL_MIN_INTERVAL", "3.0")))
+
     # Large shareholding report docTypeCodes
-    LARGE_HOLDING_DOC_TYPES: list[str] = ["350", "360"]
+    LARGE_HOLDING_DOC_TYPES: frozenset[str] = frozenset({"350", "360"})
 
     # Company fundamental data source docTypeCodes
     # 120: 有価証券報告書 (Annual Securities Report) — shares outstanding, net assets
     # 130: 訂正有価証券報告書 (Amended Annual Report)
     # 140: 四半期報告書 (Quarterly Report)
-    COMPANY_INFO_DOC_TYPES: list[str] = ["120", "130", "140"]
+    COMPANY_INFO_DOC_TYPES: frozenset[str] = frozenset({"120", "130", "140"})
 
     # Tender offer (公開買付/TOB) related docTypeCodes
     # 240: 公開買付届出書  250: 訂正公開買付届出書
     # 260: 公開買付撤回届出書  270: 公開買付報告書
     # 280: 訂正公開買付報告書  290: 意見表明報告書  300: 訂正意見表明報告書
-    TOB_DOC_TYPES: list[str] = ["240", "250", "260", "270", "280", "290", "300"]
+    TOB_DOC_TYPES: frozenset[str] = frozenset(
+        {"240", "250", "260", "270", "280", "290", "300"}
+    )
 
 
 settings = Settings()
@@ -1,9 +1,11 @@
 import asyncio
+import contextlib
 import logging
 import os
+import sqlite3
 
 from sqlalchemy import event, text
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
@@ -45,6 +47,86 @@ class Base(DeclarativeBase):
     pass
 
 
+def _sqlite_has_fts5_trigram() -> bool:
+    """Whether the linked SQLite has FTS5 and its trigram tokenizer (3.34+).
+
+    aiosqlite drives the stdlib sqlite3 module, so probing an in-memory
+    database here answers for the app's connections too.
+    """
+    try:
+        with contextlib.closing(sqlite3.connect(":memory:")) as probe:
+            probe.execute("CREATE VIRTUAL TABLE t USING fts5(x, tokenize='trigram')")
+    except sqlite3.Error:
+        return False
+    return True
+
+
+SQLITE_FTS5_TRIGRAM = _sqlite_has_fts5_trigram()
+
+# Cleared by init_db when filings_fts could not be set up; list_filings
+# then searches with LIKE instead of MATCH
+_filings_fts_ready = SQLITE_FTS5_TRIGRAM
+
+
+def filings_fts_ready() -> bool:
+    """Whether the filings_fts index is available to query."""
+    return _filings_fts_ready
+
+
+async def _ensure_filings_fts(conn: AsyncConnection) -> None:
+    """Create the filings full-text index on databases that predate it.
+
+    New databases get it from the Filing table's after_create DDL; an
+    existing `filings` table is not re-created, so add the index here and
+    backfill it from the rows already present.
+    """
+    from app.models import FILINGS_FTS_DDL
+
+    exists = (await conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE name = 'filings_fts'"
+    ))).first()
+    for stmt in FILINGS_FTS_DDL:
+        await conn.execute(text(stmt))
+    if not exists:
+        await conn.execute(text("INSERT INTO filings_fts(filings_fts) VALUES ('rebuild')"))
+        logger.info("Built filings full-text index")
+
+
+async def _setup_filings_fts() -> None:
+    """Add the filings full-text index, degrading to LIKE search on failure.
+
+    Runs apart from init_db's corruption recovery: an SQLite build without
+    FTS5/trigram, or a lock while backfilling a large table, is no reason
+    to delete the database.
+    """
+    global _filings_fts_ready
+
+    if not SQLITE_FTS5_TRIGRAM:
+        logger.warning("SQLite lacks FTS5 trigram support (needs 3.34+); filing search uses LIKE")
+        _filings_fts_ready = False
+        return
+    try:
+        async with engine.begin() as conn:
+            await _ensure_filings_fts(conn)
+    except Exception as exc:
+        logger.warning("Could not set up filings full-text index (%s); filing search uses LIKE", exc)
+        _filings_fts_ready = False
+    else:
+        _filings_fts_ready = True
+
+
+async def _drop_superseded_indexes(conn: AsyncConnection) -> None:
+    """Drop indexes that a newer definition in the models has replaced.
+
+    create_all only adds missing indexes, so without this an existing
+    database would keep maintaining the old one on every write.
+    """
+    from app.models import SUPERSEDED_INDEXES
+
+    for name in SUPERSEDED_INDEXES:
+        await conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
 async def init_db():
     """Initialize the database, with corruption recovery for SQLite on /tmp.
 
@@ -55,6 +137,7 @@ async def init_db():
     try:
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await _drop_superseded_indexes(conn)
         # Quick integrity check for SQLite (bounded to 10s to avoid hangs)
         if "sqlite" in settings.DATABASE_URL:
             try:
@@ -88,3 +171,6 @@ async def init_db():
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
         logger.info("Database recreated after corruption recovery")
+
+    if "sqlite" in settings.DATABASE_URL:
+        await _setup_filings_fts()
@@ -1,9 +1,12 @@
 """Shared dependencies and utilities used across routers."""
 
 import re
+from datetime import date, timedelta
 
 from fastapi import HTTPException
 
+from app.models import Filing
+
 
 def get_async_session():
     """Resolve async_session at runtime via app.main for testability."""
@@ -11,6 +14,18 @@ def get_async_session():
     return app.main.async_session
 
 
+def submitted_on(day: date):
+    """WHERE clause for filings submitted on ``day``.
+
+    A half-open range on the "YYYY-MM-DD HH:MM" string column, which can
+    use the submit_date_time index, unlike a LIKE 'YYYY-MM-DD%' prefix.
+    """
+    return (
+        (Filing.submit_date_time >= day.isoformat())
+        & (Filing.submit_date_time < (day + timedelta(days=1)).isoformat())
+    )
+
+
 def normalize_sec_code(raw: str | None) -> str | None:
     """Normalize a securities code to its 4-digit form.
 
@@ -59,6 +74,24 @@ def validate_edinet_code(edinet_code: str) -> str:
     return code
 
 
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def parse_date_param(value: str) -> date | None:
+    """Parse a YYYY-MM-DD query parameter, or return None if malformed.
+
+    The precompiled shape check rejects garbage before any date object is
+    built, and also refuses the other ISO 8601 spellings (20240101,
+    2024-W01-1) that date.fromisoformat accepts since Python 3.11.
+    """
+    if not _DATE_RE.match(value):
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
 _DOC_ID_RE = re.compile(r"^S[A-Za-z0-9]{7,12}$")
 
 
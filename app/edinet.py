@@ -18,14 +18,27 @@ is_previous 判定 (全抽出パスで共通):
   - "Previous" in contextRef
 """
 
+import asyncio
+import contextlib
+import functools
 import io
 import json
 import logging
+import mmap
+import os
 import re
+import tempfile
+import threading
 import zipfile
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import dataclass
 from datetime import date
+from pathlib import Path
+from types import MappingProxyType
+from typing import IO, Any
 
 import httpx
+import orjson
 from lxml import etree
 
 from app.config import settings
@@ -41,20 +54,85 @@ XBRL_NS = {
 # Inline XBRL namespace
 IX_NS = "http://www.xbrl.org/2013/inlineXBRL"
 
+# libxml2 options shared by the DOM parser and every iterparse() call:
+# - resolve_entities/load_dtd/no_network: no entity expansion, no DTD
+#   fetch (XXE / billion-laughs hardening for untrusted filings)
+# - recover=True: salvage slightly malformed filings instead of failing
+# - huge_tree=True: large text blocks in 有報 instances exceed libxml2 limits
+_XML_PARSE_OPTIONS = {
+    "resolve_entities": False,
+    "load_dtd": False,
+    "no_network": True,
+    "recover": True,
+    "huge_tree": True,
+}
+
+# lxml parsers must not be shared between concurrently running threads,
+# so each thread lazily gets its own tuned instance.
+_parser_local = threading.local()
+
+
+def _get_xbrl_parser() -> etree.XMLParser:
+    """Return this thread's XML parser tuned for EDINET documents.
+
+    _XML_PARSE_OPTIONS plus collect_ids=False (XBRL never needs the
+    xml:id index) and remove_blank_text=True (no whitespace-only nodes).
+    """
+    parser = getattr(_parser_local, "parser", None)
+    if parser is None:
+        parser = etree.XMLParser(
+            collect_ids=False,
+            remove_blank_text=True,
+            **_XML_PARSE_OPTIONS,
+        )
+        _parser_local.parser = parser
+    return parser
+
+
+def _parse_xml(content: bytes):
+    """Parse XML bytes with the shared XBRL parser.
+
+    In recover mode lxml returns None for input it cannot salvage at all;
+    that case is raised as XMLSyntaxError so callers keep a single
+    failure path.
+    """
+    root = etree.fromstring(content, parser=_get_xbrl_parser())
+    if root is None:
+        raise etree.XMLSyntaxError("Document is not recoverable", None, 0, 0)
+    return root
+
+
+# Empty result templates: read-only, copied with dict() per parse
+_EMPTY_HOLDING = MappingProxyType({
+    "holding_ratio": None,
+    "previous_holding_ratio": None,
+    "holder_name": None,
+    "target_company_name": None,
+    "target_sec_code": None,
+    "shares_held": None,
+    "purpose_of_holding": None,
+    "joint_holders": None,       # JSON string: [{"name": ..., "ratio": ...}, ...]
+    "fund_source": None,         # 取得資金の内訳 (e.g. "自己資金", "借入金")
+})
+
+_EMPTY_COMPANY_INFO = MappingProxyType({
+    "shares_outstanding": None,
+    "net_assets": None,
+    "company_name": None,
+})
 
-def _empty_holding_result() -> dict:
-    """Return a fresh empty holding data dict."""
-    return {
-        "holding_ratio": None,
-        "previous_holding_ratio": None,
-        "holder_name": None,
-        "target_company_name": None,
-        "target_sec_code": None,
-        "shares_held": None,
-        "purpose_of_holding": None,
-        "joint_holders": None,       # JSON string: [{"name": ..., "ratio": ...}, ...]
-        "fund_source": None,         # 取得資金の内訳 (e.g. "自己資金", "借入金")
-    }
+
+_PRIOR_CONTEXT_RE = re.compile("Prior|Previous")
+
+
+@functools.lru_cache(maxsize=1024)
+def _is_prior_context(context_ref: str) -> bool:
+    """True for prior-period contexts (contextRef containing Prior/Previous).
+
+    A filing reuses a handful of context IDs for every fact, so the
+    answer is memoised per ID instead of re-scanning the string.
+    """
+    return _PRIOR_CONTEXT_RE.search(context_ref) is not None
 
 
 def _is_previous_ratio(local_name: str, context_ref: str) -> bool:
@@ -65,8 +143,26 @@ def _is_previous_ratio(local_name: str, context_ref: str) -> bool:
     return (
         "PerLastReport" in local_name
         or "Previous" in local_name
-        or "Prior" in context_ref
-        or "Previous" in context_ref
+        or _is_prior_context(context_ref)
+    )
+
+
+def _assign_ratio(result: dict, val: float, local_name: str, context_ref: str) -> bool:
+    """Store a ratio as current or previous (first value wins for each).
+
+    Returns True once both holding_ratio and previous_holding_ratio are set,
+    so callers can stop scanning further candidate elements.
+    """
+    key = (
+        "previous_holding_ratio"
+        if _is_previous_ratio(local_name, context_ref)
+        else "holding_ratio"
+    )
+    if result[key] is None:
+        result[key] = val
+    return (
+        result["holding_ratio"] is not None
+        and result["previous_holding_ratio"] is not None
     )
 
 
@@ -82,90 +178,287 @@ def _normalize_ratio(val: float) -> float:
     return val
 
 
-def _build_local_name_index(tree) -> dict[str, list]:
-    """Build a dict mapping local element names to element lists.
+@dataclass(frozen=True, slots=True)
+class _Fact:
+    """Detached copy of an XBRL element (tag, text, attributes).
 
-    Single tree traversal replaces multiple contains(local-name(), ...) XPath
-    scans, reducing O(P*N) to O(N) where P=patterns and N=elements.
+    Exposes the subset of the lxml Element API the extractors use
+    (``tag``, ``text``, ``get``), so the index no longer pins the DOM.
     """
-    index: dict[str, list] = {}
-    for elem in tree.iter():
-        tag = elem.tag
-        if isinstance(tag, str) and "}" in tag:
-            local = tag.rsplit("}", 1)[1]
-        elif isinstance(tag, str):
-            local = tag
-        else:
-            continue
-        if local not in index:
-            index[local] = []
-        index[local].append(elem)
+    tag: str
+    text: str | None
+    attrib: dict[str, str]
+
+    def get(self, key: str, default: str | None = None) -> str | None:
+        return self.attrib.get(key, default)
+
+
+def _index_xbrl_facts(source: bytes | IO[bytes], keep: re.Pattern) -> dict[str, list[_Fact]]:
+    """Stream an XBRL instance into a dict of local name -> facts.
+
+    A single iterparse pass replaces "build the DOM, then walk it": each
+    element is cleared at its end event and processed siblings are
+    dropped, so the tree never materialises.  Only elements whose local
+    name matches ``keep`` are copied into the index; contexts, units and
+    unrelated financial items are discarded on the fly.  ``source`` is
+    bytes or a binary file object.
+
+    Raises etree.XMLSyntaxError if nothing could be read at all.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    index: dict[str, list[_Fact]] = {}
+    wanted: dict[str, str | None] = {}  # tag -> local name, None if dropped
+    seen_root = False
+    try:
+        for _event, elem in etree.iterparse(
+            source,
+            events=("end",),
+            remove_blank_text=True,
+            **_XML_PARSE_OPTIONS,
+        ):
+            seen_root = True
+            tag = elem.tag
+            if tag in wanted:
+                local = wanted[tag]
+            else:
+                local = tag.rpartition("}")[2]
+                local = wanted[tag] = local if keep.search(local) else None
+            if local is not None:
+                facts = index.get(local)
+                if facts is None:
+                    facts = index[local] = []
+                facts.append(_Fact(tag, elem.text, dict(elem.attrib)))
+            elem.clear(keep_tail=True)
+            # The root has no parent; a comment or PI before it still shows
+            # up as getprevious(), so only prune below the root
+            parent = elem.getparent()
+            if parent is not None:
+                while elem.getprevious() is not None:
+                    del parent[0]
+    except etree.XMLSyntaxError:
+        # recover=True can still give up on hopeless input; keep what was
+        # salvaged, as the DOM parser's recover mode would
+        if not seen_root:
+            raise
+    if not seen_root:
+        raise etree.XMLSyntaxError("Document is not recoverable", None, 0, 0)
     return index
 
 
-def _find_matching_elements(name_index: dict[str, list], pattern: str) -> list:
-    """Find all elements whose local name contains the pattern."""
-    results = []
-    for local_name, elems in name_index.items():
-        if pattern in local_name:
-            results.extend(elems)
-    return results
+def _find_matching_elements(
+    name_index: dict[str, list], pattern: str,
+) -> list[tuple[str, Any]]:
+    """Find all (local_name, elem) pairs whose local name contains the pattern.
+
+    The local name comes from the index key, so callers never re-split
+    ``elem.tag`` per element.
+    """
+    return [
+        (local_name, elem)
+        for local_name, elems in name_index.items()
+        if pattern in local_name
+        for elem in elems
+    ]
 
 
-def _find_first_text(tree_or_index, patterns: list[str]) -> str | None:
-    """Search an XBRL tree for the first text value matching any pattern.
+def _iter_pattern_matches(
+    name_index: dict[str, list], patterns: tuple[str, ...],
+) -> Iterator[tuple[int, str, Any]]:
+    """Lazily yield (pattern_index, local_name, elem) in pattern priority order.
 
-    Accepts either an lxml tree (legacy) or a pre-built name index dict.
-    Returns the first non-empty text found, or None.
+    Shared first-match-wins scanner: callers stop iterating as soon as they
+    have what they need, so lower-priority patterns are never scanned.
     """
-    if isinstance(tree_or_index, dict):
-        name_index = tree_or_index
-        for pattern in patterns:
-            for elem in _find_matching_elements(name_index, pattern):
-                if elem.text and elem.text.strip():
-                    return elem.text.strip()
-    else:
-        for pattern in patterns:
-            elements = tree_or_index.xpath(
-                f"//*[contains(local-name(), '{pattern}')]"
-            )
-            for elem in elements:
-                if elem.text and elem.text.strip():
-                    return elem.text.strip()
-    return None
+    for i, pattern in enumerate(patterns):
+        for local_name, elems in name_index.items():
+            if pattern in local_name:
+                for elem in elems:
+                    yield i, local_name, elem
+
+
+def _scan_ratios(
+    result: dict,
+    name_index: dict[str, list],
+    patterns: tuple[str, ...],
+    exclude: tuple[str, ...],
+) -> None:
+    """Fill holding_ratio / previous_holding_ratio from the best-ranked match.
+
+    Stops as soon as both ratios are known.
+    """
+    for _i, local, elem in _iter_pattern_matches(name_index, patterns):
+        if any(skip in local for skip in exclude):
+            continue
+        val = _safe_float(elem.text)
+        if val is None:
+            continue
+        if _assign_ratio(result, _normalize_ratio(val), local, elem.get("contextRef", "")):
+            return
+
+
+# Plain decimal / exponent numbers as they appear in XBRL fact values.
+# Checked before float() so non-numeric facts are skipped without raising.
+_NUMERIC_RE = re.compile(r"[-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+def _safe_float(text: str | None) -> float | None:
+    """Parse XBRL fact text as float, or None if it is not a plain number."""
+    if text is None:
+        return None
+    value = text.strip()
+    if not _NUMERIC_RE.fullmatch(value):
+        return None
+    return float(value)
+
+
+def _text_value(text: str) -> str | None:
+    """FieldSpec converter for text fields (empty text is skipped)."""
+    return text.strip() or None
+
 
+def _int_value(text: str) -> int | None:
+    """FieldSpec converter for integer fields (e.g. "1000000.0" -> 1000000)."""
+    val = _safe_float(text)
+    return None if val is None else int(val)
 
-def _find_first_int(tree_or_index, patterns: list[str]) -> int | None:
-    """Search an XBRL tree for the first integer value matching any pattern.
 
-    Accepts either an lxml tree (legacy) or a pre-built name index dict.
-    Skips elements with Prior/Previous contextRef (historical values).
+@dataclass(frozen=True)
+class FieldSpec:
+    """How to extract one result field from an XBRL local-name index.
+
+    patterns are tried in priority order (substring match on the local
+    name).  For each pattern, every matching element's text is passed
+    through ``convert`` (return None to skip the element).  Without
+    ``reduce`` the first converted value wins; with ``reduce`` all values
+    for the first productive pattern are combined (e.g. ``max``).
     """
-    if isinstance(tree_or_index, dict):
-        name_index = tree_or_index
-        for pattern in patterns:
-            for elem in _find_matching_elements(name_index, pattern):
-                try:
-                    val = int(float(elem.text.strip()))
-                    context_ref = elem.get("contextRef", "")
-                    if "Prior" not in context_ref and "Previous" not in context_ref:
-                        return val
-                except (ValueError, AttributeError):
-                    continue
-    else:
-        for pattern in patterns:
-            elements = tree_or_index.xpath(
-                f"//*[contains(local-name(), '{pattern}')]"
-            )
-            for elem in elements:
-                try:
-                    val = int(float(elem.text.strip()))
-                    context_ref = elem.get("contextRef", "")
-                    if "Prior" not in context_ref and "Previous" not in context_ref:
-                        return val
-                except (ValueError, AttributeError):
-                    continue
-    return None
+
+    key: str
+    patterns: tuple[str, ...]
+    convert: Callable[[str], Any] = _text_value
+    current_only: bool = False  # skip Prior/Previous contextRef values
+    reduce: Callable[[list], Any] | None = None
+
+
+def _extract_field(name_index: dict[str, list], spec: FieldSpec) -> Any:
+    """Apply a single FieldSpec to a name index. Returns None if not found.
+
+    With ``reduce`` set, all values of the best-ranked pattern that yields
+    any are reduced; lower-priority patterns are not consulted.
+    """
+    values = []
+    best = None
+    for i, _local, elem in _iter_pattern_matches(name_index, spec.patterns):
+        if values and i != best:
+            break
+        if elem.text is None:
+            continue
+        if spec.current_only and _is_prior_context(elem.get("contextRef", "")):
+            continue
+        val = spec.convert(elem.text)
+        if val is None:
+            continue
+        if spec.reduce is None:
+            return val
+        best = i
+        values.append(val)
+    return spec.reduce(values) if values else None
+
+
+def _extract_fields(name_index: dict[str, list], specs: tuple[FieldSpec, ...]) -> dict:
+    """Apply each FieldSpec to a name index, returning {key: value}."""
+    return {spec.key: _extract_field(name_index, spec) for spec in specs}
+
+
+# 大量保有報告書: simple one-value fields (ratios / joint holders are handled separately)
+_HOLDING_FIELD_SPECS = (
+    FieldSpec("holder_name", (
+        "NameOfLargeShareholdingReporter",
+        "NameOfFiler",
+        "ReporterName",
+        "LargeShareholderName",
+    )),
+    FieldSpec("target_company_name", (
+        "IssuerNameLargeShareholding",
+        "IssuerName",
+        "NameOfIssuer",
+        "TargetCompanyName",
+    )),
+    FieldSpec("target_sec_code", (
+        "SecurityCodeOfIssuer",
+        "IssuerSecuritiesCode",
+        "SecurityCode",
+    )),
+    FieldSpec("shares_held", (
+        "TotalNumberOfShareCertificatesEtcHeld",
+        "TotalNumberOfSharesHeld",
+        "NumberOfShareCertificatesEtc",
+        "NumberOfStocksEtcHeld",
+    ), convert=_int_value, current_only=True),
+    FieldSpec("purpose_of_holding", (
+        "PurposeOfHolding",
+        "PurposeOfHoldingOfShareCertificatesEtc",
+    )),
+    FieldSpec("fund_source", (
+        "DescriptionOfFundsForAcquisition",
+        "FundsForAcquisition",
+        "SourceOfFunds",
+        "BreakdownOfAcquisitionFunds",
+        "AcquisitionFund",
+    )),
+)
+
+# 有報 / 四半期報告書: company fundamentals
+_COMPANY_FIELD_SPECS = (
+    # 発行済株式数 — take the largest current value (class totals vs. per-class rows)
+    FieldSpec("shares_outstanding", (
+        "NumberOfIssuedSharesTotalNumberOfSharesEtcRegularShares",
+        "TotalNumberOfIssuedShares",
+        "NumberOfIssuedShares",
+        "IssuedSharesTotalNumber",
+    ), convert=_int_value, current_only=True, reduce=max),
+    # 純資産 (Net Assets / Total Equity)
+    FieldSpec("net_assets", (
+        "NetAssets",
+        "EquityAttributableToOwnersOfParent",
+        "TotalEquity",
+        "ShareholdersEquity",
+    ), convert=_int_value, current_only=True),
+    # 会社名 (Company Name)
+    FieldSpec("company_name", (
+        "CompanyName",
+        "FilerName",
+    )),
+)
+
+# 保有割合: element-name patterns in priority order
+_XBRL_RATIO_PATTERNS = (
+    "HoldingRatioOfShareCertificatesEtc",
+    "TotalShareholdingRatioOfShareCertificatesEtc",
+    "TotalShareholdingRatio",
+    "RatioOfShareholdingToTotalIssuedShares",
+    "RatioOfShareCertificatesEtcAtTimeOfPreviousReport",
+)
+
+
+def _index_filter(*patterns: str) -> re.Pattern:
+    """Regex for the local names an extractor can ever look up."""
+    return re.compile("|".join(re.escape(p) for p in patterns))
+
+
+# Everything _extract_from_xbrl / _extract_joint_holders_xbrl reads:
+# ratios (+ "HoldingRatio" fallback), field specs, joint holders and the
+# bare jplvh "Name" fallback (which also covers every *Name* pattern)
+_HOLDING_INDEX_RE = _index_filter(
+    *_XBRL_RATIO_PATTERNS, "HoldingRatio", "JointHolder", "Name",
+    *(p for spec in _HOLDING_FIELD_SPECS for p in spec.patterns),
+)
+_COMPANY_INDEX_RE = _index_filter(
+    *(p for spec in _COMPANY_FIELD_SPECS for p in spec.patterns),
+)
+# Union of both, for parse_xbrl_all's single pass
+_ALL_INDEX_RE = re.compile(f"{_HOLDING_INDEX_RE.pattern}|{_COMPANY_INDEX_RE.pattern}")
 
 
 def _discover_xbrl_files(all_files: list[str]) -> tuple[list[str], list[str]]:
@@ -176,26 +469,78 @@ def _discover_xbrl_files(all_files: list[str]) -> tuple[list[str], list[str]]:
 
     Returns (xbrl_files, htm_files).
     """
-    xbrl_pub = [f for f in all_files
-                if f.endswith(".xbrl") and "PublicDoc" in f]
-    xbrl_any = [f for f in all_files
-                if f.endswith(".xbrl")
-                and "AuditDoc" not in f
-                and "__MACOSX" not in f]
-    xbrl_files = xbrl_pub or xbrl_any
+    xbrl_pub: list[str] = []
+    xbrl_any: list[str] = []
+    htm_pub: list[str] = []
+    htm_any: list[str] = []
+
+    # Single pass: route each entry into its buckets
+    for f in all_files:
+        if f.endswith(".xbrl"):
+            pub, any_ = xbrl_pub, xbrl_any
+        elif f.endswith((".htm", ".xhtml")):
+            pub, any_ = htm_pub, htm_any
+        else:
+            continue
+        if "PublicDoc" in f:
+            pub.append(f)
+        if "AuditDoc" not in f and "__MACOSX" not in f:
+            any_.append(f)
 
-    htm_pub = [f for f in all_files
-               if "PublicDoc" in f
-               and (f.endswith(".htm") or f.endswith(".xhtml"))]
-    htm_any = [f for f in all_files
-               if (f.endswith(".htm") or f.endswith(".xhtml"))
-               and "AuditDoc" not in f
-               and "__MACOSX" not in f]
+    xbrl_files = xbrl_pub or xbrl_any
     htm_files = htm_pub or htm_any
 
     return xbrl_files, htm_files
 
 
+# A ZIP payload in memory, or the path of one on disk (e.g. the download cache)
+ZipSource = bytes | str | os.PathLike
+
+
+class _ZipMap(mmap.mmap):
+    """Read-only mmap that ZipFile accepts as a seekable file object."""
+
+    def seekable(self) -> bool:
+        return True
+
+
+@contextlib.contextmanager
+def _open_zip(source: ZipSource) -> Iterator[zipfile.ZipFile]:
+    """Open a ZIP from bytes or from a file path.
+
+    Bytes are wrapped in BytesIO, which shares the buffer rather than
+    copying it.  Paths are memory-mapped read-only, so the archive is
+    never loaded onto the Python heap and ZipFile's central-directory
+    seeks and member reads hit the page cache directly.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        with zipfile.ZipFile(io.BytesIO(source)) as zf:
+            yield zf
+        return
+    with open(source, "rb") as f, \
+            _ZipMap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+            zipfile.ZipFile(mm) as zf:
+        yield zf
+
+
+# EDINET docIDs are short alphanumerics (e.g. S100ABCD); anything else is
+# never used as a cache file name
+_DOC_ID_RE = re.compile(r"[A-Za-z0-9]{1,32}")
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    """Write bytes via a temp file + os.replace so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
 def _looks_like_pdf(content: bytes) -> bool:
     """Return True when bytes appear to contain a PDF header.
 
@@ -205,6 +550,85 @@ def _looks_like_pdf(content: bytes) -> bool:
     return b"%PDF" in content[:1024]
 
 
+# Inline XBRL namespaces (2013 spec first; 2008 drafts still appear in old filings)
+_IX_NAMESPACES = (IX_NS, "http://www.xbrl.org/2008/inlineXBRL")
+
+
+def _sample_inline_elements(htm_bytes: bytes, limit: int) -> list[dict]:
+    """Collect up to ``limit`` ix:* elements from an inline XBRL document.
+
+    Elements arrive in end-tag order, so nested ix elements are listed
+    before the element that contains them.
+    """
+    elements: list[dict] = []
+    for _event, elem in etree.iterparse(
+        io.BytesIO(htm_bytes),
+        events=("end",),
+        tag=[f"{{{uri}}}*" for uri in _IX_NAMESPACES],
+        collect_ids=False,
+        **_XML_PARSE_OPTIONS,
+    ):
+        elements.append({
+            "tag": etree.QName(elem).localname,
+            "name": elem.get("name", ""),
+            "text": "".join(elem.itertext()).strip()[:200],
+            "contextRef": elem.get("contextRef", ""),
+            "format": elem.get("format", ""),
+            "scale": elem.get("scale", ""),
+        })
+        if len(elements) >= limit:
+            break
+        # Free finished top-level ix elements; nested ones are kept until
+        # their enclosing ix element has read its full text.
+        parent = elem.getparent()
+        if parent is not None and etree.QName(parent).namespace not in _IX_NAMESPACES:
+            elem.clear(keep_tail=True)
+    return elements
+
+
+# Element-name keywords sampled by diagnose_xbrl() (single regex pass per name)
+_DIAG_KEYWORD_RE = re.compile(
+    "Shareholding|Ratio|Issuer|Holder|Filer|Security|Share|Purpose"
+)
+
+
+# Inline XBRL regex fallback, compiled once at import instead of per call.
+# <ix:nonFraction ... name="prefix:ElementName" ... contextRef="xxx" ...>value</ix:nonFraction>
+_IX_NONFRACTION_NAME_FIRST_RE = re.compile(
+    r'<[^>]*?:nonFraction[^>]*?'
+    r'name=["\']([^"\']+)["\'][^>]*?'
+    r'contextRef=["\']([^"\']+)["\']'
+    r'[^>]*?>(.*?)</[^>]*?:nonFraction>',
+    re.DOTALL | re.IGNORECASE,
+)
+# Same element when contextRef comes before name
+_IX_NONFRACTION_CONTEXT_FIRST_RE = re.compile(
+    r'<[^>]*?:nonFraction[^>]*?'
+    r'contextRef=["\']([^"\']+)["\'][^>]*?'
+    r'name=["\']([^"\']+)["\']'
+    r'[^>]*?>(.*?)</[^>]*?:nonFraction>',
+    re.DOTALL | re.IGNORECASE,
+)
+_IX_NONNUMERIC_RE = re.compile(
+    r'<[^>]*?:nonNumeric[^>]*?'
+    r'name=["\']([^"\']+)["\']'
+    r'[^>]*?>(.*?)</[^>]*?:nonNumeric>',
+    re.DOTALL | re.IGNORECASE,
+)
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+# Result fields the nonFraction fallback can fill
+_NONFRACTION_FIELDS = ("holding_ratio", "previous_holding_ratio", "shares_held")
+
+# diagnose_xbrl() fallback when the .htm is not well-formed XML
+_DIAG_NONFRACTION_RE = re.compile(
+    r'<[^>]*:nonFraction[^>]*name=["\']([^"\']+)["\'][^>]*>(.*?)</[^>]*:nonFraction>',
+    re.DOTALL,
+)
+_DIAG_NONNUMERIC_RE = re.compile(
+    r'<[^>]*:nonNumeric[^>]*name=["\']([^"\']+)["\'][^>]*>(.*?)</[^>]*:nonNumeric>',
+    re.DOTALL,
+)
+
 class EdinetClient:
     """Async client for the EDINET API v2."""
 
@@ -212,10 +636,30 @@ class EdinetClient:
         self.base_url = settings.EDINET_API_BASE
         self.api_key = settings.EDINET_API_KEY
         self._client: httpx.AsyncClient | None = None
+        self.cache_dir: Path | None = (
+            Path(settings.DOWNLOAD_CACHE_DIR) if settings.DOWNLOAD_CACHE_DIR else None
+        )
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(timeout=30.0)
+            # HTTP/2 lets concurrent downloads share one TLS session.
+            # Accept-Encoding is left to httpx: with the brotli/zstd extras
+            # installed it advertises "gzip, deflate, br, zstd" and only
+            # ever asks for encodings it can decode.
+            # Every call goes to the same host: keep idle connections
+            # around between poll cycles, and attach the API key once as
+            # a default query parameter instead of per request.
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                params={"Subscription-Key": self.api_key},
+                http2=True,
+                timeout=httpx.Timeout(30.0, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=40,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=30.0,
+                ),
+            )
         return self._client
 
     async def close(self):
@@ -228,16 +672,15 @@ class EdinetClient:
         Shared implementation used by both filtered and unfiltered list endpoints.
         """
         client = await self._get_client()
-        url = f"{self.base_url}/documents.json"
         params = {
             "date": target_date.strftime("%Y-%m-%d"),
             "type": 2,  # Return document list + metadata
-            "Subscription-Key": self.api_key,
         }
 
-        resp = await client.get(url, params=params)
+        resp = await client.get("/documents.json", params=params)
         resp.raise_for_status()
-        data = resp.json()
+        # orjson parses multi-thousand-record lists several times faster than json
+        data = orjson.loads(resp.content)
 
         metadata = data.get("metadata", {})
         status = metadata.get("status")
@@ -259,28 +702,29 @@ class EdinetClient:
         Returns only large shareholding reports (docTypeCode 350/360).
         """
         results = await self._fetch_documents_raw(target_date)
+        holding_doc_types = settings.LARGE_HOLDING_DOC_TYPES  # hoisted: O(1) set lookups
         filings = []
         for doc in results:
-            doc_type = doc.get("docTypeCode")
-            if doc_type not in settings.LARGE_HOLDING_DOC_TYPES:
+            get = doc.get
+            if get("docTypeCode") not in holding_doc_types:
                 continue
 
             # API v2 spec: filter out withdrawn documents
             # withdrawalStatus: "0"=none, "1"=withdrawn, "2"=withdrawal of withdrawal
-            withdrawal = doc.get("withdrawalStatus", "0")
+            withdrawal = get("withdrawalStatus", "0")
             if withdrawal == "1":
                 logger.debug(
-                    "Skipping withdrawn document %s", doc.get("docID")
+                    "Skipping withdrawn document %s", get("docID")
                 )
                 continue
 
             # API v2 spec: filter out non-disclosed documents
             # disclosureStatus: "0"=disclosed, "1"=not disclosed
-            disclosure = doc.get("disclosureStatus", "0")
+            disclosure = get("disclosureStatus", "0")
             if disclosure != "0":
                 logger.debug(
                     "Skipping non-disclosed document %s (status=%s)",
-                    doc.get("docID"), disclosure,
+                    get("docID"), disclosure,
                 )
                 continue
 
@@ -294,6 +738,33 @@ class EdinetClient:
         )
         return filings
 
+    async def fetch_document_lists(
+        self, dates: list[date], concurrency: int = 8,
+    ) -> dict[date, list[dict]]:
+        """Fetch the large shareholding filings for several dates concurrently.
+
+        Backfills otherwise pay one round-trip per day; here up to
+        ``concurrency`` list requests share the pooled HTTP/2 connection.
+        A date whose request fails maps to an empty list, the same as an
+        API-level error in ``_fetch_documents_raw``.
+        """
+        sem = asyncio.Semaphore(concurrency)
+
+        async def _one(target_date: date) -> list[dict]:
+            async with sem:
+                return await self.fetch_document_list(target_date)
+
+        results = await asyncio.gather(
+            *(_one(d) for d in dates), return_exceptions=True,
+        )
+        out: dict[date, list[dict]] = {}
+        for target_date, res in zip(dates, results):
+            if isinstance(res, BaseException):
+                logger.error("Failed to fetch document list for %s: %s", target_date, res)
+                res = []
+            out[target_date] = res
+        return out
+
     async def _download_document(
         self, doc_id: str, doc_type: int, label: str,
     ) -> httpx.Response | None:
@@ -303,14 +774,11 @@ class EdinetClient:
         failed or the response looks like an error page.
         """
         client = await self._get_client()
-        url = f"{self.base_url}/documents/{doc_id}"
-        params = {
-            "type": doc_type,
-            "Subscription-Key": self.api_key,
-        }
 
         try:
-            resp = await client.get(url, params=params)
+            resp = await client.get(
+                f"/documents/{doc_id}", params={"type": doc_type},
+            )
             resp.raise_for_status()
         except httpx.HTTPStatusError as e:
             logger.warning(
@@ -334,8 +802,62 @@ class EdinetClient:
 
         return resp
 
+    def _cache_path(self, doc_id: str, kind: str) -> Path | None:
+        """Cache file for a document, or None if caching is off / ID is odd."""
+        if self.cache_dir is None or not _DOC_ID_RE.fullmatch(doc_id):
+            return None
+        return self.cache_dir / f"{doc_id}.{kind}"
+
+    async def _cached_download(
+        self,
+        doc_id: str,
+        kind: str,
+        fetch: Callable[[str], Awaitable[bytes | None]],
+    ) -> bytes | None:
+        """Serve a document from the on-disk cache, or fetch and store it.
+
+        Published EDINET documents never change, so entries never expire.
+        Cache I/O failures are logged and treated as a miss.
+        """
+        path = self._cache_path(doc_id, kind)
+        if path is not None:
+            try:
+                return await asyncio.to_thread(path.read_bytes)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("Failed to read cached %s for %s: %s", kind, doc_id, e)
+
+        content = await fetch(doc_id)
+        if path is not None and content is not None:
+            try:
+                await asyncio.to_thread(_write_atomic, path, content)
+            except OSError as e:
+                logger.warning("Failed to cache %s for %s: %s", kind, doc_id, e)
+        return content
+
     async def download_xbrl(self, doc_id: str) -> bytes | None:
-        """Download the XBRL ZIP for a given document ID."""
+        """Download the XBRL ZIP for a given document ID (disk-cached)."""
+        return await self._cached_download(doc_id, "xbrl.zip", self._fetch_xbrl)
+
+    async def cached_xbrl_path(self, doc_id: str) -> Path | None:
+        """Path of the cached XBRL ZIP for a document, or None on a miss.
+
+        The parsers memory-map a path inside their worker thread, so a
+        cached ZIP handed over this way is never copied onto the Python
+        heap, and no EDINET request (or rate-limit wait) is needed.
+        """
+        path = self._cache_path(doc_id, "xbrl.zip")
+        if path is not None and await asyncio.to_thread(path.is_file):
+            return path
+        return None
+
+    async def download_pdf(self, doc_id: str) -> bytes | None:
+        """Download the PDF for a given document ID (disk-cached)."""
+        return await self._cached_download(doc_id, "pdf", self._fetch_pdf)
+
+    async def _fetch_xbrl(self, doc_id: str) -> bytes | None:
+        """Fetch the XBRL ZIP for a given document ID from EDINET."""
         resp = await self._download_document(doc_id, doc_type=1, label="XBRL")
         if resp is None:
             return None
@@ -349,8 +871,8 @@ class EdinetClient:
 
         return resp.content
 
-    async def download_pdf(self, doc_id: str) -> bytes | None:
-        """Download the PDF for a given document ID (type=2).
+    async def _fetch_pdf(self, doc_id: str) -> bytes | None:
+        """Fetch the PDF for a given document ID (type=2) from EDINET.
 
         EDINET API v2 spec (Jan 2026):
         - type=2 returns the PDF file directly as binary data.
@@ -362,33 +884,72 @@ class EdinetClient:
         if resp is None:
             return None
 
-        # Try ZIP first (older API / some document types return ZIP containing PDF)
-        try:
-            with zipfile.ZipFile(io.BytesIO(resp.content)) as zf:
-                pdf_files = [
-                    f for f in zf.namelist()
-                    if f.lower().endswith(".pdf")
-                ]
-                if pdf_files:
-                    return zf.read(pdf_files[0])
-                logger.warning("No PDF files found in ZIP for %s", doc_id)
-                return None
-        except zipfile.BadZipFile:
-            pass
+        content = resp.content
+
+        # Sniff the signature instead of letting ZipFile scan for a central
+        # directory and raise on every raw PDF.  "PK" is checked first: a
+        # stored (uncompressed) PDF inside a ZIP also has "%PDF" near the start.
+        if content[:2] == b"PK":
+            # Older API / some document types return ZIP containing PDF
+            try:
+                with zipfile.ZipFile(io.BytesIO(content)) as zf:
+                    # First match wins: stop at it instead of listing every entry
+                    pdf_info = next(
+                        (i for i in zf.infolist()
+                         if i.filename.lower().endswith(".pdf")),
+                        None,
+                    )
+                    if pdf_info is not None:
+                        return zf.read(pdf_info)
+                    logger.warning("No PDF files found in ZIP for %s", doc_id)
+                    return None
+            except zipfile.BadZipFile:
+                pass
 
         # Directly returned PDF (current API v2 spec, Jan 2026)
-        if _looks_like_pdf(resp.content):
-            return resp.content
+        elif _looks_like_pdf(content):
+            return content
 
         logger.warning(
             "EDINET returned neither valid PDF nor ZIP for %s "
             "(%d bytes, content-type=%s)",
-            doc_id, len(resp.content),
+            doc_id, len(content),
             resp.headers.get("content-type", ""),
         )
         return None
 
-    def parse_xbrl_for_holding_data(self, zip_content: bytes) -> dict:
+    async def download_many(
+        self, doc_ids: list[str], kind: str = "xbrl", concurrency: int = 8,
+    ) -> dict[str, bytes | None]:
+        """Download several documents concurrently.
+
+        ``kind`` selects the per-document coroutine ("xbrl" or "pdf").
+        At most ``concurrency`` requests are in flight at once so bulk
+        scans stay within EDINET's rate limits.  Failed downloads map to
+        None, mirroring the single-document methods.
+        """
+        downloaders = {"xbrl": self.download_xbrl, "pdf": self.download_pdf}
+        if kind not in downloaders:
+            raise ValueError(f"Unknown download kind: {kind!r}")
+        download = downloaders[kind]
+        sem = asyncio.Semaphore(concurrency)
+
+        async def _one(doc_id: str) -> bytes | None:
+            async with sem:
+                return await download(doc_id)
+
+        results = await asyncio.gather(
+            *(_one(d) for d in doc_ids), return_exceptions=True,
+        )
+        out: dict[str, bytes | None] = {}
+        for doc_id, res in zip(doc_ids, results):
+            if isinstance(res, BaseException):
+                logger.error("Failed to download %s for %s: %s", kind, doc_id, res)
+                res = None
+            out[doc_id] = res
+        return out
+
+    def parse_xbrl_for_holding_data(self, zip_content: ZipSource) -> dict:
         """Parse XBRL ZIP to extract shareholding data.
 
         Handles both traditional XBRL (.xbrl) and inline XBRL (.htm/.xhtml)
@@ -403,62 +964,100 @@ class EdinetClient:
         - target_sec_code: str | None
         - shares_held: int | None
         - purpose_of_holding: str | None
-        """
-        result = _empty_holding_result()
 
+        ``zip_content`` may also be a path to the ZIP on disk (memory-mapped).
+        """
         try:
-            with zipfile.ZipFile(io.BytesIO(zip_content)) as zf:
+            with _open_zip(zip_content) as zf:
                 all_files = zf.namelist()
                 logger.debug("XBRL ZIP contains %d files: %s",
                              len(all_files), all_files[:20])
-
                 xbrl_files, htm_files = _discover_xbrl_files(all_files)
-
-                # --- Try 1: traditional XBRL instance (.xbrl) ---
-                if xbrl_files:
-                    xbrl_content = zf.read(xbrl_files[0])
-                    result = self._extract_from_xbrl(xbrl_content)
-                    if result["holding_ratio"] is not None:
-                        logger.debug("Extracted data from traditional XBRL: %s", xbrl_files[0])
-                        return result
-
-                # --- Try 2: inline XBRL (.htm / .xhtml) ---
-                if htm_files:
-                    logger.debug("Trying inline XBRL from %d .htm files", len(htm_files))
-                    # Parse all htm files once (avoid redundant reads)
-                    partial_results = []
-                    for htm_file in htm_files:
-                        htm_content = zf.read(htm_file)
-                        inline_result = self._extract_from_inline_xbrl(htm_content)
-                        if inline_result["holding_ratio"] is not None:
-                            logger.debug("Extracted data from inline XBRL: %s", htm_file)
-                            return inline_result
-                        partial_results.append(inline_result)
-                    # Merge partial results: take first non-None value from any file
-                    merged = dict(result)
-                    for partial in partial_results:
-                        for key in merged:
-                            if merged[key] is None and partial.get(key) is not None:
-                                merged[key] = partial[key]
-                    if any(v is not None for v in merged.values()):
-                        logger.debug("Merged partial inline XBRL data from %d files", len(htm_files))
-                        return merged
-
-                if not xbrl_files and not htm_files:
-                    logger.warning(
-                        "No XBRL (.xbrl) or inline XBRL (.htm) files in PublicDoc/. "
-                        "ZIP contents: %s", all_files[:20],
-                    )
-
+                return self._holding_data_from_zip(zf, xbrl_files, htm_files)
         except zipfile.BadZipFile:
             logger.warning("Invalid ZIP file received from EDINET")
         except Exception as e:
             logger.error("XBRL parsing error: %s", e)
 
+        return dict(_EMPTY_HOLDING)
+
+    def _holding_data_from_zip(
+        self,
+        zf: zipfile.ZipFile,
+        xbrl_files: list[str],
+        htm_files: list[str],
+        preloaded: dict[str, bytes] | None = None,
+        xbrl_index: dict[str, list] | None = None,
+    ) -> dict:
+        """Extract holding data from an already-open XBRL ZIP.
+
+        ``preloaded`` maps member names to bytes the caller has already
+        decompressed (diagnose_xbrl), so those members are not inflated twice.
+        ``xbrl_index`` is a fact index of ``xbrl_files[0]`` the caller has
+        already built (parse_xbrl_all), so the instance is not parsed again.
+        """
+        preloaded = preloaded or {}
+
+        def read(name: str) -> bytes:
+            content = preloaded.get(name)
+            return content if content is not None else zf.read(name)
+
+        result = dict(_EMPTY_HOLDING)
+
+        # --- Try 1: traditional XBRL instance (.xbrl) ---
+        if xbrl_files:
+            xbrl_name = xbrl_files[0]
+            if xbrl_index is not None:
+                result = self._holding_from_index(xbrl_index)
+            elif xbrl_name in preloaded:
+                result = self._extract_from_xbrl(preloaded[xbrl_name])
+            else:
+                # Stream straight from the archive: no decompressed copy
+                with zf.open(xbrl_name) as fp:
+                    result = self._extract_from_xbrl(fp)
+            if result["holding_ratio"] is not None:
+                logger.debug("Extracted data from traditional XBRL: %s", xbrl_files[0])
+                return result
+
+        # --- Try 2: inline XBRL (.htm / .xhtml) ---
+        if htm_files:
+            logger.debug("Trying inline XBRL from %d .htm files", len(htm_files))
+            # Parse all htm files once (avoid redundant reads)
+            partial_results = []
+            for htm_file in htm_files:
+                inline_result = self._extract_from_inline_xbrl(read(htm_file))
+                if inline_result["holding_ratio"] is not None:
+                    logger.debug("Extracted data from inline XBRL: %s", htm_file)
+                    return inline_result
+                partial_results.append(inline_result)
+            # Merge partial results: take first non-None value from any file
+            merged = dict(result)
+            for partial in partial_results:
+                for key in merged:
+                    if merged[key] is None and partial.get(key) is not None:
+                        merged[key] = partial[key]
+            if any(v is not None for v in merged.values()):
+                logger.debug("Merged partial inline XBRL data from %d files", len(htm_files))
+                return merged
+
+        if not xbrl_files and not htm_files:
+            logger.warning(
+                "No XBRL (.xbrl) or inline XBRL (.htm) files in PublicDoc/. "
+                "ZIP contents: %s", zf.namelist()[:20],
+            )
+
         return result
 
-    def _extract_from_xbrl(self, xbrl_bytes: bytes) -> dict:
-        """Extract holding data from XBRL instance XML.
+    async def aparse_xbrl_for_holding_data(self, zip_content: ZipSource) -> dict:
+        """Run parse_xbrl_for_holding_data() in a worker thread.
+
+        ZIP inflate and lxml parsing are CPU-bound (both release the GIL),
+        so offloading keeps the event loop serving SSE/API traffic.
+        """
+        return await asyncio.to_thread(self.parse_xbrl_for_holding_data, zip_content)
+
+    def _extract_from_xbrl(self, xbrl_source: bytes | IO[bytes]) -> dict:
+        """Extract holding data from XBRL instance XML (bytes or a binary file).
 
         前回保有割合の検出:
           要素名に PerLastReport / Previous を含むか、
@@ -466,125 +1065,51 @@ class EdinetClient:
           ratio_patterns を全てスキャンし、holding_ratio と previous_holding_ratio の
           両方が見つかるまでループを継続する。
         """
-        result = _empty_holding_result()
-
+        # Single streaming pass builds the element name index (no DOM kept)
         try:
-            tree = etree.fromstring(xbrl_bytes)
+            name_index = _index_xbrl_facts(xbrl_source, _HOLDING_INDEX_RE)
         except etree.XMLSyntaxError as e:
             logger.warning("XBRL XML parse error: %s", e)
-            return result
+            return dict(_EMPTY_HOLDING)
 
-        # Build element name index once — O(N) traversal replaces many O(N) XPath scans
-        name_index = _build_local_name_index(tree)
+        return self._holding_from_index(name_index)
+
+    def _holding_from_index(self, name_index: dict[str, list]) -> dict:
+        """Extract holding data from an XBRL fact index."""
+        result = dict(_EMPTY_HOLDING)
 
         # --- Holding ratio (保有割合) ---
-        ratio_patterns = [
-            "HoldingRatioOfShareCertificatesEtc",
-            "TotalShareholdingRatioOfShareCertificatesEtc",
-            "TotalShareholdingRatio",
-            "RatioOfShareholdingToTotalIssuedShares",
-            "RatioOfShareCertificatesEtcAtTimeOfPreviousReport",
-        ]
-        for pattern in ratio_patterns:
-            elements = _find_matching_elements(name_index, pattern)
-            if elements:
-                for elem in elements:
-                    local = elem.tag.rsplit("}", 1)[-1] if "}" in elem.tag else elem.tag
-                    if "Abstract" in local or "EachLargeShareholder" in local:
-                        continue
-                    try:
-                        val = _normalize_ratio(float(elem.text.strip()))
-                        context_ref = elem.get("contextRef", "")
-                        if _is_previous_ratio(local, context_ref):
-                            if result["previous_holding_ratio"] is None:
-                                result["previous_holding_ratio"] = val
-                        else:
-                            if result["holding_ratio"] is None:
-                                result["holding_ratio"] = val
-                    except (ValueError, AttributeError):
-                        continue
-                if result["holding_ratio"] is not None and result["previous_holding_ratio"] is not None:
-                    break
+        _scan_ratios(
+            result, name_index, _XBRL_RATIO_PATTERNS,
+            exclude=_RATIO_PRIMARY_EXCLUDE,
+        )
 
         # Fallback: broader search if specific patterns didn't match
         if result["holding_ratio"] is None:
-            elements = _find_matching_elements(name_index, "HoldingRatio")
-            for elem in elements:
-                local = elem.tag.rsplit("}", 1)[-1] if "}" in elem.tag else elem.tag
-                if any(skip in local for skip in (
-                    "Abstract", "EachLargeShareholder", "JointHolder",
-                )):
-                    continue
-                try:
-                    val = _normalize_ratio(float(elem.text.strip()))
-                    context_ref = elem.get("contextRef", "")
-                    if _is_previous_ratio(local, context_ref):
-                        if result["previous_holding_ratio"] is None:
-                            result["previous_holding_ratio"] = val
-                    else:
-                        if result["holding_ratio"] is None:
-                            result["holding_ratio"] = val
-                except (ValueError, AttributeError):
-                    continue
-
-        # --- Text fields: holder, target, sec_code, purpose, fund_source ---
-        result["holder_name"] = _find_first_text(name_index, [
-            "NameOfLargeShareholdingReporter",
-            "NameOfFiler",
-            "ReporterName",
-            "LargeShareholderName",
-        ])
+            _scan_ratios(
+                result, name_index, ("HoldingRatio",),
+                exclude=_RATIO_EXCLUDE,
+            )
+
+        # --- Single-value fields: holder, target, sec_code, shares, purpose, fund_source ---
+        result.update(_extract_fields(name_index, _HOLDING_FIELD_SPECS))
 
         # jplvh_cor fallback: exact local-name() = 'Name' within jplvh namespace
         if result["holder_name"] is None:
             for elem in name_index.get("Name", []):
-                ns_uri = elem.tag.split("}")[0].lstrip("{") if "}" in elem.tag else ""
+                ns_uri = etree.QName(elem.tag).namespace or ""
                 if "jplvh" in ns_uri or "lvh" in ns_uri:
                     if elem.text and elem.text.strip():
                         result["holder_name"] = elem.text.strip()
                         break
 
-        result["target_company_name"] = _find_first_text(name_index, [
-            "IssuerNameLargeShareholding",
-            "IssuerName",
-            "NameOfIssuer",
-            "TargetCompanyName",
-        ])
-
-        result["target_sec_code"] = _find_first_text(tree, [
-            "SecurityCodeOfIssuer",
-            "IssuerSecuritiesCode",
-            "SecurityCode",
-        ])
-
-        # --- Total shares held ---
-        result["shares_held"] = _find_first_int(name_index, [
-            "TotalNumberOfShareCertificatesEtcHeld",
-            "TotalNumberOfSharesHeld",
-            "NumberOfShareCertificatesEtc",
-            "NumberOfStocksEtcHeld",
-        ])
-
-        result["purpose_of_holding"] = _find_first_text(name_index, [
-            "PurposeOfHolding",
-            "PurposeOfHoldingOfShareCertificatesEtc",
-        ])
-
         # --- Joint holders (共同保有者) ---
-        result["joint_holders"] = self._extract_joint_holders_xbrl(tree, name_index)
-
-        result["fund_source"] = _find_first_text(name_index, [
-            "DescriptionOfFundsForAcquisition",
-            "FundsForAcquisition",
-            "SourceOfFunds",
-            "BreakdownOfAcquisitionFunds",
-            "AcquisitionFund",
-        ])
+        result["joint_holders"] = self._extract_joint_holders_xbrl(name_index)
 
         logger.debug("Extracted XBRL data: %s", result)
         return result
 
-    def _extract_joint_holders_xbrl(self, tree, name_index: dict | None = None) -> str | None:
+    def _extract_joint_holders_xbrl(self, name_index: dict[str, list]) -> str | None:
         """Extract joint holder info from traditional XBRL tree.
 
         Joint holders (共同保有者) are listed in the large shareholding
@@ -594,12 +1119,10 @@ class EdinetClient:
         Returns a JSON string of [{name, ratio}] or None.
         """
         holders = []
-        idx = name_index or _build_local_name_index(tree)
 
         # Strategy 1: look for numbered joint holder elements
-        name_elements = _find_matching_elements(idx, "JointHolder")
-        for elem in name_elements:
-            local = elem.tag.rsplit("}", 1)[-1] if "}" in elem.tag else elem.tag
+        name_elements = _find_matching_elements(name_index, "JointHolder")
+        for local, elem in name_elements:
             if "Name" not in local:
                 continue
             if "Abstract" in local:
@@ -609,24 +1132,22 @@ class EdinetClient:
 
         # Strategy 2: look for ratio elements corresponding to joint holders
         ratio_idx = 0
-        for elem in name_elements:
-            local = elem.tag.rsplit("}", 1)[-1] if "}" in elem.tag else elem.tag
+        for local, elem in name_elements:
             if "Ratio" not in local and "HoldingRatio" not in local:
                 continue
             if "Abstract" in local:
                 continue
-            try:
-                val = _normalize_ratio(float(elem.text.strip()))
-                if ratio_idx < len(holders):
-                    holders[ratio_idx]["ratio"] = val
-                ratio_idx += 1
-            except (ValueError, AttributeError):
+            val = _safe_float(elem.text)
+            if val is None:
                 continue
+            if ratio_idx < len(holders):
+                holders[ratio_idx]["ratio"] = _normalize_ratio(val)
+            ratio_idx += 1
 
         # Strategy 3: broader search — NameOfJointHolder (non-numbered)
         if not holders:
             for pattern in ("NameOfJointHolder", "JointHolderName"):
-                for elem in idx.get(pattern, []):
+                for elem in name_index.get(pattern, []):
                     if elem.text and elem.text.strip():
                         holders.append({"name": elem.text.strip(), "ratio": None})
 
@@ -645,11 +1166,11 @@ class EdinetClient:
         1. Try XML parser (preserves namespaces) — works for well-formed XHTML
         2. Fall back to regex extraction — works even when parsers fail
         """
-        result = _empty_holding_result()
+        result = dict(_EMPTY_HOLDING)
 
         # --- Strategy 1: XML parser (namespace-aware) ---
         try:
-            tree = etree.fromstring(htm_bytes)
+            tree = _parse_xml(htm_bytes)
             result = self._extract_inline_via_xml(tree)
             if result["holding_ratio"] is not None:
                 logger.debug("Inline XBRL: extracted via XML parser")
@@ -679,7 +1200,7 @@ class EdinetClient:
         ix:nonFraction 要素の name 属性からローカル名を取得し、
         _matches_ratio_pattern() でマッチした要素について is_previous 判定を行う。
         """
-        result = _empty_holding_result()
+        result = dict(_EMPTY_HOLDING)
 
         # Discover the ix namespace URI dynamically from the document.
         # The ix prefix may be declared on a descendant element (not the root),
@@ -697,82 +1218,65 @@ class EdinetClient:
         _inline_jh_names: list[str] = []
         _inline_jh_ratios: list[float] = []
 
-        # Find ix:nonFraction and ix:nonNumeric elements
-        for elem in tree.iter():
-            tag = elem.tag if isinstance(elem.tag, str) else ""
-
-            is_nonfraction = tag == f"{{{ix_uri}}}nonFraction"
-            is_nonnumeric = tag == f"{{{ix_uri}}}nonNumeric"
+        # Find ix:nonFraction and ix:nonNumeric elements (tag filter runs in C)
+        nonfraction_tag = f"{{{ix_uri}}}nonFraction"
+        nonnumeric_tag = f"{{{ix_uri}}}nonNumeric"
+        for elem in tree.iter(nonfraction_tag, nonnumeric_tag):
+            name_attr = elem.get("name", "")
+            if not name_attr:
+                continue
+            local_name = name_attr.rpartition(":")[2]
 
-            if not is_nonfraction and not is_nonnumeric:
+            if elem.tag == nonfraction_tag:
+                kind = _classify_nonfraction(local_name)
+                field = None
+            else:
+                kind = None
+                field = _classify_nonnumeric(local_name, name_attr)
+            if kind is None and field is None:
                 continue
 
-            name_attr = elem.get("name", "")
-            context_ref = elem.get("contextRef", "")
             text = "".join(elem.itertext()).strip()
-
-            if not name_attr or not text:
+            if not text:
                 continue
+            context_ref = elem.get("contextRef", "")
 
-            local_name = name_attr.split(":")[-1] if ":" in name_attr else name_attr
-
-            if is_nonfraction and _matches_ratio_pattern(local_name):
-                try:
-                    val = _parse_ix_number(elem, text)
-                    if val is not None:
-                        # Skip _normalize_ratio when % is in the original text:
-                        # the value is already a percentage and should not be
-                        # re-interpreted as a decimal fraction.
-                        if "%" not in text and "％" not in text:
-                            val = _normalize_ratio(val)
-                        if _is_previous_ratio(local_name, context_ref):
-                            if result["previous_holding_ratio"] is None:
-                                result["previous_holding_ratio"] = val
-                        else:
-                            if result["holding_ratio"] is None:
-                                result["holding_ratio"] = val
-                except (ValueError, AttributeError):
-                    continue
-
-            elif is_nonfraction and _matches_shares_pattern(local_name):
-                try:
-                    val = _parse_ix_number(elem, text)
-                    if val is not None:
-                        if "Prior" not in context_ref and "Previous" not in context_ref:
-                            if result["shares_held"] is None:
-                                result["shares_held"] = int(val)
-                except (ValueError, AttributeError):
-                    continue
-
-            elif is_nonnumeric:
-                if _matches_holder_pattern(local_name, name_attr):
-                    if not result["holder_name"]:
-                        result["holder_name"] = text
-                elif _matches_target_pattern(local_name):
-                    if not result["target_company_name"]:
-                        result["target_company_name"] = text
-                elif _matches_sec_code_pattern(local_name):
-                    if not result["target_sec_code"]:
-                        result["target_sec_code"] = text
-                elif _matches_purpose_pattern(local_name):
-                    if not result["purpose_of_holding"]:
-                        result["purpose_of_holding"] = text
-                elif _matches_fund_source_pattern(local_name):
-                    if not result["fund_source"]:
-                        result["fund_source"] = text
-                elif _matches_joint_holder_name_pattern(local_name):
+            if field is not None:
+                if field == "joint_holder_name":
                     _inline_jh_names.append(text)
+                elif not result[field]:
+                    result[field] = text
+                continue
 
-            # Joint holder ratio from nonFraction
-            elif is_nonfraction and _matches_joint_holder_ratio_pattern(local_name):
-                try:
-                    val = _parse_ix_number(elem, text)
-                    if val is not None:
-                        if "%" not in text and "％" not in text:
-                            val = _normalize_ratio(val)
-                        _inline_jh_ratios.append(val)
-                except (ValueError, AttributeError):
-                    pass
+            try:
+                val = _parse_ix_number(elem, text)
+            except (ValueError, AttributeError):
+                continue
+            if val is None:
+                continue
+
+            if kind == "ratio":
+                # Skip _normalize_ratio when % is in the original text:
+                # the value is already a percentage and should not be
+                # re-interpreted as a decimal fraction.
+                if "%" not in text and "％" not in text:
+                    val = _normalize_ratio(val)
+                if _is_previous_ratio(local_name, context_ref):
+                    if result["previous_holding_ratio"] is None:
+                        result["previous_holding_ratio"] = val
+                else:
+                    if result["holding_ratio"] is None:
+                        result["holding_ratio"] = val
+
+            elif kind == "shares":
+                if not _is_prior_context(context_ref):
+                    if result["shares_held"] is None:
+                        result["shares_held"] = int(val)
+
+            else:  # joint_holder_ratio
+                if "%" not in text and "％" not in text:
+                    val = _normalize_ratio(val)
+                _inline_jh_ratios.append(val)
 
         # Assemble joint holders from inline XBRL
         if _inline_jh_names:
@@ -786,69 +1290,43 @@ class EdinetClient:
 
     def _extract_inline_via_regex(self, htm_bytes: bytes) -> dict:
         """Extract inline XBRL data using regex (fallback when parsers fail)."""
-        result = _empty_holding_result()
+        result = dict(_EMPTY_HOLDING)
 
         text = htm_bytes.decode("utf-8", errors="replace")
 
-        # Match ix:nonFraction elements with name and contextRef
-        # Pattern: <ix:nonFraction ... name="prefix:ElementName" ... contextRef="xxx" ...>value</ix:nonFraction>
-        nonfrac_pat = re.compile(
-            r'<[^>]*?:nonFraction[^>]*?'
-            r'name=["\']([^"\']+)["\'][^>]*?'
-            r'contextRef=["\']([^"\']+)["\']'
-            r'[^>]*?>(.*?)</[^>]*?:nonFraction>',
-            re.DOTALL | re.IGNORECASE,
-        )
-        # Also match when contextRef comes before name
-        nonfrac_pat2 = re.compile(
-            r'<[^>]*?:nonFraction[^>]*?'
-            r'contextRef=["\']([^"\']+)["\'][^>]*?'
-            r'name=["\']([^"\']+)["\']'
-            r'[^>]*?>(.*?)</[^>]*?:nonFraction>',
-            re.DOTALL | re.IGNORECASE,
-        )
-
-        for m in nonfrac_pat.finditer(text):
-            name_attr, ctx, val_text = m.group(1), m.group(2), m.group(3)
-            self._apply_nonfraction_regex(result, name_attr, ctx, val_text)
-
-        for m in nonfrac_pat2.finditer(text):
-            ctx, name_attr, val_text = m.group(1), m.group(2), m.group(3)
-            self._apply_nonfraction_regex(result, name_attr, ctx, val_text)
+        # Match ix:nonFraction elements with name and contextRef (either order).
+        # Only the first value per field is kept, so stop scanning the text
+        # as soon as every numeric field is filled.
+        def numeric_fields_done() -> bool:
+            return all(result[k] is not None for k in _NONFRACTION_FIELDS)
+
+        for pattern, name_group, ctx_group in (
+            (_IX_NONFRACTION_NAME_FIRST_RE, 1, 2),
+            (_IX_NONFRACTION_CONTEXT_FIRST_RE, 2, 1),
+        ):
+            if numeric_fields_done():
+                break
+            for m in pattern.finditer(text):
+                self._apply_nonfraction_regex(
+                    result, m.group(name_group), m.group(ctx_group), m.group(3),
+                )
+                if numeric_fields_done():
+                    break
 
         # Match ix:nonNumeric elements
-        nonnumeric_pat = re.compile(
-            r'<[^>]*?:nonNumeric[^>]*?'
-            r'name=["\']([^"\']+)["\']'
-            r'[^>]*?>(.*?)</[^>]*?:nonNumeric>',
-            re.DOTALL | re.IGNORECASE,
-        )
-
-        for m in nonnumeric_pat.finditer(text):
+        for m in _IX_NONNUMERIC_RE.finditer(text):
             name_attr, val_text = m.group(1), m.group(2)
             # Strip HTML tags from value
-            clean_val = re.sub(r'<[^>]+>', '', val_text).strip()
+            clean_val = _HTML_TAG_RE.sub('', val_text).strip()
             if not clean_val:
                 continue
 
             local_name = name_attr.split(":")[-1]
+            field = _classify_nonnumeric(local_name, name_attr)
 
-            if _matches_holder_pattern(local_name, name_attr):
-                if not result["holder_name"]:
-                    result["holder_name"] = clean_val
-            elif _matches_target_pattern(local_name):
-                if not result["target_company_name"]:
-                    result["target_company_name"] = clean_val
-            elif _matches_sec_code_pattern(local_name):
-                if not result["target_sec_code"]:
-                    result["target_sec_code"] = clean_val
-            elif _matches_purpose_pattern(local_name):
-                if not result["purpose_of_holding"]:
-                    result["purpose_of_holding"] = clean_val
-            elif _matches_fund_source_pattern(local_name):
-                if not result["fund_source"]:
-                    result["fund_source"] = clean_val
-            elif _matches_joint_holder_name_pattern(local_name):
+            if field is None:
+                continue
+            if field == "joint_holder_name":
                 # Accumulate as JSON string, consistent with _extract_inline_via_xml
                 existing = []
                 if result.get("joint_holders"):
@@ -858,6 +1336,8 @@ class EdinetClient:
                         existing = []
                 existing.append({"name": clean_val})
                 result["joint_holders"] = json.dumps(existing, ensure_ascii=False)
+            elif not result[field]:
+                result[field] = clean_val
 
         return result
 
@@ -868,19 +1348,19 @@ class EdinetClient:
         要素名とcontextRefから is_previous 判定して result に格納する。
         """
         local_name = name_attr.split(":")[-1]
+        # Classify first: facts that feed no field are never cleaned/parsed
+        kind = _classify_nonfraction(local_name)
+        if kind not in ("ratio", "shares"):
+            return
         # Strip HTML tags
-        clean_val = re.sub(r'<[^>]+>', '', val_text).strip()
+        clean_val = _HTML_TAG_RE.sub('', val_text).strip()
         # Extract scale from the tag (regex can't easily get attributes, assume no scale)
-        cleaned = re.sub(r'[,、\s　株%％]', '', clean_val)
-        if not cleaned or cleaned in ('-', '―'):
+        # _safe_float pre-checks the text, so "-" / "―" / junk never raise
+        val = _safe_float(clean_val.translate(_NUMBER_STRIP_TABLE))
+        if val is None:
             return
 
-        try:
-            val = float(cleaned)
-        except ValueError:
-            return
-
-        if _matches_ratio_pattern(local_name):
+        if kind == "ratio":
             # Skip normalization when % was in the original text
             if "%" not in clean_val and "％" not in clean_val:
                 val = _normalize_ratio(val)
@@ -891,12 +1371,12 @@ class EdinetClient:
                 if result["holding_ratio"] is None:
                     result["holding_ratio"] = val
 
-        elif _matches_shares_pattern(local_name):
-            if "Prior" not in ctx and "Previous" not in ctx:
+        elif kind == "shares":
+            if not _is_prior_context(ctx):
                 if result["shares_held"] is None:
                     result["shares_held"] = int(val)
 
-    def diagnose_xbrl(self, zip_content: bytes) -> dict:
+    def diagnose_xbrl(self, zip_content: ZipSource) -> dict:
         """Diagnostic: return detailed info about XBRL ZIP contents and parsing.
 
         Used by the debug endpoint to troubleshoot XBRL parsing issues.
@@ -912,67 +1392,48 @@ class EdinetClient:
         }
 
         try:
-            with zipfile.ZipFile(io.BytesIO(zip_content)) as zf:
+            with _open_zip(zip_content) as zf:
                 info["zip_valid"] = True
                 all_files = zf.namelist()
                 info["files"] = all_files
 
                 info["xbrl_files"], info["htm_files"] = _discover_xbrl_files(all_files)
+                # Members inflated for sampling, reused by the parse below
+                preloaded: dict[str, bytes] = {}
 
                 # Sample elements from .xbrl files
                 for xf in info["xbrl_files"][:1]:
                     try:
-                        tree = etree.fromstring(zf.read(xf))
+                        preloaded[xf] = zf.read(xf)
+                        tree = _parse_xml(preloaded[xf])
                         elements = []
-                        for elem in tree.iter():
-                            local = elem.xpath("local-name()")
-                            if any(kw in local for kw in (
-                                "Shareholding", "Ratio", "Issuer", "Holder",
-                                "Filer", "Security", "Share", "Purpose",
-                            )):
+                        # iter(etree.Element) drops comments / PIs in C
+                        for elem in tree.iter(etree.Element):
+                            local = elem.tag.rpartition("}")[2]
+                            if _DIAG_KEYWORD_RE.search(local):
                                 elements.append({
                                     "tag": local,
                                     "text": (elem.text or "")[:100],
                                     "contextRef": elem.get("contextRef", ""),
                                 })
-                        info["xbrl_sample_elements"] = elements[:50]
+                                if len(elements) >= 50:
+                                    break
+                        info["xbrl_sample_elements"] = elements
                     except Exception as e:
                         info["xbrl_sample_elements"] = [{"error": str(e)}]
 
                 # Sample elements from .htm files (inline XBRL)
-                # Use XML parser (same as _extract_inline_via_xml) to preserve namespaces
+                # iterparse with a namespace tag filter: libxml2 skips the
+                # (far more numerous) XHTML nodes without calling into Python.
                 for hf in info["htm_files"][:1]:
                     try:
-                        htm_bytes = zf.read(hf)
-                        tree = etree.fromstring(htm_bytes)
-                        elements = []
-                        for elem in tree.iter():
-                            tag = elem.tag if isinstance(elem.tag, str) else ""
-                            # Check for ix:nonFraction / ix:nonNumeric via namespace URI
-                            if "inlineXBRL" in tag:
-                                local_tag = tag.rsplit("}", 1)[-1] if "}" in tag else tag
-                                name = elem.get("name", "")
-                                text = "".join(elem.itertext()).strip()
-                                elements.append({
-                                    "tag": local_tag,
-                                    "name": name,
-                                    "text": text[:200],
-                                    "contextRef": elem.get("contextRef", ""),
-                                    "format": elem.get("format", ""),
-                                    "scale": elem.get("scale", ""),
-                                })
-                        info["htm_sample_elements"] = elements[:80]
+                        htm_bytes = preloaded[hf] = zf.read(hf)
+                        info["htm_sample_elements"] = _sample_inline_elements(htm_bytes, 80)
                     except etree.XMLSyntaxError:
                         # Fallback: use regex to show what's in the file
                         text = htm_bytes.decode("utf-8", errors="replace")
-                        nf_matches = re.findall(
-                            r'<[^>]*:nonFraction[^>]*name=["\']([^"\']+)["\'][^>]*>(.*?)</[^>]*:nonFraction>',
-                            text, re.DOTALL,
-                        )
-                        nn_matches = re.findall(
-                            r'<[^>]*:nonNumeric[^>]*name=["\']([^"\']+)["\'][^>]*>(.*?)</[^>]*:nonNumeric>',
-                            text, re.DOTALL,
-                        )
+                        nf_matches = _DIAG_NONFRACTION_RE.findall(text)
+                        nn_matches = _DIAG_NONNUMERIC_RE.findall(text)
                         elements = []
                         for name, val in nf_matches:
                             elements.append({"tag": "nonFraction(regex)", "name": name, "text": val.strip()[:200]})
@@ -982,8 +1443,10 @@ class EdinetClient:
                     except Exception as e:
                         info["htm_sample_elements"] = [{"error": str(e)}]
 
-                # Run actual parse
-                info["parse_result"] = self.parse_xbrl_for_holding_data(zip_content)
+                # Run actual parse on the open archive (no second inflate)
+                info["parse_result"] = self._holding_data_from_zip(
+                    zf, info["xbrl_files"], info["htm_files"], preloaded,
+                )
 
         except zipfile.BadZipFile:
             info["zip_valid"] = False
@@ -992,6 +1455,10 @@ class EdinetClient:
 
         return info
 
+    async def adiagnose_xbrl(self, zip_content: ZipSource) -> dict:
+        """Run diagnose_xbrl() in a worker thread."""
+        return await asyncio.to_thread(self.diagnose_xbrl, zip_content)
+
     # ------------------------------------------------------------------
     # 有価証券報告書 / 四半期報告書 parsing for company fundamentals
     # ------------------------------------------------------------------
@@ -1008,7 +1475,7 @@ class EdinetClient:
             logger.error("Failed to fetch all document list: %s", e)
             return []
 
-    def parse_xbrl_for_company_info(self, zip_content: bytes) -> dict:
+    def parse_xbrl_for_company_info(self, zip_content: ZipSource) -> dict:
         """Parse 有価証券報告書 / 四半期報告書 XBRL for company fundamentals.
 
         Extracts:
@@ -1019,23 +1486,21 @@ class EdinetClient:
         These values come from the official financial statements submitted
         to 金融庁 via EDINET — the most authoritative source.
         """
-        result = {
-            "shares_outstanding": None,
-            "net_assets": None,
-            "company_name": None,
-        }
+        result = dict(_EMPTY_COMPANY_INFO)
 
         try:
-            with zipfile.ZipFile(io.BytesIO(zip_content)) as zf:
-                xbrl_files = [
-                    f for f in zf.namelist()
-                    if f.endswith(".xbrl") and "PublicDoc" in f
-                ]
-                if not xbrl_files:
+            with _open_zip(zip_content) as zf:
+                # Only the first PublicDoc instance is read, so stop at it
+                xbrl_info = next(
+                    (i for i in zf.infolist()
+                     if i.filename.endswith(".xbrl") and "PublicDoc" in i.filename),
+                    None,
+                )
+                if xbrl_info is None:
                     return result
 
-                xbrl_content = zf.read(xbrl_files[0])
-                result = self._extract_company_info(xbrl_content)
+                with zf.open(xbrl_info) as fp:
+                    result = self._extract_company_info(fp)
         except zipfile.BadZipFile:
             logger.warning("Invalid ZIP for company info parsing")
         except Exception as e:
@@ -1043,75 +1508,92 @@ class EdinetClient:
 
         return result
 
-    def _extract_company_info(self, xbrl_bytes: bytes) -> dict:
-        """Extract company fundamentals from 有報/四半期 XBRL."""
-        result = {
-            "shares_outstanding": None,
-            "net_assets": None,
-            "company_name": None,
-        }
+    async def aparse_xbrl_for_company_info(self, zip_content: ZipSource) -> dict:
+        """Run parse_xbrl_for_company_info() in a worker thread."""
+        return await asyncio.to_thread(self.parse_xbrl_for_company_info, zip_content)
 
+    def _extract_company_info(self, xbrl_source: bytes | IO[bytes]) -> dict:
+        """Extract company fundamentals from 有報/四半期 XBRL (bytes or a binary file)."""
         try:
-            tree = etree.fromstring(xbrl_bytes)
+            name_index = _index_xbrl_facts(xbrl_source, _COMPANY_INDEX_RE)
         except etree.XMLSyntaxError as e:
             logger.warning("XBRL XML parse error: %s", e)
-            return result
-
-        # --- 発行済株式数 (Shares Outstanding) ---
-        # XBRL elements in 有報: NumberOfIssuedSharesXxx, TotalNumberOfIssuedShares
-        shares_patterns = [
-            "NumberOfIssuedSharesTotalNumberOfSharesEtcRegularShares",
-            "TotalNumberOfIssuedShares",
-            "NumberOfIssuedShares",
-            "IssuedSharesTotalNumber",
-        ]
-        for pattern in shares_patterns:
-            elements = tree.xpath(
-                f"//*[contains(local-name(), '{pattern}')]"
-            )
-            for elem in elements:
-                try:
-                    val = int(float(elem.text.strip()))
-                    context_ref = elem.get("contextRef", "")
-                    # Take "Current" / "Instant" context, skip "Prior"
-                    if "Prior" not in context_ref and "Previous" not in context_ref:
-                        if result["shares_outstanding"] is None or val > result["shares_outstanding"]:
-                            result["shares_outstanding"] = val
-                except (ValueError, AttributeError):
-                    continue
-            if result["shares_outstanding"] is not None:
-                break
+            return dict(_EMPTY_COMPANY_INFO)
 
-        # --- 純資産 (Net Assets / Total Equity) ---
-        result["net_assets"] = _find_first_int(tree, [
-            "NetAssets",
-            "EquityAttributableToOwnersOfParent",
-            "TotalEquity",
-            "ShareholdersEquity",
-        ])
+        return self._company_info_from_index(name_index)
 
-        # --- 会社名 (Company Name) ---
-        result["company_name"] = _find_first_text(tree, [
-            "CompanyName",
-            "FilerName",
-        ])
+    def _company_info_from_index(self, name_index: dict[str, list]) -> dict:
+        """Extract company fundamentals from an XBRL fact index."""
+        result = dict(_EMPTY_COMPANY_INFO)
+        # Same FieldSpec engine as the holding-report extractor
+        result.update(_extract_fields(name_index, _COMPANY_FIELD_SPECS))
 
         logger.debug("Extracted company info: %s", result)
         return result
 
+    def parse_xbrl_all(self, zip_content: ZipSource) -> tuple[dict, dict]:
+        """Parse holding data and company info from one ZIP in a single pass.
+
+        Equivalent to calling parse_xbrl_for_holding_data() and
+        parse_xbrl_for_company_info(), but the XBRL instance is indexed once
+        for both.  Returns (holding_data, company_info).
+        """
+        holding = dict(_EMPTY_HOLDING)
+        company = dict(_EMPTY_COMPANY_INFO)
+
+        try:
+            with _open_zip(zip_content) as zf:
+                xbrl_files, htm_files = _discover_xbrl_files(zf.namelist())
+                name_index = None
+                if xbrl_files:
+                    try:
+                        with zf.open(xbrl_files[0]) as fp:
+                            name_index = _index_xbrl_facts(fp, _ALL_INDEX_RE)
+                    except etree.XMLSyntaxError as e:
+                        logger.warning("XBRL XML parse error: %s", e)
+                        name_index = {}
+                    # Company info only ever comes from a PublicDoc instance
+                    if "PublicDoc" in xbrl_files[0]:
+                        company = self._company_info_from_index(name_index)
+                holding = self._holding_data_from_zip(
+                    zf, xbrl_files, htm_files, xbrl_index=name_index,
+                )
+        except zipfile.BadZipFile:
+            logger.warning("Invalid ZIP file received from EDINET")
+        except Exception as e:
+            logger.error("XBRL parsing error: %s", e)
+
+        return holding, company
+
+    async def aparse_xbrl_all(self, zip_content: ZipSource) -> tuple[dict, dict]:
+        """Run parse_xbrl_all() in a worker thread."""
+        return await asyncio.to_thread(self.parse_xbrl_all, zip_content)
+
 
 # ---------------------------------------------------------------------------
 # Helper functions for inline XBRL element name matching
 # ---------------------------------------------------------------------------
 
-def _name_contains_any(name: str, patterns: tuple[str, ...], exclude: tuple[str, ...] = ()) -> bool:
+def _compile_any(patterns: tuple[str, ...]) -> re.Pattern:
+    """Compile substring patterns into one alternation regex.
+
+    A single C-level search over the name replaces a Python loop of
+    ``in`` checks, one per pattern.
+    """
+    return re.compile("|".join(re.escape(p) for p in patterns))
+
+
+def _name_contains_any(name: str, patterns: re.Pattern, exclude: re.Pattern | None = None) -> bool:
     """Check if name contains any of the patterns and none of the exclusions."""
-    if exclude and any(skip in name for skip in exclude):
+    if exclude is not None and exclude.search(name):
         return False
-    return any(p in name for p in patterns)
+    return patterns.search(name) is not None
 
 _RATIO_PATTERNS = ("HoldingRatio", "ShareholdingRatio", "RatioOfShareholdingToTotalIssuedShares", "RatioOfShareCertificatesEtc")
 _RATIO_EXCLUDE = ("Abstract", "EachLargeShareholder", "JointHolder")
+# First-pass exclusions for _XBRL_RATIO_PATTERNS; the broad "HoldingRatio"
+# fallback uses _RATIO_EXCLUDE, which also skips JointHolder facts
+_RATIO_PRIMARY_EXCLUDE = ("Abstract", "EachLargeShareholder")
 _SHARES_PATTERNS = ("TotalNumberOfShareCertificatesEtcHeld", "TotalNumberOfSharesHeld", "NumberOfShareCertificatesEtc", "NumberOfStocksEtc")
 _HOLDER_PATTERNS = ("NameOfLargeShareholdingReporter", "NameOfFiler", "ReporterName", "LargeShareholderName")
 _TARGET_PATTERNS = ("IssuerNameLargeShareholding", "IssuerName", "NameOfIssuer", "TargetCompanyName")
@@ -1119,42 +1601,110 @@ _SEC_CODE_PATTERNS = ("SecurityCodeOfIssuer", "IssuerSecuritiesCode", "SecurityC
 _PURPOSE_PATTERNS = ("PurposeOfHolding",)
 _FUND_SOURCE_PATTERNS = ("DescriptionOfFundsForAcquisition", "FundsForAcquisition", "SourceOfFunds", "BreakdownOfAcquisitionFunds", "AcquisitionFund")
 
+_RATIO_RE = _compile_any(_RATIO_PATTERNS)
+_RATIO_EXCLUDE_RE = _compile_any(_RATIO_EXCLUDE)
+_ABSTRACT_RE = _compile_any(("Abstract",))
+_SHARES_RE = _compile_any(_SHARES_PATTERNS)
+_HOLDER_RE = _compile_any(_HOLDER_PATTERNS)
+_TARGET_RE = _compile_any(_TARGET_PATTERNS)
+_SEC_CODE_RE = _compile_any(_SEC_CODE_PATTERNS)
+_PURPOSE_RE = _compile_any(_PURPOSE_PATTERNS)
+_FUND_SOURCE_RE = _compile_any(_FUND_SOURCE_PATTERNS)
+
+# The _matches_* classifiers are pure functions of the element name, and a
+# filing repeats the same few hundred names many times — memoise them.
+@functools.lru_cache(maxsize=4096)
 def _matches_ratio_pattern(name: str) -> bool:
-    return _name_contains_any(name, _RATIO_PATTERNS, _RATIO_EXCLUDE)
+    return _name_contains_any(name, _RATIO_RE, _RATIO_EXCLUDE_RE)
 
+@functools.lru_cache(maxsize=4096)
 def _matches_shares_pattern(name: str) -> bool:
-    return _name_contains_any(name, _SHARES_PATTERNS, ("Abstract",))
+    return _name_contains_any(name, _SHARES_RE, _ABSTRACT_RE)
 
+@functools.lru_cache(maxsize=4096)
 def _matches_holder_pattern(name: str, full_qname: str = "") -> bool:
-    if _name_contains_any(name, _HOLDER_PATTERNS):
+    if _name_contains_any(name, _HOLDER_RE):
         return True
     return name == "Name" and ("jplvh" in full_qname or "lvh" in full_qname)
 
+@functools.lru_cache(maxsize=4096)
 def _matches_target_pattern(name: str) -> bool:
-    return _name_contains_any(name, _TARGET_PATTERNS)
+    return _name_contains_any(name, _TARGET_RE)
 
+@functools.lru_cache(maxsize=4096)
 def _matches_sec_code_pattern(name: str) -> bool:
-    return _name_contains_any(name, _SEC_CODE_PATTERNS)
+    return _name_contains_any(name, _SEC_CODE_RE)
 
+@functools.lru_cache(maxsize=4096)
 def _matches_purpose_pattern(name: str) -> bool:
-    return _name_contains_any(name, _PURPOSE_PATTERNS)
+    return _name_contains_any(name, _PURPOSE_RE)
 
 
+@functools.lru_cache(maxsize=4096)
 def _matches_fund_source_pattern(name: str) -> bool:
     """Match fund source / acquisition funding elements."""
-    return _name_contains_any(name, _FUND_SOURCE_PATTERNS)
+    return _name_contains_any(name, _FUND_SOURCE_RE)
 
 
+@functools.lru_cache(maxsize=4096)
 def _matches_joint_holder_name_pattern(name: str) -> bool:
     """Match joint holder name elements."""
     return ("JointHolder" in name and "Name" in name and "Abstract" not in name)
 
 
+@functools.lru_cache(maxsize=4096)
 def _matches_joint_holder_ratio_pattern(name: str) -> bool:
     """Match joint holder ratio elements."""
     return ("JointHolder" in name and ("Ratio" in name or "HoldingRatio" in name) and "Abstract" not in name)
 
 
+
+# Field dispatch for ix elements.  One memoised lookup per element name
+# replaces walking the if/elif ladder of _matches_* checks; the order of
+# the checks below is the precedence when a name matches several families.
+@functools.lru_cache(maxsize=4096)
+def _classify_nonfraction(name: str) -> str | None:
+    """Return "ratio", "shares", "joint_holder_ratio" or None for an ix:nonFraction name."""
+    if _matches_ratio_pattern(name):
+        return "ratio"
+    if _matches_shares_pattern(name):
+        return "shares"
+    if _matches_joint_holder_ratio_pattern(name):
+        return "joint_holder_ratio"
+    return None
+
+
+@functools.lru_cache(maxsize=4096)
+def _classify_nonnumeric(name: str, full_qname: str = "") -> str | None:
+    """Return the result key an ix:nonNumeric name feeds, "joint_holder_name" or None."""
+    if _matches_holder_pattern(name, full_qname):
+        return "holder_name"
+    if _matches_target_pattern(name):
+        return "target_company_name"
+    if _matches_sec_code_pattern(name):
+        return "target_sec_code"
+    if _matches_purpose_pattern(name):
+        return "purpose_of_holding"
+    if _matches_fund_source_pattern(name):
+        return "fund_source"
+    if _matches_joint_holder_name_pattern(name):
+        return "joint_holder_name"
+    return None
+
+# Deletion table for numeric text: separators, every whitespace char (same
+# set as regex \s; none exist above U+3000), 株 and percent signs.
+# str.translate runs in C without a regex VM.
+_NUMBER_STRIP_TABLE = str.maketrans("", "", ",、株%％" + "".join(
+    ch for ch in map(chr, range(0x3001)) if ch.isspace()
+))
+
+
+@functools.lru_cache(maxsize=32)
+def _scale_factor(scale: str) -> int:
+    """Return 10**scale for an ix scale attribute ("3", "6", ... repeat constantly)."""
+    return 10 ** int(scale)
+
+
 def _parse_ix_number(elem, text: str) -> float | None:
     """Parse a numeric value from an inline XBRL element.
 
@@ -1165,20 +1715,16 @@ def _parse_ix_number(elem, text: str) -> float | None:
     - Japanese number formats
     """
     # Clean text: remove commas, spaces, Japanese characters
-    cleaned = re.sub(r"[,、\s　株%％]", "", text)
-    if not cleaned or cleaned == "-" or cleaned == "―":
-        return None
-
-    try:
-        val = float(cleaned)
-    except ValueError:
+    # _safe_float pre-checks the text, so "-" / "―" / junk never raise
+    val = _safe_float(text.translate(_NUMBER_STRIP_TABLE))
+    if val is None:
         return None
 
     # Apply scale attribute (e.g. scale="6" means * 10^6)
     scale = elem.get("scale", "")
     if scale:
         try:
-            val *= 10 ** int(scale)
+            val *= _scale_factor(scale)
         except (ValueError, TypeError):
             logger.warning("Invalid scale attribute '%s' on element %s", scale, elem.tag)
 
@@ -1,10 +1,29 @@
+import atexit
 import logging
 import logging.config
+import logging.handlers
 import os
+import queue
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def _stop_listener() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 
 def setup_logging() -> None:
-    """Configure structured logging for the application."""
+    """Configure structured logging for the application.
+
+    Records are only enqueued on the calling thread; a QueueListener thread
+    formats them and writes to stdout, so a slow terminal or log collector
+    never stalls the event loop.
+    """
+    global _listener
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
 
     config = {
@@ -36,3 +55,22 @@ def setup_logging() -> None:
     }
 
     logging.config.dictConfig(config)
+
+    # Swap the console handler for a queue in front of it
+    root = logging.getLogger()
+    console = root.handlers[0]
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    for logger in (root, logging.getLogger("uvicorn.access")):
+        logger.removeHandler(console)
+        logger.addHandler(queue_handler)
+
+    # Re-configuring (e.g. a reload) replaces the previous listener
+    _stop_listener()
+    _listener = logging.handlers.QueueListener(log_queue, console)
+    _listener.start()
+
+
+# Stopped at interpreter exit rather than in the app lifespan, so uvicorn's
+# own shutdown messages (logged after lifespan ends) are still written
+atexit.register(_stop_listener)
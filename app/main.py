@@ -2,7 +2,9 @@
 
 import asyncio
 import logging
+import time
 from contextlib import asynccontextmanager
+from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -26,13 +28,18 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application startup/shutdown lifecycle."""
     logger.info(
-        "Starting EDINET Monitor — DB: %s, poll: %ds",
+        "Starting EDINET Monitor — DB: %s, poll: %ds, loop: %s",
         "in-memory" if ":memory:" in settings.DATABASE_URL
         else settings.DATABASE_URL.split("///")[-1],
         settings.POLL_INTERVAL,
+        type(asyncio.get_running_loop()).__module__,
     )
     await init_db()
     logger.info("Database initialized")
+    # Python 3.12+: run new tasks eagerly up to their first await, so
+    # short-lived ones that finish synchronously never hit the ready queue
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
     poller_task = asyncio.create_task(run_poller())
     logger.info("Background poller started")
     yield
@@ -65,25 +72,50 @@ for r in (stream.router, filings.router, filings.documents_router, stats.router,
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
-_index_html_cache: str | None = None
+_INDEX_HTML_PATH = Path("static/index.html")
+_INDEX_HTML_RECHECK = 2.0  # seconds between mtime checks
+# (checked_at, mtime_ns, body) — kept as bytes so each response skips
+# the str → UTF-8 encode
+_index_html_cache: tuple[float, int, bytes] | None = None
+
+
+def _load_index_html(cached: tuple[float, int, bytes] | None) -> tuple[int, bytes]:
+    """Stat index.html and re-read it only if it changed (worker thread)."""
+    mtime = _INDEX_HTML_PATH.stat().st_mtime_ns
+    if cached is not None and cached[1] == mtime:
+        return mtime, cached[2]
+    return mtime, _INDEX_HTML_PATH.read_bytes()
 
 
 @app.get("/", response_class=HTMLResponse)
 async def index():
-    """Serve the main dashboard (cached in memory after first read)."""
+    """Serve the main dashboard from memory, picking up edits to the file.
+
+    --reload only watches *.py, so the file's mtime is re-checked at most
+    every _INDEX_HTML_RECHECK seconds; the stat and any re-read run in a
+    worker thread so disk I/O never stalls the event loop (and SSE).
+    """
     global _index_html_cache
-    if _index_html_cache is None:
+    now = time.monotonic()
+    cached = _index_html_cache
+    if cached is None or now - cached[0] >= _INDEX_HTML_RECHECK:
         try:
-            with open("static/index.html", "r", encoding="utf-8") as f:
-                _index_html_cache = f.read()
+            mtime, body = await asyncio.to_thread(_load_index_html, cached)
         except FileNotFoundError:
             return HTMLResponse(
                 content="<h1>Dashboard not found</h1><p>static/index.html is missing</p>",
                 status_code=500,
             )
-    return HTMLResponse(content=_index_html_cache)
+        cached = _index_html_cache = (now, mtime, body)
+    return HTMLResponse(content=cached[2])
 
 
 if __name__ == "__main__":
+    import sys
+
     import uvicorn
-    uvicorn.run("app.main:app", host=settings.HOST, port=settings.PORT, reload=True)
+    # uvloop / httptools ship with uvicorn[standard] (uvloop is not built for Windows)
+    uvicorn.run(
+        "app.main:app", host=settings.HOST, port=settings.PORT, reload=True,
+        loop="auto" if sys.platform == "win32" else "uvloop", http="httptools",
+    )
@@ -1,9 +1,20 @@
-from datetime import datetime
+from datetime import UTC, datetime
+from operator import attrgetter
 
-from sqlalchemy import Boolean, DateTime, Float, Index, Integer, String, Text, func
+from sqlalchemy import DDL, Boolean, DateTime, Float, Index, Integer, String, Text, column, event, func, table
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.database import Base
+from app.database import SQLITE_FTS5_TRIGRAM, Base
+
+
+def _utcnow() -> datetime:
+    """Naive UTC now, matching what the CURRENT_TIMESTAMP server default stores.
+
+    Used as the client-side default for created_at, so ORM inserts send the
+    value with the INSERT and to_dict() never needs it fetched back (no
+    RETURNING or refresh); server_default still covers raw SQL inserts.
+    """
+    return datetime.now(UTC).replace(tzinfo=None)
 
 
 class Filing(Base):
@@ -12,8 +23,6 @@ class Filing(Base):
     __tablename__ = "filings"
     __table_args__ = (
         Index("ix_filings_submit_amendment", "submit_date_time", "is_amendment"),
-        # XBRL retry query: WHERE xbrl_flag=True AND xbrl_parsed=False ORDER BY id
-        Index("ix_filings_xbrl_retry", "xbrl_flag", "xbrl_parsed", "id"),
         # Watchlist matching: target_sec_code lookups with submit_date_time ordering
         Index("ix_filings_target_sec_submit", "target_sec_code", "submit_date_time"),
         # Search filters: holder_name and target_company_name used in LIKE queries
@@ -93,62 +102,88 @@ class Filing(Base):
 
     # Internal
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, server_default=func.now()
+        DateTime, default=_utcnow, server_default=func.now()
     )
     xbrl_parsed: Mapped[bool] = mapped_column(Boolean, default=False)
 
     def to_dict(self) -> dict:
-        ratio_change = None
-        if self.holding_ratio is not None and self.previous_holding_ratio is not None:
-            ratio_change = round(
-                self.holding_ratio - self.previous_holding_ratio, 2
-            )
-
-        return {
-            "id": self.id,
-            "doc_id": self.doc_id,
-            "edinet_code": self.edinet_code,
-            "filer_name": self.filer_name,
-            "sec_code": self.sec_code,
-            "doc_type_code": self.doc_type_code,
-            "doc_description": self.doc_description,
-            "subject_edinet_code": self.subject_edinet_code,
-            "issuer_edinet_code": self.issuer_edinet_code,
-            "holding_ratio": self.holding_ratio,
-            "previous_holding_ratio": self.previous_holding_ratio,
-            "ratio_change": ratio_change,
-            "holder_name": self.holder_name,
-            "target_company_name": self.target_company_name,
-            "target_sec_code": self.target_sec_code,
-            "shares_held": self.shares_held,
-            "purpose_of_holding": self.purpose_of_holding,
-            "joint_holders": self.joint_holders,
-            "fund_source": self.fund_source,
-            "submit_date_time": self.submit_date_time,
-            "period_start": self.period_start,
-            "period_end": self.period_end,
-            "xbrl_flag": self.xbrl_flag,
-            "pdf_flag": self.pdf_flag,
-            "english_doc_flag": self.english_doc_flag,
-            "parent_doc_id": self.parent_doc_id,
-            "withdrawal_status": self.withdrawal_status,
-            "is_amendment": self.is_amendment,
-            "is_special_exemption": self.is_special_exemption,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "xbrl_parsed": self.xbrl_parsed,
-            # PDF proxy — tries EDINET API v2, then disclosure2dl,
-            # then redirects to the EDINET viewer website.
-            "pdf_url": f"/api/documents/{self.doc_id}/pdf"
-            if self.doc_id and self.pdf_flag
-            else None,
-            # Direct link to the EDINET viewer website
-            "edinet_url": (
-                f"https://disclosure2.edinet-fsa.go.jp/WZEK0040.aspx"
-                f"?{self.doc_id},,,"
-            )
-            if self.doc_id
-            else None,
-        }
+        d = dict(zip(_FILING_DICT_COLS, _get_filing_cols(self)))
+        holding_ratio = d["holding_ratio"]
+        previous_holding_ratio = d["previous_holding_ratio"]
+        d["ratio_change"] = (
+            round(holding_ratio - previous_holding_ratio, 2)
+            if holding_ratio is not None and previous_holding_ratio is not None
+            else None
+        )
+        created_at = self.created_at
+        d["created_at"] = created_at.isoformat() if created_at else None
+        doc_id = d["doc_id"]
+        # PDF proxy — tries EDINET API v2, then disclosure2dl,
+        # then redirects to the EDINET viewer website.
+        d["pdf_url"] = f"/api/documents/{doc_id}/pdf" if doc_id and d["pdf_flag"] else None
+        # Direct link to the EDINET viewer website
+        d["edinet_url"] = (
+            f"https://disclosure2.edinet-fsa.go.jp/WZEK0040.aspx?{doc_id},,,"
+            if doc_id
+            else None
+        )
+        return d
+
+
+# Columns Filing.to_dict copies verbatim, fetched with one attrgetter call;
+# the derived keys (ratio_change, created_at, pdf_url, edinet_url) are
+# added after them.
+_FILING_DICT_COLS = (
+    "id", "doc_id", "edinet_code", "filer_name", "sec_code", "doc_type_code",
+    "doc_description", "subject_edinet_code", "issuer_edinet_code",
+    "holding_ratio", "previous_holding_ratio", "holder_name",
+    "target_company_name", "target_sec_code", "shares_held",
+    "purpose_of_holding", "joint_holders", "fund_source", "submit_date_time",
+    "period_start", "period_end", "xbrl_flag", "pdf_flag", "english_doc_flag",
+    "parent_doc_id", "withdrawal_status", "is_amendment",
+    "is_special_exemption", "xbrl_parsed",
+)
+_get_filing_cols = attrgetter(*_FILING_DICT_COLS)
+
+
+# XBRL retry queries: WHERE xbrl_flag IS true AND xbrl_parsed IS false ORDER
+# BY id.  Partial, so it holds only the (few) pending rows instead of every
+# filing; the predicate is built from the same .is_() expressions the
+# queries use so both SQLite and PostgreSQL can prove the index applies.
+_XBRL_PENDING = Filing.xbrl_flag.is_(True) & Filing.xbrl_parsed.is_(False)
+Index("ix_filings_xbrl_pending", Filing.id, sqlite_where=_XBRL_PENDING, postgresql_where=_XBRL_PENDING)
+
+# Indexes replaced by the ones above; dropped from existing databases at startup
+SUPERSEDED_INDEXES = ("ix_filings_xbrl_retry",)
+
+# SQLite FTS5 shadow index over the columns list_filings searches with
+# LIKE '%term%'.  The trigram tokenizer indexes every 3-character window,
+# so MATCH finds arbitrary substrings — Japanese names have no word
+# boundaries for a word tokenizer to split on.  External content: the text
+# lives only in `filings`; the triggers keep the index in step.
+FILINGS_FTS_COLUMNS = ("filer_name", "holder_name", "target_company_name", "doc_description")
+_FTS_COLS = ", ".join(FILINGS_FTS_COLUMNS)
+_FTS_NEW = ", ".join(f"new.{c}" for c in FILINGS_FTS_COLUMNS)
+_FTS_OLD = ", ".join(f"old.{c}" for c in FILINGS_FTS_COLUMNS)
+FILINGS_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS filings_fts USING fts5({_FTS_COLS}, "
+    "content='filings', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS filings_fts_ai AFTER INSERT ON filings BEGIN "
+    f"INSERT INTO filings_fts(rowid, {_FTS_COLS}) VALUES (new.id, {_FTS_NEW}); END",
+    "CREATE TRIGGER IF NOT EXISTS filings_fts_ad AFTER DELETE ON filings BEGIN "
+    f"INSERT INTO filings_fts(filings_fts, rowid, {_FTS_COLS}) "
+    f"VALUES ('delete', old.id, {_FTS_OLD}); END",
+    f"CREATE TRIGGER IF NOT EXISTS filings_fts_au AFTER UPDATE OF {_FTS_COLS} ON filings BEGIN "
+    f"INSERT INTO filings_fts(filings_fts, rowid, {_FTS_COLS}) "
+    f"VALUES ('delete', old.id, {_FTS_OLD}); "
+    f"INSERT INTO filings_fts(rowid, {_FTS_COLS}) VALUES (new.id, {_FTS_NEW}); END",
+)
+if SQLITE_FTS5_TRIGRAM:
+    for _stmt in FILINGS_FTS_DDL:
+        event.listen(Filing.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+
+# Query-side handle: filings_fts.rowid and the hidden MATCH column
+filings_fts = table("filings_fts", column("rowid"), column("filings_fts"))
 
 
 class CompanyInfo(Base):
@@ -254,7 +289,7 @@ class TenderOffer(Base):
 
     # Internal
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, server_default=func.now()
+        DateTime, default=_utcnow, server_default=func.now()
     )
 
     # Derived classification
@@ -313,7 +348,7 @@ class Watchlist(Base):
     sec_code: Mapped[str | None] = mapped_column(String(10), nullable=True, index=True)
     company_name: Mapped[str] = mapped_column(String(256))
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, server_default=func.now()
+        DateTime, default=_utcnow, server_default=func.now()
     )
 
     def to_dict(self) -> dict:
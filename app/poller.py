@@ -2,17 +2,17 @@
 
 import asyncio
 import collections
-import json
 import logging
 import re
 import time
 from datetime import date, datetime
 
-from sqlalchemy import func, select
+import orjson
+from sqlalchemy import select, update
 
 from app.config import JST, settings
 from app.database import async_session
-from app.edinet import edinet_client
+from app.edinet import ZipSource, edinet_client
 from app.models import CompanyInfo, Filing, TenderOffer
 
 logger = logging.getLogger(__name__)
@@ -53,13 +53,29 @@ async def _get_existing_ids(session, id_column, doc_ids: list[str]) -> set[str]:
     return existing
 
 
-class JsonEncoder(json.JSONEncoder):
-    """JSON encoder that handles datetime and other types."""
+def _json_default(obj):
+    """orjson fallback: serialise anything else with an isoformat() method.
+
+    date/datetime/time are handled natively by orjson.
+    """
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
 
-    def default(self, obj):
-        if hasattr(obj, "isoformat"):
-            return obj.isoformat()
-        return super().default(obj)
+
+def _put_drop_oldest(q: asyncio.Queue, message: bytes) -> bool:
+    """Enqueue ``message``, evicting the oldest item if ``q`` is full.
+
+    Returns False if an item had to be evicted.  No await between the
+    get and the put, so on the event loop the put always succeeds.
+    """
+    try:
+        q.put_nowait(message)
+        return True
+    except asyncio.QueueFull:
+        q.get_nowait()
+        q.put_nowait(message)
+        return False
 
 
 class SSEBroadcaster:
@@ -74,6 +90,7 @@ class SSEBroadcaster:
     """
 
     _CLIENT_MAX_AGE = 3600  # 1 hour in seconds
+    _CLIENT_QUEUE_SIZE = 256  # per-client backlog before oldest frames are dropped
     _EVENT_BUFFER_SIZE = 200  # keep last N events for replay
 
     def __init__(self):
@@ -81,8 +98,8 @@ class SSEBroadcaster:
         self._clients: dict[int, tuple[asyncio.Queue, float]] = {}  # client_id -> (queue, last_active)
         self._next_id: int = 0
         self._event_id: int = 0  # monotonic event ID for SSE reconnection
-        # Ring buffer: deque of (event_id, formatted_message)
-        self._event_buffer: collections.deque[tuple[int, str]] = collections.deque(
+        # Ring buffer: deque of (event_id, encoded_message)
+        self._event_buffer: collections.deque[tuple[int, bytes]] = collections.deque(
             maxlen=self._EVENT_BUFFER_SIZE
         )
 
@@ -94,24 +111,23 @@ class SSEBroadcaster:
 
         Returns:
             A tuple of (client_id, queue) where the queue is bounded
-            to 100 items.
+            to _CLIENT_QUEUE_SIZE items.  Each item is a complete SSE frame as UTF-8
+            ``bytes`` (shared by every subscriber), ready to be written
+            to the response as-is.
         """
         async with self._lock:
             client_id = self._next_id
             self._next_id += 1
-            q: asyncio.Queue = asyncio.Queue(maxsize=100)
+            q: asyncio.Queue = asyncio.Queue(maxsize=self._CLIENT_QUEUE_SIZE)
             self._clients[client_id] = (q, time.monotonic())
 
-            # Replay missed events from buffer
+            # Replay missed events from buffer (the newest win if they
+            # do not all fit)
             if last_event_id is not None:
-                replayed = 0
                 for eid, message in self._event_buffer:
                     if eid > last_event_id:
-                        try:
-                            q.put_nowait(message)
-                            replayed += 1
-                        except asyncio.QueueFull:
-                            break
+                        _put_drop_oldest(q, message)
+                replayed = q.qsize()
                 if replayed:
                     logger.info(
                         "SSE client %d: replayed %d missed events (from id %d)",
@@ -134,30 +150,46 @@ class SSEBroadcaster:
         """Broadcast an event to all connected SSE clients.
 
         Each event gets a unique monotonic ID for reconnection support.
-        If a client's queue is full, the client is dropped with a warning.
-        Events are also stored in a ring buffer for replay on reconnection.
+        The SSE frame is encoded to bytes once and the same object is
+        handed to every client with ``put_nowait``, so the fan-out never
+        suspends and the response layer has nothing to re-encode per
+        connection. If a client's queue is full, its oldest pending frame
+        is discarded to make room: a burst costs a slow client some
+        history rather than its connection (and a reconnect storm).
+        Events are also stored in a ring buffer for replay on
+        reconnection.
         """
-        payload = json.dumps(data, cls=JsonEncoder, ensure_ascii=False)
-        dead: list[int] = []
+        # orjson emits UTF-8 bytes directly, so the frame is assembled
+        # without a str round-trip.  OPT_NON_STR_KEYS keeps json.dumps'
+        # acceptance of int/date dict keys.
+        payload = orjson.dumps(data, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+        event_bytes = event.encode()
         async with self._lock:
             self._event_id += 1
-            now = time.monotonic()
-            message = f"id: {self._event_id}\nevent: {event}\ndata: {payload}\n\n"
+            message = b"id: %d\nevent: %b\ndata: %b\n\n" % (
+                self._event_id, event_bytes, payload,
+            )
             self._event_buffer.append((self._event_id, message))
-            for client_id, (q, _last_active) in self._clients.items():
-                try:
-                    q.put_nowait(message)
-                    # Update last-activity timestamp so active clients
-                    # are not evicted by _cleanup_stale()
+            clients = list(self._clients.items())
+
+        # Fan out on the snapshot, outside the lock, so subscribe/unsubscribe
+        # are never held up by a long client list.  Nothing here awaits, so
+        # frames still reach every queue in event-id order.
+        now = time.monotonic()
+        for client_id, (q, _last_active) in clients:
+            if _put_drop_oldest(q, message):
+                # Update last-activity timestamp so active clients are not
+                # evicted by _cleanup_stale() (unless they left meanwhile)
+                if client_id in self._clients:
                     self._clients[client_id] = (q, now)
-                except asyncio.QueueFull:
-                    logger.warning(
-                        "SSE client %d queue full, dropping client",
-                        client_id,
-                    )
-                    dead.append(client_id)
-            for client_id in dead:
-                del self._clients[client_id]
+            else:
+                # Not refreshed: a client that never catches up is
+                # still evicted once it has been stuck for
+                # _CLIENT_MAX_AGE
+                logger.warning(
+                    "SSE client %d queue full, dropped its oldest event",
+                    client_id,
+                )
 
     async def _cleanup_stale(self) -> None:
         """Remove clients idle longer than _CLIENT_MAX_AGE (no events delivered)."""
@@ -176,10 +208,19 @@ class SSEBroadcaster:
     def client_count(self) -> int:
         return len(self._clients)
 
+    @property
+    def last_event_id(self) -> int:
+        """ID of the most recent broadcast; changes whenever anything is published."""
+        return self._event_id
+
 
 broadcaster = SSEBroadcaster()
 
 _TARGET_RE = re.compile(r"[（(]([^）)]+?)(?:株式|株券)[）)]")
+# Target company in a TOB docDescription (see _poll_tender_offers)
+_TOB_TARGET_RE = re.compile(r"[（(]([^）)]+?(?:株式会社|株式|Inc\.|Ltd\.))[）)]")
+# docDescription marker of 特例報告 (special-exemption reports by institutions)
+_SPECIAL_MARK = "特例対象"
 
 
 def _apply_pre_enrichment(filing: Filing) -> None:
@@ -192,6 +233,44 @@ def _apply_pre_enrichment(filing: Filing) -> None:
             filing.target_company_name = m.group(1)
 
 
+class _StartGate:
+    """Space the starts of concurrent operations at least ``interval`` apart.
+
+    Concurrency alone would fire the first N downloads at the same
+    instant; EDINET asks clients not to burst.  Callers await ``wait()``
+    right before each request, and starts are handed out in order.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def wait(self, interval: float) -> None:
+        async with self._lock:
+            delay = self._next_start - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_start = time.monotonic() + interval
+
+
+# One gate for every XBRL download (new filings, retries, company info),
+# so back-to-back passes in the same poll tick stay spaced as well
+_download_gate = _StartGate()
+
+
+async def _download_xbrl_paced(doc_id: str, timeout: float = 30.0) -> ZipSource | None:
+    """Cached XBRL ZIP path, or a download spaced by _download_gate.
+
+    Cache hits never reach EDINET, so they skip the gate.  ``timeout``
+    covers the download only, not the wait for a start slot.
+    """
+    cached = await edinet_client.cached_xbrl_path(doc_id)
+    if cached is not None:
+        return cached
+    await _download_gate.wait(settings.XBRL_MIN_INTERVAL)
+    return await asyncio.wait_for(edinet_client.download_xbrl(doc_id), timeout=timeout)
+
+
 _poll_lock: asyncio.Lock | None = None
 
 
@@ -256,9 +335,7 @@ async def _poll_edinet_impl(target_date=None):
         all_doc_ids = [doc.get("docID") for doc in filings if doc.get("docID")]
         existing_ids = await _get_existing_ids(session, Filing.doc_id, all_doc_ids) if all_doc_ids else set()
 
-        # Separate filings into batch-insertable (no XBRL) and XBRL-enrichable
-        batch_filings: list[Filing] = []
-        xbrl_docs: list[Filing] = []
+        new_filings: list[Filing] = []
 
         for doc in filings:
             doc_id = doc.get("docID")
@@ -267,7 +344,7 @@ async def _poll_edinet_impl(target_date=None):
 
             doc_description = doc.get("docDescription", "")
             is_amendment = doc.get("docTypeCode") == "360"
-            is_special = "特例対象" in (doc_description or "")
+            is_special = doc_description is not None and _SPECIAL_MARK in doc_description
 
             filing = Filing(
                 doc_id=doc_id,
@@ -298,44 +375,58 @@ async def _poll_edinet_impl(target_date=None):
             )
 
             _apply_pre_enrichment(filing)
+            new_filings.append(filing)
 
-            if filing.xbrl_flag:
-                xbrl_docs.append(filing)
-            else:
-                batch_filings.append(filing)
+        if not new_filings:
+            return
 
-        # Phase 1: Batch insert non-XBRL filings in a single commit
-        if batch_filings:
-            try:
-                session.add_all(batch_filings)
-                await session.flush()
-                await session.commit()
-                for f in batch_filings:
-                    await session.refresh(f)
-                    new_count += 1
-                    await broadcaster.broadcast("new_filing", f.to_dict())
-                    logger.info("New filing: %s - %s -> %s", f.doc_id, f.filer_name, f.doc_description)
-            except Exception as e:
-                logger.error("Batch insert failed: %s", e)
-                await session.rollback()
+        # Phase 1: insert every new filing in one flush (executemany with
+        # RETURNING, so ids and server defaults come back in the same
+        # round-trip) and a single commit.  XBRL enrichment happens
+        # afterwards, so no write transaction is held open across the
+        # rate-limited downloads.
+        session.add_all(new_filings)
+        if not await _safe_commit(session, f"Insert of {len(new_filings)} filings"):
+            return
 
-        # Phase 2: XBRL filings need individual processing (API rate limiting)
-        for i, filing in enumerate(xbrl_docs):
-            try:
-                session.add(filing)
-                await session.flush()
+        # Detach the stored rows: a failed enrichment commit below rolls
+        # back and would otherwise expire every object in the session
+        session.expunge_all()
 
-                if i > 0:
-                    await asyncio.sleep(3.0)
-                await _enrich_from_xbrl(filing)
-
-                await session.commit()
-                await session.refresh(filing)
-            except Exception as e:
-                logger.error("Failed to store filing %s: %s", filing.doc_id, e)
-                await session.rollback()
+        xbrl_docs: list[Filing] = []
+        for f in new_filings:
+            if f.xbrl_flag:
+                xbrl_docs.append(f)
                 continue
+            new_count += 1
+            await broadcaster.broadcast("new_filing", f.to_dict())
+            logger.info("New filing: %s - %s -> %s", f.doc_id, f.filer_name, f.doc_description)
 
+        # Phase 2: download and parse XBRL concurrently, at most
+        # XBRL_CONCURRENCY in flight (starts are spaced by _download_gate),
+        # then write every result back in one executemany UPDATE (ORM
+        # bulk update by primary key) and commit
+        sem = asyncio.Semaphore(settings.XBRL_CONCURRENCY)
+
+        async def _enrich_bounded(filing: Filing) -> None:
+            async with sem:
+                await _enrich_from_xbrl(filing)
+
+        await asyncio.gather(*(_enrich_bounded(f) for f in xbrl_docs))
+
+        enriched = [f for f in xbrl_docs if f.xbrl_parsed]
+        if enriched:
+            await session.execute(update(Filing), [
+                {
+                    "id": f.id,
+                    "xbrl_parsed": True,
+                    **{field: getattr(f, field) for field in _XBRL_FIELDS},
+                }
+                for f in enriched
+            ])
+            await _safe_commit(session, f"XBRL enrichment of {len(enriched)} filings")
+
+        for filing in xbrl_docs:
             new_count += 1
             await broadcaster.broadcast("new_filing", filing.to_dict())
             logger.info(
@@ -365,27 +456,38 @@ _XBRL_FIELDS = (
 )
 
 
-async def _enrich_from_xbrl(filing: Filing):
+_xbrl_in_flight: set[str] = set()  # doc_ids with an XBRL download under way
+
+
+async def _enrich_from_xbrl(filing: Filing, download_timeout: float = 30.0):
     """Download and parse XBRL to enrich filing data.
 
-    Per EDINET API v2 spec, a delay of several seconds between document
-    downloads is recommended to avoid rate limiting.  The caller is
-    responsible for the inter-request delay; this function handles a
-    single download.
+    Per EDINET API v2 spec, bursts of document downloads should be
+    avoided to stay clear of rate limiting.  Each EDINET download waits on
+    the shared _download_gate; bounding concurrency is left to the caller.
+    ``download_timeout`` bounds the download itself, not that wait.
+
+    A manual /api/poll can overlap the loop's retry pass, so a doc that
+    is already being downloaded is skipped rather than fetched twice.
     """
+    doc_id = filing.doc_id
+    if doc_id in _xbrl_in_flight:
+        logger.debug("XBRL download already in flight for %s, skipping", doc_id)
+        return
+    _xbrl_in_flight.add(doc_id)  # no await since the check, so this is race-free
+
     data = None
 
     try:
-        zip_content = await asyncio.wait_for(
-            edinet_client.download_xbrl(filing.doc_id),
-            timeout=30.0,
-        )
+        zip_content = await _download_xbrl_paced(doc_id, timeout=download_timeout)
         if zip_content:
-            data = edinet_client.parse_xbrl_for_holding_data(zip_content)
+            data = await edinet_client.aparse_xbrl_for_holding_data(zip_content)
     except asyncio.TimeoutError:
-        logger.warning("XBRL download timed out for %s", filing.doc_id)
+        logger.warning("XBRL download timed out for %s", doc_id)
     except Exception as e:
-        logger.error("XBRL download failed for %s: %s", filing.doc_id, e)
+        logger.error("XBRL download failed for %s: %s", doc_id, e)
+    finally:
+        _xbrl_in_flight.discard(doc_id)
 
     if data is None:
         return
@@ -404,82 +506,69 @@ async def _enrich_from_xbrl(filing: Filing):
     )
 
 
-_retry_offset = 0  # rotating offset for fair retry selection
+_retry_last_id = 0  # keyset cursor: the next retry batch starts above this id
 _retry_lock = asyncio.Lock()  # prevent concurrent retry runs
 
 
 async def _retry_xbrl_enrichment():
     """Retry XBRL enrichment for filings that haven't been parsed yet.
 
-    Uses a rotating offset so different filings are attempted each cycle,
-    preventing permanently-unparseable records from starving older ones.
-    Each enrichment is bounded to 10s and the total batch to 30s to
-    avoid stretching the polling interval.
+    Walks the pending rows in id order with a keyset cursor, wrapping
+    around at the end, so different filings are attempted each cycle and
+    permanently-unparseable records cannot starve older ones.  Each
+    download is bounded to 10s (the wait for a start slot on the shared
+    download gate aside), and a slow or failing item costs only its own
+    attempt: the rest of the batch still runs.
 
-    Protected by _retry_lock to prevent concurrent access to _retry_offset.
+    Protected by _retry_lock to prevent concurrent access to _retry_last_id.
     """
-    global _retry_offset
+    global _retry_last_id
 
-    # Use wait_for with timeout=0 equivalent: try to acquire without blocking.
-    # This avoids the TOCTOU race of checking locked() then acquiring separately.
-    try:
-        await asyncio.wait_for(_retry_lock.acquire(), timeout=0)
-    except (asyncio.TimeoutError, TimeoutError):
+    # No await between locked() and acquire(), so nothing can grab the lock
+    # in between.  wait_for(acquire(), timeout=0) cannot be used here: it
+    # wraps acquire() in a task that is never done yet, so it always times out.
+    if _retry_lock.locked():
         logger.debug("XBRL retry already in progress, skipping")
         return
+    await _retry_lock.acquire()
 
     try:
         async with async_session() as session:
-            total_unparsed_result = await session.execute(
-                select(func.count()).select_from(
-                    select(Filing.id)
-                    .where(Filing.xbrl_flag.is_(True), Filing.xbrl_parsed.is_(False))
-                    .subquery()
+            async def _pending_after(last_id: int) -> list[Filing]:
+                # Index seek on ix_filings_xbrl_pending instead of OFFSET's
+                # scan-and-discard
+                result = await session.execute(
+                    select(Filing)
+                    .where(
+                        Filing.xbrl_flag.is_(True),
+                        Filing.xbrl_parsed.is_(False),
+                        Filing.id > last_id,
+                    )
+                    .order_by(Filing.id.asc())
+                    .limit(5)
                 )
-            )
-            total_unparsed = total_unparsed_result.scalar() or 0
-            if total_unparsed == 0:
-                _retry_offset = 0
-                return
-
-            if _retry_offset >= total_unparsed:
-                _retry_offset = 0
+                return list(result.scalars().all())
 
-            result = await session.execute(
-                select(Filing)
-                .where(Filing.xbrl_flag.is_(True), Filing.xbrl_parsed.is_(False))
-                .order_by(Filing.id.asc())
-                .offset(_retry_offset)
-                .limit(5)
-            )
-            filings = result.scalars().all()
+            filings = await _pending_after(_retry_last_id)
+            if not filings and _retry_last_id:
+                # Past the newest pending row: wrap around to the oldest
+                _retry_last_id = 0
+                filings = await _pending_after(0)
             if not filings:
-                _retry_offset = 0
                 return
 
-            _retry_offset += len(filings)
-
             logger.info(
-                "Retrying XBRL enrichment for %d filings (offset=%d, unparsed=%d)",
-                len(filings), _retry_offset - len(filings), total_unparsed,
+                "Retrying XBRL enrichment for %d filings (ids %d-%d)",
+                len(filings), filings[0].id, filings[-1].id,
             )
+            _retry_last_id = filings[-1].id
 
-            async def _enrich_one(filing: Filing):
-                try:
-                    await asyncio.wait_for(_enrich_from_xbrl(filing), timeout=10.0)
-                except asyncio.TimeoutError:
-                    logger.warning("XBRL retry timed out for %s", filing.doc_id)
-                _apply_pre_enrichment(filing)
-
-            # Process sequentially with delay per EDINET API v2 spec recommendation
-            # (several seconds between document downloads to avoid rate limiting)
-            try:
-                for i, f in enumerate(filings):
-                    if i > 0:
-                        await asyncio.sleep(3.0)
-                    await asyncio.wait_for(_enrich_one(f), timeout=15.0)
-            except asyncio.TimeoutError:
-                logger.warning("XBRL retry batch timed out")
+            # Process sequentially; _enrich_from_xbrl spaces the downloads
+            # per EDINET API v2 spec recommendation.  The 10s bound applies
+            # to the download itself: waiting behind a burst of poll
+            # downloads for a start slot does not count against it.
+            for f in filings:
+                await _enrich_from_xbrl(f, download_timeout=10.0)
 
             await _safe_commit(session, "XBRL retry batch")
     finally:
@@ -501,13 +590,16 @@ async def _poll_company_info(target_date: date, all_docs: list | None = None) ->
     if not all_docs:
         return
 
+    # Most selective checks first: the doc type set rejects nearly every
+    # document in the daily list before the status comparisons run.
+    company_doc_types = settings.COMPANY_INFO_DOC_TYPES  # hoisted: O(1) set lookups
     target_docs = [
         doc for doc in all_docs
-        if doc.get("docTypeCode") in settings.COMPANY_INFO_DOC_TYPES
+        if doc.get("docTypeCode") in company_doc_types
+        and doc.get("xbrlFlag") == "1"  # has XBRL data
         and doc.get("secCode")  # must have a securities code
         and doc.get("withdrawalStatus", "0") != "1"  # not withdrawn
         and doc.get("disclosureStatus", "0") == "0"  # disclosed
-        and doc.get("xbrlFlag") == "1"  # has XBRL data
     ]
 
     if not target_docs:
@@ -539,25 +631,19 @@ async def _poll_company_info(target_date: date, all_docs: list | None = None) ->
         from app.routers.stock import get_industry_for_ticker
         await get_industry_for_ticker("")  # triggers code list load
 
-        for i, doc in enumerate(target_docs):
+        for doc in target_docs:
             sec_code = doc["secCode"]
             doc_id = doc.get("docID")
             if not doc_id:
                 continue
 
-            # Rate-limit downloads per EDINET API v2 spec
-            if i > 0:
-                await asyncio.sleep(3.0)
-
             try:
-                zip_content = await asyncio.wait_for(
-                    edinet_client.download_xbrl(doc_id),
-                    timeout=30.0,
-                )
+                # Rate-limited per EDINET API v2 spec (cache hits are not)
+                zip_content = await _download_xbrl_paced(doc_id)
                 if not zip_content:
                     continue
 
-                info = edinet_client.parse_xbrl_for_company_info(zip_content)
+                info = await edinet_client.aparse_xbrl_for_company_info(zip_content)
                 if info.get("shares_outstanding") is None and info.get("net_assets") is None:
                     continue
 
@@ -673,7 +759,7 @@ async def _poll_tender_offers(target_date: date, all_docs: list | None = None) -
             # Extract target company from description (e.g. "公開買付届出書（ソニーグループ株式会社）")
             target_name = None
             desc = doc.get("docDescription", "")
-            m = re.search(r"[（(]([^）)]+?(?:株式会社|株式|Inc\.|Ltd\.))[）)]", desc)
+            m = _TOB_TARGET_RE.search(desc)
             if m:
                 target_name = m.group(1)
 
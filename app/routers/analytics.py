@@ -6,7 +6,7 @@ from fastapi import APIRouter, HTTPException, Path, Query
 from sqlalchemy import case, desc, func, select
 
 from app.config import JST
-from app.deps import get_async_session, normalize_sec_code, validate_edinet_code, validate_sec_code
+from app.deps import get_async_session, normalize_sec_code, parse_date_param, submitted_on, validate_edinet_code, validate_sec_code
 from app.models import CompanyInfo, Filing, TenderOffer
 
 router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
@@ -173,9 +173,8 @@ async def market_movements(
 ) -> dict:
     """Return a market movement summary for a given date."""
     if target_date:
-        try:
-            parsed = date.fromisoformat(target_date)
-        except ValueError:
+        parsed = parse_date_param(target_date)
+        if parsed is None:
             raise HTTPException(
                 status_code=400,
                 detail=f"Invalid date format: {target_date!r} (expected YYYY-MM-DD)",
@@ -185,7 +184,7 @@ async def market_movements(
     date_str = parsed.isoformat()
 
     async with get_async_session()() as session:
-        date_filter = Filing.submit_date_time.startswith(date_str)
+        date_filter = submitted_on(parsed)
 
         # Consolidated query: total, increases, decreases, avg_increase, avg_decrease
         # in a single round-trip using CASE/WHEN aggregation (was 5 separate queries)
@@ -2,31 +2,67 @@
 
 import asyncio
 import hashlib
-import json
 import logging
 import time
+from collections import OrderedDict
 from datetime import date
 
+import orjson
 from fastapi import APIRouter, HTTPException, Query, Request
-from fastapi.responses import JSONResponse, RedirectResponse, Response
-from sqlalchemy import desc, func, or_, select
+from fastapi.responses import JSONResponse, ORJSONResponse, RedirectResponse, Response
+from sqlalchemy import bindparam, desc, func, or_, select
 
+from app.database import filings_fts_ready
 from app.deps import get_async_session, validate_doc_id
 from app.edinet import _looks_like_pdf, edinet_client
-from app.models import Filing
+from app.models import Filing, filings_fts
 
 logger = logging.getLogger(__name__)
 
 # --- Lightweight response cache for /api/filings ---
-_filings_cache: dict[str, tuple[float, str, dict]] = {}  # key -> (ts, etag, data)
+_filings_cache: dict[str, tuple[float, str, bytes]] = {}  # key -> (ts, etag, body)
 _FILINGS_CACHE_TTL = 5.0  # seconds
 
+# --- LRU of encoded /api/filings/{doc_id} bodies ---
+# Only settled filings are cached: once XBRL is parsed (or there is none)
+# a row no longer changes, except through retry_xbrl_enrichment, which
+# evicts its entry.  Unparsed rows may still be enriched by the poller.
+_filing_cache: OrderedDict[str, bytes] = OrderedDict()
+_FILING_CACHE_MAX = 4096
+
+# Fixed query shapes are built once at import; handlers add filters to
+# (or bind values into) these instead of rebuilding the expression tree
+_BASE_FILINGS_Q = select(Filing).order_by(desc(Filing.submit_date_time), desc(Filing.id))
+_FILING_BY_DOC = select(Filing).where(Filing.doc_id == bindparam("doc_id"))
+
 router = APIRouter(prefix="/api/filings", tags=["Filings"])
 
 # Separate router for document proxy (mounted at /api/documents)
 documents_router = APIRouter(prefix="/api/documents", tags=["Documents"])
 
 
+# The trigram index cannot match terms shorter than one trigram
+_FTS_MIN_TERM = 3
+
+
+def _text_search(term: str, *columns, use_fts: bool):
+    """Substring match of ``term`` against any of ``columns``.
+
+    With the filings_fts index available (SQLite with FTS5 trigram, see
+    filings_fts_ready), terms of 3+ characters go through it (an index
+    lookup); otherwise this is the plain OR of
+    LIKE '%term%' predicates, which scans the table.
+    """
+    if use_fts and len(term) >= _FTS_MIN_TERM:
+        # Column filter + quoted phrase: FTS5 syntax in term stays literal
+        phrase = '"' + term.replace('"', '""') + '"'
+        fts_query = "{" + " ".join(c.key for c in columns) + "}: " + phrase
+        return Filing.id.in_(
+            select(filings_fts.c.rowid).where(filings_fts.c.filings_fts.op("MATCH")(fts_query))
+        )
+    return or_(*(c.contains(term) for c in columns))
+
+
 @router.get("")
 async def list_filings(
     request: Request,
@@ -47,13 +83,13 @@ async def list_filings(
     now = time.monotonic()
     cached = _filings_cache.get(cache_key)
     if cached:
-        ts, etag, data = cached
+        ts, etag, body = cached
         if now - ts < _FILINGS_CACHE_TTL:
             # ETag match → 304
             if_none_match = request.headers.get("if-none-match")
             if if_none_match and if_none_match == etag:
                 return Response(status_code=304)
-            body = json.dumps(data, ensure_ascii=False)
+            # Cached as encoded bytes: a hit costs no re-serialisation
             return Response(
                 content=body,
                 media_type="application/json",
@@ -61,7 +97,7 @@ async def list_filings(
             )
 
     async with get_async_session()() as session:
-        query = select(Filing).order_by(desc(Filing.submit_date_time), desc(Filing.id))
+        query = _BASE_FILINGS_Q
 
         if date_from:
             query = query.where(
@@ -71,20 +107,16 @@ async def list_filings(
             query = query.where(
                 Filing.submit_date_time <= date_to.isoformat() + " 23:59:59"
             )
+        use_fts = session.bind.dialect.name == "sqlite" and filings_fts_ready()
         if filer:
-            query = query.where(
-                or_(
-                    Filing.filer_name.contains(filer),
-                    Filing.holder_name.contains(filer),
-                )
-            )
+            query = query.where(_text_search(
+                filer, Filing.filer_name, Filing.holder_name, use_fts=use_fts,
+            ))
         if target:
-            query = query.where(
-                or_(
-                    Filing.target_company_name.contains(target),
-                    Filing.doc_description.contains(target),
-                )
-            )
+            query = query.where(_text_search(
+                target, Filing.target_company_name, Filing.doc_description,
+                use_fts=use_fts,
+            ))
         if sec_code:
             query = query.where(
                 or_(
@@ -95,22 +127,33 @@ async def list_filings(
         if amendment_only:
             query = query.where(Filing.is_amendment.is_(True))
 
-        count_query = select(func.count()).select_from(query.subquery())
-        total = (await session.execute(count_query)).scalar()
-
-        result = await session.execute(query.offset(offset).limit(limit))
-        filings = result.scalars().all()
-
-        data = {
-            "total": total,
-            "offset": offset,
-            "limit": limit,
-            "filings": [f.to_dict() for f in filings],
-        }
-
-    body = json.dumps(data, ensure_ascii=False)
-    etag = '"' + hashlib.md5(body.encode()).hexdigest()[:16] + '"'
-    _filings_cache[cache_key] = (now, etag, data)
+        # One round-trip: COUNT(*) OVER () rides along with each page row.
+        # Rows are streamed and each is encoded as it arrives, so only one
+        # to_dict() is alive at a time rather than the whole page of dicts.
+        rows = await session.stream(
+            query.add_columns(func.count().over().label("total"))
+            .offset(offset).limit(limit)
+        )
+        total = None
+        encoded: list[bytes] = []
+        async for filing, row_total in rows:
+            total = row_total
+            encoded.append(orjson.dumps(filing.to_dict()))
+        if total is None:
+            if offset:
+                # Past the last page there is no row to carry the total
+                count_query = select(func.count()).select_from(query.subquery())
+                total = (await session.execute(count_query)).scalar()
+            else:
+                total = 0
+
+    # Same bytes orjson.dumps({"total", "offset", "limit", "filings"}) gives;
+    # the full body is still assembled because the ETag and cache need it
+    body = b'{"total":%d,"offset":%d,"limit":%d,"filings":[%b]}' % (
+        total, offset, limit, b",".join(encoded),
+    )
+    etag = '"' + hashlib.md5(body).hexdigest()[:16] + '"'
+    _filings_cache[cache_key] = (now, etag, body)
 
     # Evict stale entries if cache grows
     if len(_filings_cache) > 100:
@@ -125,18 +168,27 @@ async def list_filings(
     )
 
 
-@router.get("/{doc_id}")
-async def get_filing(doc_id: str) -> dict:
+@router.get("/{doc_id}", response_class=ORJSONResponse)
+async def get_filing(doc_id: str) -> Response:
     """Get a single filing by document ID."""
     doc_id = validate_doc_id(doc_id)
+    body = _filing_cache.get(doc_id)
+    if body is not None:
+        _filing_cache.move_to_end(doc_id)
+        return Response(content=body, media_type="application/json")
+
     async with get_async_session()() as session:
-        result = await session.execute(
-            select(Filing).where(Filing.doc_id == doc_id)
-        )
+        result = await session.execute(_FILING_BY_DOC, {"doc_id": doc_id})
         filing = result.scalar_one_or_none()
         if not filing:
             raise HTTPException(status_code=404, detail="書類が見つかりません")
-        return filing.to_dict()
+        body = orjson.dumps(filing.to_dict())
+
+    if filing.xbrl_parsed or not filing.xbrl_flag:
+        _filing_cache[doc_id] = body
+        if len(_filing_cache) > _FILING_CACHE_MAX:
+            _filing_cache.popitem(last=False)
+    return Response(content=body, media_type="application/json")
 
 
 # ---------------------------------------------------------------------------
@@ -183,7 +235,7 @@ async def retry_xbrl_enrichment(doc_id: str) -> dict:
 
     async with get_async_session()() as session:
         filing = (await session.execute(
-            select(Filing).where(Filing.doc_id == doc_id)
+            _FILING_BY_DOC, {"doc_id": doc_id}
         )).scalar_one_or_none()
         if not filing:
             raise HTTPException(status_code=404, detail="書類が見つかりません")
@@ -192,12 +244,13 @@ async def retry_xbrl_enrichment(doc_id: str) -> dict:
         if not zip_content:
             raise HTTPException(status_code=502, detail="XBRLダウンロード失敗")
 
-        data = edinet_client.parse_xbrl_for_holding_data(zip_content)
+        data = await edinet_client.aparse_xbrl_for_holding_data(zip_content)
         if not any(v is not None for v in data.values()):
             raise HTTPException(status_code=422, detail="XBRLからデータを抽出できません")
 
         _apply_xbrl_data(filing, data)
         await session.commit()
+        _filing_cache.pop(doc_id, None)
         return {"success": True, "data": data}
 
 
@@ -237,7 +290,7 @@ async def batch_retry_xbrl() -> dict:
                     if not zip_content:
                         processed += 1
                         continue
-                    data = edinet_client.parse_xbrl_for_holding_data(zip_content)
+                    data = await edinet_client.aparse_xbrl_for_holding_data(zip_content)
                     if _apply_xbrl_data(filing, data):
                         enriched += 1
                     # Always mark as parsed to prevent infinite retries
@@ -279,7 +332,7 @@ async def debug_xbrl(doc_id: str) -> dict:
             "doc_id": doc_id,
         }
 
-    return edinet_client.diagnose_xbrl(zip_content)
+    return await edinet_client.adiagnose_xbrl(zip_content)
 
 
 @documents_router.get("/{doc_id}/pdf")
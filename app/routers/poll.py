@@ -8,13 +8,14 @@ from datetime import date as date_type
 from fastapi import APIRouter, Query
 from fastapi.responses import JSONResponse
 
+from app.deps import parse_date_param
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Poll"])
 
 _poll_last_called: float = 0.0
 _POLL_COOLDOWN = 10.0
-_poll_lock = asyncio.Lock()
 
 # Store references to background tasks so they are not garbage-collected mid-execution.
 _background_tasks: set[asyncio.Task] = set()
@@ -34,25 +35,26 @@ async def trigger_poll(
     """Manually trigger an EDINET poll (rate-limited to once per 10s)."""
     global _poll_last_called
 
-    async with _poll_lock:
-        now = time.monotonic()
-        if now - _poll_last_called < _POLL_COOLDOWN:
-            remaining = int(_POLL_COOLDOWN - (now - _poll_last_called))
-            return JSONResponse(
-                {"error": f"レート制限中です。{remaining}秒後に再試行してください"},
-                status_code=429,
-            )
-        _poll_last_called = now
-
-    from app.poller import poll_edinet
-
+    # Validate first so a malformed request does not consume the cooldown
     target_date = None
     if date:
-        try:
-            target_date = date_type.fromisoformat(date)
-        except ValueError:
+        target_date = parse_date_param(date)
+        if target_date is None:
             return JSONResponse({"error": "無効な日付形式です"}, status_code=400)
 
+    # Check-and-set with no await in between: atomic on the event loop,
+    # so concurrent requests cannot both pass without needing a lock
+    now = time.monotonic()
+    if now - _poll_last_called < _POLL_COOLDOWN:
+        remaining = int(_POLL_COOLDOWN - (now - _poll_last_called))
+        return JSONResponse(
+            {"error": f"レート制限中です。{remaining}秒後に再試行してください"},
+            status_code=429,
+        )
+    _poll_last_called = now
+
+    from app.poller import poll_edinet
+
     task = asyncio.create_task(poll_edinet(target_date))
     _background_tasks.add(task)
     task.add_done_callback(_on_poll_done)
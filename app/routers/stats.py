@@ -1,100 +1,117 @@
 """Dashboard statistics endpoint with lightweight TTL cache."""
 
+import asyncio
 import time
 from datetime import date, datetime
 
 from fastapi import APIRouter, Query
-from sqlalchemy import case, desc, func, select
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import Row, and_, case, desc, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from app.config import JST, settings
-from app.deps import get_async_session
+from app.deps import get_async_session, parse_date_param, submitted_on
 from app.models import Filing
 from app.poller import broadcaster
 
 router = APIRouter(tags=["Stats"])
 
-# Lightweight TTL cache for stats responses (avoids hammering DB on every dashboard refresh)
-_stats_cache: dict[str, tuple[float, dict]] = {}
+# Lightweight TTL cache for stats responses (avoids hammering DB on every dashboard refresh).
+# Entries also remember broadcaster.last_event_id: any broadcast (new filing,
+# stats_update) means the DB changed, so the entry is dropped before its TTL.
+_stats_cache: dict[str, tuple[float, int, dict]] = {}
 _STATS_CACHE_TTL = 5.0  # seconds — short enough to feel real-time
 _STATS_CACHE_MAX = 50
 
 
-@router.get("/api/stats")
+async def _fetch_summary(session_factory: async_sessionmaker, today: date) -> Row:
+    """Today's total / new reports / amendments plus the all-time total."""
+    # Conditional aggregates over one table scan
+    date_filter = submitted_on(today)
+    summary_q = select(
+        func.sum(case((date_filter, 1), else_=0)).label("today_total"),
+        func.sum(case(
+            (and_(date_filter, Filing.is_amendment.is_(False)), 1), else_=0,
+        )).label("new_reports"),
+        func.sum(case(
+            (and_(date_filter, Filing.is_amendment.is_(True)), 1), else_=0,
+        )).label("amendments"),
+        func.count(Filing.id).label("total"),
+    )
+    async with session_factory() as session:
+        return (await session.execute(summary_q)).one()
+
+
+async def _fetch_top_filers(session_factory: async_sessionmaker, today: date) -> list[dict]:
+    """The day's ten most active filers."""
+    top_filers_q = (
+        select(
+            Filing.filer_name,
+            Filing.edinet_code,
+            func.count(Filing.id).label("cnt"),
+        )
+        .where(submitted_on(today))
+        .group_by(Filing.filer_name, Filing.edinet_code)
+        .order_by(desc("cnt"))
+        .limit(10)
+    )
+    async with session_factory() as session:
+        rows = await session.execute(top_filers_q)
+        return [
+            {"name": row[0], "edinet_code": row[1], "count": row[2]}
+            for row in rows
+        ]
+
+
+@router.get("/api/stats", response_class=ORJSONResponse)
 async def get_stats(
     target_date: str | None = Query(None, alias="date", description="Date (YYYY-MM-DD)"),
-) -> dict:
+) -> ORJSONResponse:
     """Get statistics for the dashboard."""
-    if target_date:
-        try:
-            today = date.fromisoformat(target_date)
-        except ValueError:
-            today = datetime.now(JST).date()
-    else:
+    today = parse_date_param(target_date) if target_date else None
+    if today is None:
         today = datetime.now(JST).date()
     today_str = today.strftime("%Y-%m-%d")
 
     # Check cache
     now = time.monotonic()
+    event_id = broadcaster.last_event_id
     cached = _stats_cache.get(today_str)
-    if cached and (now - cached[0]) < _STATS_CACHE_TTL:
-        result = cached[1].copy()
+    if cached and (now - cached[0]) < _STATS_CACHE_TTL and cached[1] == event_id:
+        result = cached[2].copy()
         # Always return live client count (not cached)
         result["connected_clients"] = broadcaster.client_count
-        return result
+        return ORJSONResponse(result)
 
-    async with get_async_session()() as session:
-        # Consolidated query: total, new_reports, amendments in a single round-trip
-        date_filter = Filing.submit_date_time.startswith(today_str)
-        summary_q = select(
-            func.count(Filing.id).label("today_total"),
-            func.sum(case(
-                (Filing.is_amendment.is_(False), 1), else_=0,
-            )).label("new_reports"),
-            func.sum(case(
-                (Filing.is_amendment.is_(True), 1), else_=0,
-            )).label("amendments"),
-        ).where(date_filter)
-        summary = (await session.execute(summary_q)).one()
+    # The summary and top-filers queries are independent: run them on
+    # separate sessions (pool connections) so their latencies overlap
+    session_factory = get_async_session()
+    summary, top_filers = await asyncio.gather(
+        _fetch_summary(session_factory, today),
+        _fetch_top_filers(session_factory, today),
+    )
 
-        total = (
-            await session.execute(select(func.count(Filing.id)))
-        ).scalar()
+    result = {
+        "date": today_str,
+        "today_total": summary.today_total or 0,
+        "today_new_reports": summary.new_reports or 0,
+        "today_amendments": summary.amendments or 0,
+        "total_in_db": summary.total,
+        "top_filers": top_filers,
+        "connected_clients": broadcaster.client_count,
+        "poll_interval": settings.POLL_INTERVAL,
+    }
 
-        top_filers_q = (
-            select(
-                Filing.filer_name,
-                Filing.edinet_code,
-                func.count(Filing.id).label("cnt"),
-            )
-            .where(date_filter)
-            .group_by(Filing.filer_name, Filing.edinet_code)
-            .order_by(desc("cnt"))
-            .limit(10)
-        )
-        top_filers_result = await session.execute(top_filers_q)
-        top_filers = [
-            {"name": row[0], "edinet_code": row[1], "count": row[2]}
-            for row in top_filers_result
+    # Evict expired / oldest entries to prevent unbounded growth
+    if len(_stats_cache) >= _STATS_CACHE_MAX:
+        expired = [
+            k for k, (ts, eid, _) in _stats_cache.items()
+            if now - ts > _STATS_CACHE_TTL or eid != event_id
         ]
-
-        result = {
-            "date": today_str,
-            "today_total": summary.today_total or 0,
-            "today_new_reports": summary.new_reports or 0,
-            "today_amendments": summary.amendments or 0,
-            "total_in_db": total,
-            "top_filers": top_filers,
-            "connected_clients": broadcaster.client_count,
-            "poll_interval": settings.POLL_INTERVAL,
-        }
-
-        # Evict expired / oldest entries to prevent unbounded growth
+        for k in expired:
+            del _stats_cache[k]
         if len(_stats_cache) >= _STATS_CACHE_MAX:
-            expired = [k for k, (ts, _) in _stats_cache.items() if now - ts > _STATS_CACHE_TTL]
-            for k in expired:
-                del _stats_cache[k]
-            if len(_stats_cache) >= _STATS_CACHE_MAX:
-                oldest_key = min(_stats_cache, key=lambda k: _stats_cache[k][0])
-                del _stats_cache[oldest_key]
-        _stats_cache[today_str] = (now, result)
-        return result
+            oldest_key = min(_stats_cache, key=lambda k: _stats_cache[k][0])
+            del _stats_cache[oldest_key]
+    _stats_cache[today_str] = (now, event_id, result)
+    return ORJSONResponse(result)
@@ -98,6 +98,30 @@ _edinet_code_list: dict[str, dict[str, str]] = {}
 _edinet_code_list_loaded = False
 
 
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+
+def _decode_csv_bytes(raw: bytes, encoding: str | None = None) -> str:
+    """Decode an EDINET CSV payload.
+
+    Callers that know the encoding pass it and skip detection.  Otherwise:
+    a UTF-8 BOM wins; then strict UTF-8, which fails fast on the first
+    cp932 lead byte and, unlike cp932, cannot "succeed" on text in the
+    other encoding and silently produce mojibake; then cp932 (the
+    documented encoding); finally UTF-8 with replacement characters.
+    """
+    if encoding is not None:
+        return raw.decode(encoding, errors="replace")
+    if raw.startswith(_UTF8_BOM):
+        return raw[len(_UTF8_BOM):].decode("utf-8", errors="replace")
+    for enc in ("utf-8", "cp932"):
+        try:
+            return raw.decode(enc)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode("utf-8", errors="replace")
+
+
 async def _load_edinet_code_list() -> None:
     """Fetch the EDINET code list (EdinetcodeDlInfo) and populate the cache.
 
@@ -140,109 +164,115 @@ async def _load_edinet_code_list() -> None:
         _edinet_code_list_loaded = True
         return
 
-    # The response is a ZIP containing EdinetcodeDlInfo.csv
+    # ZIP inflate + cp932 decode + CSV scan of ~10k rows is CPU-bound:
+    # run it in a worker thread so the event loop keeps serving requests.
     try:
-        import zipfile as _zipfile
-
-        with _zipfile.ZipFile(io.BytesIO(resp.content)) as zf:
-            csv_files = [f for f in zf.namelist() if f.endswith(".csv")]
-            if not csv_files:
-                logger.warning("EDINET code list ZIP contains no CSV")
-                _edinet_code_list_loaded = True
-                return
-
-            raw = zf.read(csv_files[0])
-            # Per API v2 spec: encoding is cp932 (Windows-31J).
-            # Try cp932 first, then UTF-8 variants as fallback.
-            for enc in ("cp932", "utf-8-sig", "utf-8"):
-                try:
-                    text = raw.decode(enc)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            else:
-                text = raw.decode("utf-8", errors="replace")
-
-            reader = csv.reader(io.StringIO(text))
-
-            # Per API v2 spec: Row 1 is metadata (download date etc.) — skip it.
-            _metadata_row = next(reader, None)
-
-            # Row 2 is the actual header row with 13 columns.
-            header = next(reader, None)
-            if header is None:
-                _edinet_code_list_loaded = True
-                return
-
-            # Find column indices by matching header names.
-            # Per spec the 13 columns are (0-indexed):
-            #   0: ＥＤＩＮＥＴコード  1: 提出者種別  2: 上場区分
-            #   3: 連結の有無  4: 資本金  5: 決算日  6: 提出者名
-            #   7: 提出者名（英字）  8: 提出者名（ヨミ）  9: 所在地
-            #  10: 提出者業種  11: 証券コード  12: 提出者法人番号
-            # Note: header uses full-width characters (ＥＤＩＮＥＴコード).
-            sec_code_idx = None
-            name_idx = None
-            industry_idx = None
-            for i, col in enumerate(header):
-                col_stripped = col.strip()
-                # Match securities code column (full-width or half-width)
-                if col_stripped in ("証券コード", "証券ｺｰﾄﾞ") or "証券コード" in col_stripped:
-                    sec_code_idx = i
-                # Match submitter name column — take the FIRST "提出者名"
-                # (column 6, Japanese name), not "提出者名（英字）" (column 7)
-                if col_stripped == "提出者名":
-                    name_idx = i
-                # Match industry column
-                if col_stripped == "提出者業種" or "業種" in col_stripped:
-                    industry_idx = i
-
-            # Fallback: try positional mapping per spec if header matching fails
-            if sec_code_idx is None and len(header) >= 12:
-                sec_code_idx = 11  # column 12 (0-indexed: 11)
-            if name_idx is None and len(header) >= 7:
-                name_idx = 6  # column 7 (0-indexed: 6)
-            if industry_idx is None and len(header) >= 11:
-                industry_idx = 10  # column 11 (0-indexed: 10)
-
-            if sec_code_idx is None or name_idx is None:
-                logger.warning(
-                    "Could not find required columns in EDINET code list CSV "
-                    "(header: %s)", header[:13]
-                )
-                _edinet_code_list_loaded = True
-                return
-
-            count = 0
-            for row in reader:
-                if len(row) <= max(sec_code_idx, name_idx):
-                    continue
-                raw_code = row[sec_code_idx].strip()
-                name = row[name_idx].strip()
-                if not raw_code or not name:
-                    continue
-                # Normalise to 4-digit ticker (strip check digit)
-                if len(raw_code) == 5 and raw_code[:4].isdigit():
-                    ticker = raw_code[:4]
-                elif len(raw_code) == 4 and raw_code.isdigit():
-                    ticker = raw_code
-                else:
-                    continue
-                industry = ""
-                if industry_idx is not None and len(row) > industry_idx:
-                    industry = row[industry_idx].strip()
-                _edinet_code_list[ticker] = {"name": name, "industry": industry}
-                count += 1
-
-            logger.info(
-                "Loaded %d companies from EDINET code list (金融庁)", count
-            )
+        entries = await asyncio.to_thread(_parse_edinet_code_list, resp.content)
     except Exception as exc:
         logger.warning("Error parsing EDINET code list: %s", exc)
+    else:
+        _edinet_code_list.update(entries)
+        if entries:
+            logger.info(
+                "Loaded %d companies from EDINET code list (金融庁)", len(entries)
+            )
 
     _edinet_code_list_loaded = True
 
 
+def _parse_edinet_code_list(zip_content: bytes) -> dict[str, dict[str, str]]:
+    """Parse the EdinetcodeDlInfo ZIP into {4-digit ticker: {name, industry}}.
+
+    Returns an empty dict (after logging why) when the archive has no CSV
+    or the required columns cannot be located.
+    """
+    import zipfile as _zipfile
+
+    entries: dict[str, dict[str, str]] = {}
+
+    # The response is a ZIP containing EdinetcodeDlInfo.csv
+    with _zipfile.ZipFile(io.BytesIO(zip_content)) as zf:
+        csv_info = next(
+            (i for i in zf.infolist() if i.filename.endswith(".csv")), None,
+        )
+        if csv_info is None:
+            logger.warning("EDINET code list ZIP contains no CSV")
+            return entries
+
+        # Per API v2 spec: encoding is cp932 (Windows-31J), but detect
+        # rather than assume so a UTF-8 export is not read as mojibake.
+        text = _decode_csv_bytes(zf.read(csv_info))
+
+    reader = csv.reader(io.StringIO(text))
+
+    # Per API v2 spec: Row 1 is metadata (download date etc.) — skip it.
+    _metadata_row = next(reader, None)
+
+    # Row 2 is the actual header row with 13 columns.
+    header = next(reader, None)
+    if header is None:
+        return entries
+
+    # Find column indices by matching header names.
+    # Per spec the 13 columns are (0-indexed):
+    #   0: ＥＤＩＮＥＴコード  1: 提出者種別  2: 上場区分
+    #   3: 連結の有無  4: 資本金  5: 決算日  6: 提出者名
+    #   7: 提出者名（英字）  8: 提出者名（ヨミ）  9: 所在地
+    #  10: 提出者業種  11: 証券コード  12: 提出者法人番号
+    # Note: header uses full-width characters (ＥＤＩＮＥＴコード).
+    sec_code_idx = None
+    name_idx = None
+    industry_idx = None
+    for i, col in enumerate(header):
+        col_stripped = col.strip()
+        # Match securities code column (full-width or half-width)
+        if col_stripped in ("証券コード", "証券ｺｰﾄﾞ") or "証券コード" in col_stripped:
+            sec_code_idx = i
+        # Match submitter name column — take the FIRST "提出者名"
+        # (column 6, Japanese name), not "提出者名（英字）" (column 7)
+        if col_stripped == "提出者名":
+            name_idx = i
+        # Match industry column
+        if col_stripped == "提出者業種" or "業種" in col_stripped:
+            industry_idx = i
+
+    # Fallback: try positional mapping per spec if header matching fails
+    if sec_code_idx is None and len(header) >= 12:
+        sec_code_idx = 11  # column 12 (0-indexed: 11)
+    if name_idx is None and len(header) >= 7:
+        name_idx = 6  # column 7 (0-indexed: 6)
+    if industry_idx is None and len(header) >= 11:
+        industry_idx = 10  # column 11 (0-indexed: 10)
+
+    if sec_code_idx is None or name_idx is None:
+        logger.warning(
+            "Could not find required columns in EDINET code list CSV "
+            "(header: %s)", header[:13]
+        )
+        return entries
+
+    for row in reader:
+        if len(row) <= max(sec_code_idx, name_idx):
+            continue
+        raw_code = row[sec_code_idx].strip()
+        name = row[name_idx].strip()
+        if not raw_code or not name:
+            continue
+        # Normalise to 4-digit ticker (strip check digit)
+        if len(raw_code) == 5 and raw_code[:4].isdigit():
+            ticker = raw_code[:4]
+        elif len(raw_code) == 4 and raw_code.isdigit():
+            ticker = raw_code
+        else:
+            continue
+        industry = ""
+        if industry_idx is not None and len(row) > industry_idx:
+            industry = row[industry_idx].strip()
+        entries[ticker] = {"name": name, "industry": industry}
+
+    return entries
+
+
 async def get_industry_for_ticker(ticker: str) -> str | None:
     """Return the FSA-official industry classification for a 4-digit ticker.
 
@@ -378,18 +408,35 @@ async def _fetch_stooq_history(
     if not text or "No data" in text or "<html" in text[:200].lower():
         return []
 
-    reader = csv.DictReader(io.StringIO(text))
+    reader = csv.reader(io.StringIO(text))
+    header = next(reader, None)
+    if header is None:
+        return []
+
+    # Resolve column positions once from the header instead of building
+    # a DictReader dict per row; a missing column maps to None.
+    positions = {name.strip(): i for i, name in enumerate(header)}
+    date_i, open_i, high_i, low_i, close_i, volume_i = (
+        positions.get(col)
+        for col in ("Date", "Open", "High", "Low", "Close", "Volume")
+    )
+
+    def cell(row: list[str], i: int | None) -> str | None:
+        return row[i] if i is not None and i < len(row) else None
+
     rows: list[dict] = []
     for row in reader:
-        entry: dict = {}
-        entry["date"] = row.get("Date", "")
-        entry["open"] = _parse_float(row.get("Open"))
-        entry["high"] = _parse_float(row.get("High"))
-        entry["low"] = _parse_float(row.get("Low"))
-        entry["close"] = _parse_float(row.get("Close"))
-        entry["volume"] = _parse_int(row.get("Volume"))
-        if entry["date"]:
-            rows.append(entry)
+        row_date = cell(row, date_i)
+        if not row_date:
+            continue
+        rows.append({
+            "date": row_date,
+            "open": _parse_float(cell(row, open_i)),
+            "high": _parse_float(cell(row, high_i)),
+            "low": _parse_float(cell(row, low_i)),
+            "close": _parse_float(cell(row, close_i)),
+            "volume": _parse_int(cell(row, volume_i)),
+        })
 
     # Ensure chronological order (oldest first) for chart rendering
     rows.sort(key=lambda r: r["date"])
@@ -9,6 +9,12 @@ from app.poller import broadcaster
 
 router = APIRouter(tags=["SSE"])
 
+# Fixed SSE frames, pre-encoded so StreamingResponse sends them without a
+# per-yield str.encode()
+_SSE_RETRY = b"retry: 5000\n\n"
+_SSE_CONNECTED = b'event: connected\ndata: {"status": "connected"}\n\n'
+_SSE_KEEPALIVE = b": keepalive\n\n"
+
 
 @router.get("/api/stream")
 async def sse_stream(request: Request) -> StreamingResponse:
@@ -28,20 +34,23 @@ async def sse_stream(request: Request) -> StreamingResponse:
             pass
 
     async def event_generator():
+        # No is_disconnected() polling: on ASGI < 2.4 servers (uvicorn
+        # reports 2.3) StreamingResponse listens for http.disconnect itself
+        # and cancels this generator; on 2.4 servers the next send (at worst
+        # the 30s keepalive) raises and ends the response.
         client_id, queue = await broadcaster.subscribe(last_event_id)
         try:
-            yield "retry: 5000\n\n"
-            yield "event: connected\ndata: {\"status\": \"connected\"}\n\n"
+            yield _SSE_RETRY
+            yield _SSE_CONNECTED
 
             while True:
-                if await request.is_disconnected():
-                    break
-
+                # wait_for cancels the pending get() on timeout and when the
+                # stream is cancelled; a queued item stays in place
                 try:
                     message = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield message
                 except asyncio.TimeoutError:
-                    yield ": keepalive\n\n"
+                    message = _SSE_KEEPALIVE
+                yield message
         finally:
             await broadcaster.unsubscribe(client_id)
 
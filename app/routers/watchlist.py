@@ -1,7 +1,8 @@
 """Watchlist CRUD and watchlist-filings endpoints."""
 
 from fastapi import APIRouter, HTTPException
-from sqlalchemy import desc, func, or_, select
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import bindparam, desc, exists, func, or_, select
 
 from app.deps import get_async_session
 from app.models import Filing, Watchlist
@@ -9,14 +10,18 @@ from app.schemas import WatchlistCreate
 
 router = APIRouter(prefix="/api/watchlist", tags=["Watchlist"])
 
+# Fixed query shapes, built once at import rather than per request
+_WATCHLIST_Q = select(Watchlist).order_by(Watchlist.created_at)
+# Only the three match keys are needed, not full ORM objects
+_WATCHLIST_KEYS_Q = select(Watchlist.sec_code, Watchlist.edinet_code, Watchlist.company_name)
+_WATCHLIST_BY_ID = select(Watchlist).where(Watchlist.id == bindparam("item_id"))
+
 
 @router.get("")
 async def get_watchlist() -> dict:
     """Get the user's watchlist."""
     async with get_async_session()() as session:
-        result = await session.execute(
-            select(Watchlist).order_by(Watchlist.created_at)
-        )
+        result = await session.execute(_WATCHLIST_Q)
         items = result.scalars().all()
         return {"watchlist": [w.to_dict() for w in items]}
 
@@ -34,10 +39,10 @@ async def add_to_watchlist(body: WatchlistCreate) -> dict:
         conditions = [func.lower(Watchlist.company_name) == name.lower()]
         if sec_code:
             conditions.append(Watchlist.sec_code == sec_code)
-        existing = await session.execute(
-            select(Watchlist).where(or_(*conditions))
-        )
-        if existing.scalar_one_or_none():
+        # EXISTS returns one boolean instead of hydrating Watchlist rows, and
+        # cannot raise MultipleResultsFound when the name matches one item
+        # and the code another
+        if await session.scalar(select(exists().where(or_(*conditions)))):
             raise HTTPException(
                 status_code=409,
                 detail="この銘柄は既にウォッチリストに登録されています",
@@ -49,28 +54,31 @@ async def add_to_watchlist(body: WatchlistCreate) -> dict:
             edinet_code=body.edinet_code.strip() if body.edinet_code else None,
         )
         session.add(item)
+        # created_at is filled by its client-side default before the INSERT
+        # and only id comes back via RETURNING; expire_on_commit=False keeps
+        # both loaded, so no refresh() SELECT is needed
         await session.commit()
-        await session.refresh(item)
         return item.to_dict()
 
 
 # Static path MUST be registered before parameterized path
 # to prevent "/api/watchlist/filings" matching "/{item_id}"
-@router.get("/filings")
-async def get_watchlist_filings() -> dict:
+@router.get("/filings", response_class=ORJSONResponse)
+async def get_watchlist_filings() -> ORJSONResponse:
     """Get recent filings matching the watchlist."""
     async with get_async_session()() as session:
-        wl_result = await session.execute(select(Watchlist))
-        watchlist = wl_result.scalars().all()
+        wl_result = await session.execute(_WATCHLIST_KEYS_Q)
+        watchlist = wl_result.all()
 
         if not watchlist:
-            return {"filings": []}
+            return ORJSONResponse({"filings": []})
 
         # Collect unique values for batch IN() queries instead of
-        # individual OR conditions per watchlist item.
+        # individual OR conditions per watchlist item.  Names are
+        # de-duplicated too: each one adds two LIKE predicates.
         sec_codes = {w.sec_code for w in watchlist if w.sec_code}
         edinet_codes = {w.edinet_code for w in watchlist if w.edinet_code}
-        company_names = [w.company_name for w in watchlist if w.company_name]
+        company_names = list(dict.fromkeys(w.company_name for w in watchlist if w.company_name))
 
         conditions = []
         if sec_codes:
@@ -86,28 +94,25 @@ async def get_watchlist_filings() -> dict:
             conditions.append(Filing.filer_name.contains(name))
 
         if not conditions:
-            return {"filings": []}
+            return ORJSONResponse({"filings": []})
 
         query = (
             select(Filing)
             .where(or_(*conditions))
-            .distinct()
             .order_by(desc(Filing.submit_date_time))
             .limit(50)
         )
         result = await session.execute(query)
         filings = result.scalars().all()
 
-        return {"filings": [f.to_dict() for f in filings]}
+        return ORJSONResponse({"filings": [f.to_dict() for f in filings]})
 
 
 @router.delete("/{item_id}")
 async def remove_from_watchlist(item_id: int) -> dict:
     """Remove a company from the watchlist."""
     async with get_async_session()() as session:
-        result = await session.execute(
-            select(Watchlist).where(Watchlist.id == item_id)
-        )
+        result = await session.execute(_WATCHLIST_BY_ID, {"item_id": item_id})
         item = result.scalar_one_or_none()
         if not item:
             raise HTTPException(status_code=404, detail="ウォッチリスト項目が見つかりません")
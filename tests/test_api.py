@@ -110,6 +110,10 @@ async def client(api_session_factory, seed_data):
          patch("app.main.init_db", new_callable=AsyncMock), \
          patch("app.main.run_poller", new_callable=AsyncMock):
         from app.main import app
+        from app.routers.filings import _filing_cache, _filings_cache
+        # doc_ids and query strings repeat across per-test databases
+        _filing_cache.clear()
+        _filings_cache.clear()
         transport = ASGITransport(app=app)
         async with AsyncClient(transport=transport, base_url="http://test") as c:
             yield c
@@ -142,6 +146,15 @@ class TestFilingsAPI:
         assert resp.status_code == 200
         data = resp.json()
         assert len(data["filings"]) == 1
+        assert data["total"] == 3
+
+    @pytest.mark.asyncio
+    async def test_list_filings_offset_past_end_keeps_total(self, client):
+        resp = await client.get("/api/filings?offset=10&limit=10")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["filings"] == []
+        assert data["total"] == 3
 
     @pytest.mark.asyncio
     async def test_filter_by_filer(self, client):
@@ -151,6 +164,51 @@ class TestFilingsAPI:
         assert data["total"] == 1
         assert data["filings"][0]["filer_name"] == "野村アセット"
 
+    @pytest.mark.asyncio
+    async def test_filter_by_filer_mid_name_substring(self, client):
+        """3+ char terms use the trigram index and still match mid-string."""
+        resp = await client.get("/api/filings?filer=アセット")
+        data = resp.json()
+        assert data["total"] == 1
+        assert data["filings"][0]["filer_name"] == "野村アセット"
+
+    @pytest.mark.asyncio
+    async def test_filter_falls_back_to_like_without_fts(self, client, api_engine):
+        """With filings_fts unavailable, search still works via LIKE."""
+        from unittest.mock import patch
+
+        from sqlalchemy import text
+
+        async with api_engine.begin() as conn:
+            for name in ("filings_fts_ai", "filings_fts_ad", "filings_fts_au"):
+                await conn.execute(text(f"DROP TRIGGER {name}"))
+            await conn.execute(text("DROP TABLE filings_fts"))
+
+        with patch("app.routers.filings.filings_fts_ready", return_value=False):
+            resp = await client.get("/api/filings?filer=アセット")
+        assert resp.status_code == 200
+        assert resp.json()["total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_filter_search_syntax_is_literal(self, client):
+        """FTS5 operators and quotes in the term must not raise."""
+        resp = await client.get('/api/filings?filer=a"b OR c*')
+        assert resp.status_code == 200
+        assert resp.json()["total"] == 0
+
+    @pytest.mark.asyncio
+    async def test_filter_index_follows_updates(self, client, api_session_factory):
+        from sqlalchemy import update
+
+        async with api_session_factory() as session:
+            await session.execute(
+                update(Filing).where(Filing.doc_id == "S100API1").values(filer_name="改名ホールディングス", holder_name="改名ホールディングス")
+            )
+            await session.commit()
+
+        assert (await client.get("/api/filings?filer=ホールディングス")).json()["total"] == 1
+        assert (await client.get("/api/filings?filer=アセット")).json()["total"] == 0
+
     @pytest.mark.asyncio
     async def test_filter_by_target(self, client):
         resp = await client.get("/api/filings?target=ソニー")
@@ -182,6 +240,21 @@ class TestFilingsAPI:
         assert data["doc_id"] == "S100API1"
         assert data["holding_ratio"] == 5.12
 
+    @pytest.mark.asyncio
+    async def test_get_filing_caches_only_settled_rows(self, client, api_session_factory):
+        """Rows without pending XBRL are served from the LRU; unparsed ones are re-read."""
+        from sqlalchemy import update
+
+        assert (await client.get("/api/filings/S100API3")).status_code == 200  # no XBRL
+        await client.get("/api/filings/S100API1")  # XBRL not yet parsed
+
+        async with api_session_factory() as session:
+            await session.execute(update(Filing).values(holder_name="changed"))
+            await session.commit()
+
+        assert (await client.get("/api/filings/S100API3")).json()["holder_name"] != "changed"
+        assert (await client.get("/api/filings/S100API1")).json()["holder_name"] == "changed"
+
     @pytest.mark.asyncio
     async def test_get_filing_not_found(self, client):
         resp = await client.get("/api/filings/S100NOTFOUND")
@@ -266,11 +339,26 @@ class TestWatchlistAPI:
         assert data["company_name"] == "ソニーグループ"
         assert data["sec_code"] == "67580"
         assert "id" in data
+        # created_at comes from the client-side default set before the INSERT,
+        # so it is present without a refresh
+        assert data["created_at"] is not None
 
         # Verify it's in the list now
         resp2 = await client.get("/api/watchlist")
         assert len(resp2.json()["watchlist"]) == 2
 
+    @pytest.mark.asyncio
+    async def test_add_to_watchlist_duplicate_matching_two_items(self, client):
+        """A name matching one item and a code matching another is still a 409."""
+        resp = await client.post("/api/watchlist", json={"company_name": "ソニーグループ"})
+        assert resp.status_code == 200
+
+        resp = await client.post(
+            "/api/watchlist",
+            json={"company_name": "ソニーグループ", "sec_code": "72030"},
+        )
+        assert resp.status_code == 409
+
     @pytest.mark.asyncio
     async def test_add_to_watchlist_missing_name(self, client):
         """Pydantic validation should reject missing company_name."""
@@ -387,6 +475,56 @@ class TestSSEEndpoint:
         routes = [r.path for r in app.routes if hasattr(r, "path")]
         assert "/api/stream" in routes
 
+    @pytest.mark.asyncio
+    async def test_sse_stream_delivers_then_stops_on_disconnect(self):
+        """Messages flow until the client disconnects, leaving no pending get()."""
+        import asyncio
+
+        from starlette.requests import Request
+
+        from app.poller import broadcaster
+        from app.routers.stream import sse_stream
+
+        disconnect = asyncio.Event()
+        sent: list[bytes] = []
+        received = asyncio.Event()
+
+        async def receive():
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                sent.append(message.get("body", b""))
+                received.set()
+
+        scope = {"type": "http", "headers": [], "asgi": {"spec_version": "2.3"}}
+        response = await sse_stream(Request(scope, receive))
+        clients = broadcaster.client_count
+        task = asyncio.create_task(response(scope, receive, send))
+
+        while len(sent) < 2:
+            received.clear()
+            await asyncio.wait_for(received.wait(), timeout=1.0)
+        assert sent[0].startswith(b"retry:")
+        assert b"connected" in sent[1]
+        assert broadcaster.client_count == clients + 1
+
+        await broadcaster.broadcast("new_filing", {"doc_id": "S100SSE1"})
+        while len(sent) < 3:
+            received.clear()
+            await asyncio.wait_for(received.wait(), timeout=1.0)
+        assert b"S100SSE1" in sent[2]
+
+        disconnect.set()
+        await asyncio.wait_for(task, timeout=1.0)
+        await asyncio.sleep(0)
+        assert broadcaster.client_count == clients
+        assert not [
+            t for t in asyncio.all_tasks()
+            if not t.done() and "Queue.get" in repr(t.get_coro())
+        ]
+
 
 class TestPollEndpoint:
     """Tests for /api/poll endpoint."""
@@ -415,6 +553,15 @@ class TestPollEndpoint:
         assert resp2.status_code == 429
         assert "レート制限" in resp2.json()["error"]
 
+    @pytest.mark.asyncio
+    async def test_invalid_date_does_not_consume_cooldown(self, client):
+        import app.routers.poll as poll_mod
+        poll_mod._poll_last_called = 0.0
+
+        resp = await client.post("/api/poll?date=not-a-date")
+        assert resp.status_code == 400
+        assert poll_mod._poll_last_called == 0.0
+
 
 class TestPDFProxyEndpoint:
     """Tests for /api/documents/{doc_id}/pdf proxy endpoint."""
@@ -586,6 +733,41 @@ class TestStatsCaching:
         assert data["today_total"] == 3
         assert data["today_new_reports"] == 2  # API1 + API2
         assert data["today_amendments"] == 1  # API3
+        assert data["total_in_db"] == 3
+
+    @pytest.mark.asyncio
+    async def test_stats_cache_dropped_on_broadcast(self, client, api_session_factory):
+        """A broadcast (new filing ingested) should invalidate cached stats."""
+        from app.poller import broadcaster
+
+        first = (await client.get("/api/stats?date=2026-02-19")).json()
+        assert first["today_total"] == 0
+
+        async with api_session_factory() as session:
+            session.add(Filing(
+                doc_id="S100API9", edinet_code="E99999", filer_name="新規",
+                doc_type_code="350", submit_date_time="2026-02-19 09:00",
+                is_amendment=False, is_special_exemption=False,
+            ))
+            await session.commit()
+
+        # Still within the TTL and nothing published: served from cache
+        cached = (await client.get("/api/stats?date=2026-02-19")).json()
+        assert cached["today_total"] == 0
+
+        await broadcaster.broadcast("stats_update", {"new_count": 1})
+        fresh = (await client.get("/api/stats?date=2026-02-19")).json()
+        assert fresh["today_total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stats_other_date_keeps_db_total(self, client):
+        """Day counts follow the date; total_in_db counts every filing."""
+        resp = await client.get("/api/stats?date=2026-02-17")
+        data = resp.json()
+        assert data["today_total"] == 0
+        assert data["today_new_reports"] == 0
+        assert data["today_amendments"] == 0
+        assert data["total_in_db"] == 3
 
 
 class TestTobAPI:
@@ -700,3 +882,79 @@ class TestProfileAPI:
         dates = [t["date"] for t in data["timeline"] if t["date"]]
         assert dates == sorted(dates)
 
+
+
+class TestIndexPage:
+    """Tests for the dashboard page at /."""
+
+    @pytest.mark.asyncio
+    async def test_index_read_once_then_served_from_memory(self, client):
+        import time
+
+        import app.main
+
+        app.main._index_html_cache = None
+        try:
+            resp = await client.get("/")
+            assert resp.status_code == 200
+            assert resp.headers["content-type"].startswith("text/html")
+            assert resp.content == app.main._INDEX_HTML_PATH.read_bytes()
+            assert app.main._index_html_cache[2] == resp.content
+
+            # Within the recheck window the file is not touched at all
+            mtime = app.main._index_html_cache[1]
+            app.main._index_html_cache = (time.monotonic(), mtime, b"<html>cached</html>")
+            assert (await client.get("/")).content == b"<html>cached</html>"
+        finally:
+            app.main._index_html_cache = None
+
+    @pytest.mark.asyncio
+    async def test_index_picks_up_edited_file(self, client, tmp_path):
+        import os
+        from unittest.mock import patch
+
+        import app.main
+
+        page = tmp_path / "index.html"
+        page.write_bytes(b"<html>v1</html>")
+        app.main._index_html_cache = None
+        try:
+            with patch("app.main._INDEX_HTML_PATH", page):
+                assert (await client.get("/")).content == b"<html>v1</html>"
+
+                page.write_bytes(b"<html>v2</html>")
+                st = page.stat()
+                os.utime(page, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+                # Expire the recheck window instead of sleeping through it
+                checked_at, mtime, body = app.main._index_html_cache
+                app.main._index_html_cache = (checked_at - app.main._INDEX_HTML_RECHECK, mtime, body)
+                assert (await client.get("/")).content == b"<html>v2</html>"
+        finally:
+            app.main._index_html_cache = None
+
+
+class TestAppLifespan:
+    """Tests for app construction and the startup/shutdown lifecycle."""
+
+    @pytest.mark.asyncio
+    async def test_lifespan_starts_a_single_poller(self):
+        import asyncio
+        from unittest.mock import AsyncMock, patch
+
+        from starlette.middleware.cors import CORSMiddleware
+
+        from app.main import app, lifespan
+
+        with patch("app.main.init_db", new_callable=AsyncMock) as init_db, \
+             patch("app.main.run_poller", new_callable=AsyncMock) as run_poller, \
+             patch("app.main.edinet_client.close", new_callable=AsyncMock), \
+             patch("app.main.engine", dispose=AsyncMock()):
+            try:
+                async with lifespan(app):
+                    await asyncio.sleep(0)
+            finally:
+                asyncio.get_running_loop().set_task_factory(None)
+
+        init_db.assert_awaited_once()
+        run_poller.assert_awaited_once()
+        assert sum(m.cls is CORSMiddleware for m in app.user_middleware) == 1
@@ -30,6 +30,120 @@ async def test_init_db_creates_tables():
     await engine.dispose()
 
 
+@pytest.mark.asyncio
+async def test_filings_fts_backfilled_on_existing_database():
+    """A filings table created before the FTS index should get it, with its rows."""
+    from sqlalchemy import insert, text
+
+    from app.database import Base, _ensure_filings_fts
+    from app.models import Filing
+
+    engine = create_async_engine("sqlite+aiosqlite://", echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # Simulate a database from before the index existed
+        for name in ("filings_fts_ai", "filings_fts_ad", "filings_fts_au"):
+            await conn.execute(text(f"DROP TRIGGER {name}"))
+        await conn.execute(text("DROP TABLE filings_fts"))
+        await conn.execute(
+            insert(Filing).values(doc_id="S100OLD1", filer_name="旧データ証券株式会社")
+        )
+
+        await _ensure_filings_fts(conn)
+
+        rows = (await conn.execute(text(
+            "SELECT rowid FROM filings_fts WHERE filings_fts MATCH '\"データ証券\"'"
+        ))).all()
+    assert len(rows) == 1
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_init_db_keeps_database_when_fts_setup_fails(tmp_path, monkeypatch):
+    """A failing FTS step must not trigger corruption recovery (file deletion)."""
+    from unittest.mock import AsyncMock
+
+    from sqlalchemy import insert, select
+    from sqlalchemy.exc import OperationalError
+
+    import app.database as database
+    from app.models import Filing
+
+    db_file = tmp_path / "edinet.db"
+    url = f"sqlite+aiosqlite:///{db_file}"
+    engine = create_async_engine(url, echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(database.Base.metadata.create_all)
+        await conn.execute(insert(Filing).values(doc_id="S100KEEP"))
+
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(database.settings, "DATABASE_URL", url)
+    monkeypatch.setattr(database, "_ensure_filings_fts", AsyncMock(
+        side_effect=OperationalError("INSERT INTO filings_fts", {}, Exception("database is locked")),
+    ))
+    monkeypatch.setattr(database, "_filings_fts_ready", True)
+
+    await database.init_db()
+
+    assert db_file.exists()
+    assert database.filings_fts_ready() is False
+    async with engine.connect() as conn:
+        assert (await conn.execute(select(Filing.doc_id))).scalars().all() == ["S100KEEP"]
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_init_db_skips_fts_without_trigram_support(tmp_path, monkeypatch):
+    """Without FTS5 trigram support the FTS step is skipped, not attempted."""
+    from unittest.mock import AsyncMock
+
+    import app.database as database
+
+    url = f"sqlite+aiosqlite:///{tmp_path / 'edinet.db'}"
+    engine = create_async_engine(url, echo=False)
+    ensure = AsyncMock()
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(database.settings, "DATABASE_URL", url)
+    monkeypatch.setattr(database, "SQLITE_FTS5_TRIGRAM", False)
+    monkeypatch.setattr(database, "_ensure_filings_fts", ensure)
+    monkeypatch.setattr(database, "_filings_fts_ready", True)
+
+    await database.init_db()
+
+    ensure.assert_not_awaited()
+    assert database.filings_fts_ready() is False
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_superseded_xbrl_index_replaced_on_existing_database():
+    """The old full (xbrl_flag, xbrl_parsed, id) index gives way to the partial one."""
+    from sqlalchemy import text
+
+    from app.database import Base, _drop_superseded_indexes
+
+    engine = create_async_engine("sqlite+aiosqlite://", echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # Simulate a database created with the previous index definition
+        await conn.execute(text(
+            "CREATE INDEX ix_filings_xbrl_retry ON filings (xbrl_flag, xbrl_parsed, id)"
+        ))
+
+        await _drop_superseded_indexes(conn)
+
+        names = {row[0] for row in await conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'filings'"
+        ))}
+        plan = (await conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM filings "
+            "WHERE xbrl_flag IS 1 AND xbrl_parsed IS 0 ORDER BY id"
+        ))).all()
+    assert "ix_filings_xbrl_retry" not in names
+    assert "ix_filings_xbrl_pending" in plan[-1][-1]
+    await engine.dispose()
+
+
 @pytest.mark.asyncio
 async def test_init_db_indexes_created():
     """init_db should create composite indexes for performance."""
@@ -46,7 +160,7 @@ async def test_init_db_indexes_created():
             lambda sync_conn: inspect(sync_conn).get_indexes("filings")
         )
     index_names = {idx["name"] for idx in indexes}
-    assert "ix_filings_xbrl_retry" in index_names
+    assert "ix_filings_xbrl_pending" in index_names
     assert "ix_filings_target_sec_submit" in index_names
     assert "ix_filings_submit_amendment" in index_names
     await engine.dispose()
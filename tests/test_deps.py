@@ -1,10 +1,13 @@
 """Tests for shared dependencies and validators."""
 
+from datetime import date
+
 import pytest
 from fastapi import HTTPException
 
 from app.deps import (
     normalize_sec_code,
+    parse_date_param,
     validate_doc_id,
     validate_edinet_code,
     validate_sec_code,
@@ -114,3 +117,21 @@ class TestValidateDocId:
         with pytest.raises(HTTPException) as exc_info:
             validate_doc_id("../../../etc/passwd")
         assert exc_info.value.status_code == 400
+
+
+class TestParseDateParam:
+    def test_valid(self):
+        assert parse_date_param("2026-03-01") == date(2026, 3, 1)
+
+    @pytest.mark.parametrize("value", [
+        "2026-13-01",  # right shape, impossible month
+        "2026-02-30",
+        "20260301",  # basic ISO form accepted by fromisoformat on 3.11+
+        "2026-W09-7",
+        "2026-3-1",
+        "2026-03-01\n",
+        "",
+        "yesterday",
+    ])
+    def test_invalid_returns_none(self, value):
+        assert parse_date_param(value) is None
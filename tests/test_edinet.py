@@ -1,5 +1,6 @@
 """Tests for EDINET API client."""
 
+import asyncio
 import io
 import zipfile
 from datetime import date
@@ -55,6 +56,29 @@ SAMPLE_XBRL_MINIMAL = """<?xml version="1.0" encoding="UTF-8"?>
 """.encode("utf-8")
 
 
+SAMPLE_INLINE_XBRL = """<?xml version="1.0" encoding="UTF-8"?>
+<html xmlns="http://www.w3.org/1999/xhtml"
+    xmlns:ix="http://www.xbrl.org/2013/inlineXBRL"
+    xmlns:jplvh_cor="http://disclosure.edinet-fsa.go.jp/taxonomy/jplvh/2023-12-01/jplvh_cor">
+<body>
+  <p>提出者: <ix:nonNumeric name="jplvh_cor:Name" contextRef="FilingDateInstant">インラインキャピタル株式会社</ix:nonNumeric></p>
+  <p>発行者: <ix:nonNumeric name="jplvh_cor:IssuerNameLargeShareholding" contextRef="FilingDateInstant">サンプル工業株式会社</ix:nonNumeric></p>
+  <p>保有割合: <ix:nonFraction name="jplvh_cor:HoldingRatioOfShareCertificatesEtc" contextRef="FilingDateInstant" decimals="2">7.25%</ix:nonFraction></p>
+  <p>前回: <ix:nonFraction name="jplvh_cor:HoldingRatioOfShareCertificatesEtcPerLastReport" contextRef="FilingDateInstant" decimals="2">6.10%</ix:nonFraction></p>
+  <p>株数: <ix:nonFraction name="jplvh_cor:TotalNumberOfShareCertificatesEtcHeld" contextRef="FilingDateInstant" scale="3">1,500</ix:nonFraction>千株</p>
+</body>
+</html>
+""".encode("utf-8")
+
+
+def _make_inline_zip(htm_content: bytes) -> bytes:
+    """Helper to create a ZIP file with an inline XBRL .htm document."""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("XBRL/PublicDoc/0101010_honbun.htm", htm_content)
+    return buf.getvalue()
+
+
 class TestXBRLParsing:
     """Tests for XBRL parsing logic."""
 
@@ -116,6 +140,99 @@ class TestXBRLParsing:
         result = self.client.parse_xbrl_for_holding_data(zip_data)
         assert result["holding_ratio"] is None
 
+    def test_parse_xbrl_with_comment_and_pi_before_root(self):
+        """A comment or processing instruction ahead of the root must not break parsing."""
+        xbrl = SAMPLE_XBRL_MINIMAL.replace(
+            b"?>\n",
+            b'?>\n<!-- generated -->\n<?xml-stylesheet type="text/xsl" href="x.xsl"?>\n',
+            1,
+        )
+        zip_data = _make_xbrl_zip(xbrl)
+        result = self.client.parse_xbrl_for_holding_data(zip_data)
+        assert result["holding_ratio"] == pytest.approx(8.50)
+
+    def test_parse_truncated_xbrl_recovers(self):
+        """Should salvage values from an XBRL instance with a broken tail."""
+        truncated = SAMPLE_XBRL_MINIMAL.replace(b"</xbrli:xbrl>", b"<broken")
+        zip_data = _make_xbrl_zip(truncated)
+        result = self.client.parse_xbrl_for_holding_data(zip_data)
+        assert result["holding_ratio"] == pytest.approx(8.50)
+
+    def test_parse_xbrl_does_not_expand_entities(self):
+        """Should not resolve external entities declared in the document."""
+        xbrl = b"""<?xml version="1.0" encoding="UTF-8"?>
+        <!DOCTYPE xbrl [<!ENTITY xxe SYSTEM "file:///etc/hostname">]>
+        <xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance"
+            xmlns:ns="http://example.com/ns">
+          <ns:NameOfFiler contextRef="Current">&xxe;</ns:NameOfFiler>
+        </xbrli:xbrl>"""
+        zip_data = _make_xbrl_zip(xbrl)
+        result = self.client.parse_xbrl_for_holding_data(zip_data)
+        assert result["holder_name"] is None
+
+    def test_parse_xml_does_not_expand_internal_entities(self):
+        """The DOM parser used for inline XBRL must not expand entities either."""
+        from app.edinet import _parse_xml
+
+        root = _parse_xml(
+            b'<?xml version="1.0"?><!DOCTYPE r [<!ENTITY a "aaaaaaaaaa">]>'
+            b"<r>&a;&a;</r>"
+        )
+        assert "aaaaaaaaaa" not in (root.text or "")
+
+    @pytest.mark.asyncio
+    async def test_aparse_runs_in_worker_thread(self):
+        """Async wrapper should return the same result as the sync parser."""
+        zip_data = _make_xbrl_zip(SAMPLE_XBRL)
+        result = await self.client.aparse_xbrl_for_holding_data(zip_data)
+        assert result == self.client.parse_xbrl_for_holding_data(zip_data)
+
+    def test_parse_from_zip_path_matches_bytes(self, tmp_path):
+        """A ZIP on disk (memory-mapped) should parse exactly like the bytes."""
+        zip_data = _make_xbrl_zip(SAMPLE_XBRL)
+        path = tmp_path / "S100TEST.xbrl.zip"
+        path.write_bytes(zip_data)
+        assert (
+            self.client.parse_xbrl_for_holding_data(path)
+            == self.client.parse_xbrl_for_holding_data(zip_data)
+        )
+
+    def test_parse_inline_xbrl(self):
+        """Should extract fields from inline XBRL (ix:nonFraction / ix:nonNumeric)."""
+        result = self.client.parse_xbrl_for_holding_data(_make_inline_zip(SAMPLE_INLINE_XBRL))
+
+        assert result["holding_ratio"] == pytest.approx(7.25)
+        assert result["previous_holding_ratio"] == pytest.approx(6.10)
+        assert result["holder_name"] == "インラインキャピタル株式会社"
+        assert result["target_company_name"] == "サンプル工業株式会社"
+        assert result["shares_held"] == 1500000
+
+    def test_inline_regex_fallback_stops_once_numeric_fields_filled(self):
+        """Regex fallback should stop scanning once ratios and shares are known."""
+        extra = "".join(
+            f'<ix:nonFraction name="jplvh_cor:Other{i}" contextRef="c">{i}</ix:nonFraction>'
+            for i in range(20)
+        )
+        text = (
+            '<ix:nonFraction name="jplvh_cor:HoldingRatioOfShareCertificatesEtc"'
+            ' contextRef="Current">7.25%</ix:nonFraction>'
+            '<ix:nonFraction name="jplvh_cor:HoldingRatioOfShareCertificatesEtcPerLastReport"'
+            ' contextRef="Current">6.10%</ix:nonFraction>'
+            '<ix:nonFraction name="jplvh_cor:TotalNumberOfShareCertificatesEtcHeld"'
+            ' contextRef="Current">1500</ix:nonFraction>'
+            + extra
+        ).encode()
+        with patch.object(
+            self.client, "_apply_nonfraction_regex",
+            wraps=self.client._apply_nonfraction_regex,
+        ) as apply:
+            result = self.client._extract_inline_via_regex(text)
+
+        assert result["holding_ratio"] == pytest.approx(7.25)
+        assert result["previous_holding_ratio"] == pytest.approx(6.10)
+        assert result["shares_held"] == 1500
+        assert apply.call_count == 3
+
 
 class TestFetchDocumentList:
     """Tests for the document list API call."""
@@ -396,6 +513,120 @@ class TestDownloadPDF:
         assert result is None
 
 
+class TestDownloadMany:
+    """Tests for bounded concurrent downloads."""
+
+    def setup_method(self):
+        self.client = EdinetClient()
+
+    @pytest.mark.asyncio
+    async def test_download_many_bounds_concurrency(self):
+        """Should keep at most `concurrency` downloads in flight."""
+        in_flight = 0
+        peak = 0
+
+        async def fake_download(doc_id):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if doc_id == "BAD":
+                raise RuntimeError("boom")
+            return doc_id.encode()
+
+        ids = [f"S{i}" for i in range(10)] + ["BAD"]
+        with patch.object(self.client, "download_xbrl", side_effect=fake_download):
+            result = await self.client.download_many(ids, "xbrl", concurrency=3)
+
+        assert peak == 3
+        assert list(result) == ids
+        assert result["S0"] == b"S0"
+        assert result["BAD"] is None
+
+    @pytest.mark.asyncio
+    async def test_download_many_rejects_unknown_kind(self):
+        with pytest.raises(ValueError):
+            await self.client.download_many(["S1"], "csv")
+
+
+class TestFetchDocumentLists:
+    """Tests for the multi-date document list fetch."""
+
+    def setup_method(self):
+        self.client = EdinetClient()
+
+    @pytest.mark.asyncio
+    async def test_fetch_document_lists_per_date(self):
+        """Each date maps to its own filings; failures map to []."""
+        d1, d2, d3 = date(2025, 1, 6), date(2025, 1, 7), date(2025, 1, 8)
+        in_flight = 0
+        peak = 0
+
+        async def fake_fetch(target_date):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if target_date == d3:
+                raise httpx.ConnectError("down")
+            return [{"docID": target_date.isoformat()}]
+
+        with patch.object(self.client, "fetch_document_list", side_effect=fake_fetch):
+            result = await self.client.fetch_document_lists([d1, d2, d3], concurrency=2)
+
+        assert peak == 2
+        assert list(result) == [d1, d2, d3]
+        assert result[d1] == [{"docID": "2025-01-06"}]
+        assert result[d3] == []
+
+
+class TestDownloadCache:
+    """Tests for the on-disk document cache."""
+
+    def setup_method(self):
+        self.client = EdinetClient()
+
+    @pytest.mark.asyncio
+    async def test_second_download_is_served_from_disk(self, tmp_path):
+        self.client.cache_dir = tmp_path
+        fetch = AsyncMock(return_value=b"PK" + b"x" * 200)
+        with patch.object(self.client, "_fetch_xbrl", fetch):
+            first = await self.client.download_xbrl("S100ABC1")
+            second = await self.client.download_xbrl("S100ABC1")
+
+        assert first == second
+        fetch.assert_awaited_once_with("S100ABC1")
+        assert (tmp_path / "S100ABC1.xbrl.zip").read_bytes() == first
+
+    @pytest.mark.asyncio
+    async def test_cached_xbrl_path_only_after_a_download(self, tmp_path):
+        self.client.cache_dir = tmp_path
+        assert await self.client.cached_xbrl_path("S100ABC1") is None
+
+        fetch = AsyncMock(return_value=b"PK" + b"x" * 200)
+        with patch.object(self.client, "_fetch_xbrl", fetch):
+            await self.client.download_xbrl("S100ABC1")
+
+        assert await self.client.cached_xbrl_path("S100ABC1") == tmp_path / "S100ABC1.xbrl.zip"
+
+    @pytest.mark.asyncio
+    async def test_failed_download_is_not_cached(self, tmp_path):
+        self.client.cache_dir = tmp_path
+        with patch.object(self.client, "_fetch_pdf", AsyncMock(return_value=None)):
+            assert await self.client.download_pdf("S100ABC1") is None
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_unsafe_doc_id_bypasses_cache(self, tmp_path):
+        self.client.cache_dir = tmp_path
+        fetch = AsyncMock(return_value=b"%PDF-1.4")
+        with patch.object(self.client, "_fetch_pdf", fetch):
+            await self.client.download_pdf("../escape")
+        assert list(tmp_path.iterdir()) == []
+
+
 class TestJointHolderExtraction:
     """Tests for joint holder extraction from XBRL."""
 
@@ -468,3 +699,277 @@ class TestFundSourceExtraction:
         zip_data = _make_xbrl_zip(xbrl.encode("utf-8"))
         result = self.client.parse_xbrl_for_holding_data(zip_data)
         assert result["fund_source"] is None
+
+
+class TestDiagnoseXBRL:
+    """Tests for the XBRL diagnostic helper."""
+
+    def setup_method(self):
+        self.client = EdinetClient()
+
+    def test_diagnose_samples_xbrl_elements(self):
+        """Should list matching XBRL elements by local name."""
+        info = self.client.diagnose_xbrl(_make_xbrl_zip(SAMPLE_XBRL))
+
+        assert info["zip_valid"] is True
+        assert info["xbrl_files"] == ["XBRL/PublicDoc/report.xbrl"]
+        tags = [e["tag"] for e in info["xbrl_sample_elements"]]
+        assert "TotalShareholdingRatioOfShareCertificatesEtc" in tags
+        assert "SecurityCodeOfIssuer" in tags
+        assert "xbrl" not in tags
+        assert info["parse_result"]["holding_ratio"] == pytest.approx(6.25)
+
+    def test_diagnose_caps_xbrl_samples(self):
+        """Should stop at 50 matches and skip comment nodes."""
+        facts = "".join(
+            f'<jplvh_cor:ShareHolder{i} contextRef="c">{i}</jplvh_cor:ShareHolder{i}>'
+            for i in range(80)
+        )
+        xbrl = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance"'
+            ' xmlns:jplvh_cor="http://example.com/jplvh">'
+            f"<!-- ShareholdingComment -->{facts}</xbrli:xbrl>"
+        ).encode()
+        info = self.client.diagnose_xbrl(_make_xbrl_zip(xbrl))
+
+        samples = info["xbrl_sample_elements"]
+        assert len(samples) == 50
+        assert samples[0]["tag"] == "ShareHolder0"
+
+    def test_diagnose_samples_inline_elements(self):
+        """Should list ix:* elements from inline XBRL with their attributes."""
+        info = self.client.diagnose_xbrl(_make_inline_zip(SAMPLE_INLINE_XBRL))
+
+        samples = info["htm_sample_elements"]
+        assert len(samples) == 5
+        names = [e["name"] for e in samples]
+        assert "jplvh_cor:HoldingRatioOfShareCertificatesEtc" in names
+        shares = next(e for e in samples if e["name"].endswith("Held"))
+        assert shares["tag"] == "nonFraction"
+        assert shares["scale"] == "3"
+        assert shares["text"] == "1,500"
+
+
+class TestDiscoverXbrlFiles:
+    """Tests for ZIP entry classification."""
+
+    def test_prefers_public_doc(self):
+        from app.edinet import _discover_xbrl_files
+
+        xbrl, htm = _discover_xbrl_files([
+            "XBRL/AuditDoc/audit.xbrl",
+            "XBRL/PublicDoc/report.xbrl",
+            "XBRL/PublicDoc/0101010_honbun.htm",
+            "XBRL/PublicDoc/cover.xhtml",
+            "XBRL/PublicDoc/style.css",
+        ])
+        assert xbrl == ["XBRL/PublicDoc/report.xbrl"]
+        assert htm == ["XBRL/PublicDoc/0101010_honbun.htm", "XBRL/PublicDoc/cover.xhtml"]
+
+    def test_falls_back_outside_public_doc(self):
+        from app.edinet import _discover_xbrl_files
+
+        xbrl, htm = _discover_xbrl_files([
+            "XBRL/AuditDoc/audit.xbrl",
+            "__MACOSX/XBRL/._report.xbrl",
+            "XBRL/report.xbrl",
+            "XBRL/AuditDoc/audit.htm",
+        ])
+        assert xbrl == ["XBRL/report.xbrl"]
+        assert htm == []
+
+
+class TestSafeFloat:
+    """Tests for the numeric fact pre-check."""
+
+    def test_accepts_plain_numbers(self):
+        from app.edinet import _safe_float
+
+        assert _safe_float(" 5.12 ") == pytest.approx(5.12)
+        assert _safe_float("-3") == -3.0
+        assert _safe_float("1E3") == 1000.0
+
+    def test_rejects_non_numeric_text(self):
+        from app.edinet import _safe_float
+
+        for text in (None, "", "N/A", "1,000", "inf", "nan", "―"):
+            assert _safe_float(text) is None
+
+    def test_parse_ix_number_uses_precheck(self):
+        from lxml import etree
+        from app.edinet import _parse_ix_number
+
+        elem = etree.Element("f", scale="3", sign="-")
+        assert _parse_ix_number(elem, "1,500株") == -1500000.0
+        for text in ("―", "-", "該当なし", "inf"):
+            assert _parse_ix_number(elem, text) is None
+
+
+class TestIndexXbrlFacts:
+    """Tests for the streaming XBRL fact index."""
+
+    def test_keeps_only_wanted_local_names(self):
+        from app.edinet import _HOLDING_INDEX_RE, _index_xbrl_facts
+
+        index = _index_xbrl_facts(SAMPLE_XBRL, _HOLDING_INDEX_RE)
+        assert "context" not in index
+        assert "xbrl" not in index
+        fact = index["TotalShareholdingRatioOfShareCertificatesEtc"][0]
+        assert fact.text == "6.25"
+        assert fact.get("contextRef") == "CurrentPeriod"
+
+    def test_accepts_file_objects(self):
+        from app.edinet import _HOLDING_INDEX_RE, _index_xbrl_facts
+
+        index = _index_xbrl_facts(io.BytesIO(SAMPLE_XBRL), _HOLDING_INDEX_RE)
+        assert "SecurityCodeOfIssuer" in index
+
+    def test_unreadable_input_raises(self):
+        from lxml import etree
+        from app.edinet import _HOLDING_INDEX_RE, _index_xbrl_facts
+
+        with pytest.raises(etree.XMLSyntaxError):
+            _index_xbrl_facts(b"not xml at all", _HOLDING_INDEX_RE)
+
+
+class TestNameMatchers:
+    """Tests for inline XBRL element-name classifiers."""
+
+    def test_ratio_pattern_respects_exclusions(self):
+        from app.edinet import _matches_ratio_pattern
+
+        assert _matches_ratio_pattern("HoldingRatioOfShareCertificatesEtc")
+        assert _matches_ratio_pattern("TotalShareholdingRatioOfShareCertificatesEtc")
+        assert not _matches_ratio_pattern("HoldingRatioOfShareCertificatesEtcAbstract")
+        assert not _matches_ratio_pattern("JointHolder1HoldingRatio")
+        assert not _matches_ratio_pattern("NameOfFiler")
+
+    def test_holder_pattern_plain_name_requires_lvh_namespace(self):
+        from app.edinet import _matches_holder_pattern
+
+        assert _matches_holder_pattern("NameOfFiler")
+        assert _matches_holder_pattern("Name", "jplvh_cor:Name")
+        assert not _matches_holder_pattern("Name", "jpcrp_cor:Name")
+
+    def test_text_field_patterns(self):
+        from app.edinet import (
+            _matches_fund_source_pattern,
+            _matches_purpose_pattern,
+            _matches_sec_code_pattern,
+            _matches_shares_pattern,
+            _matches_target_pattern,
+        )
+
+        assert _matches_target_pattern("IssuerNameLargeShareholding")
+        assert _matches_sec_code_pattern("SecurityCodeOfIssuer")
+        assert _matches_purpose_pattern("PurposeOfHoldingOfShareCertificatesEtc")
+        assert _matches_fund_source_pattern("DescriptionOfFundsForAcquisition")
+        assert _matches_shares_pattern("TotalNumberOfShareCertificatesEtcHeld")
+        assert not _matches_shares_pattern("TotalNumberOfShareCertificatesEtcHeldAbstract")
+
+    def test_classifiers_follow_ladder_precedence(self):
+        from app.edinet import _classify_nonfraction, _classify_nonnumeric
+
+        assert _classify_nonfraction("TotalShareholdingRatioOfShareCertificatesEtc") == "ratio"
+        assert _classify_nonfraction("TotalNumberOfShareCertificatesEtcHeld") == "shares"
+        assert _classify_nonfraction("JointHolder1HoldingRatio") == "joint_holder_ratio"
+        assert _classify_nonfraction("NetAssets") is None
+        # IssuerName* is a target name, not a holder name
+        assert _classify_nonnumeric("IssuerNameLargeShareholding") == "target_company_name"
+        assert _classify_nonnumeric("Name", "jplvh_cor:Name") == "holder_name"
+        assert _classify_nonnumeric("NameOfJointHolder") == "joint_holder_name"
+        assert _classify_nonnumeric("Name", "jpcrp_cor:Name") is None
+
+
+SAMPLE_COMPANY_XBRL = """<?xml version="1.0" encoding="UTF-8"?>
+<xbrli:xbrl
+    xmlns:xbrli="http://www.xbrl.org/2003/instance"
+    xmlns:jpcrp_cor="http://disclosure.edinet-fsa.go.jp/taxonomy/jpcrp/2023-12-01/jpcrp_cor"
+    xmlns:jppfs_cor="http://disclosure.edinet-fsa.go.jp/taxonomy/jppfs/2023-12-01/jppfs_cor">
+  <jpcrp_cor:CompanyNameCoverPage contextRef="FilingDateInstant">サンプル工業株式会社</jpcrp_cor:CompanyNameCoverPage>
+  <jpcrp_cor:TotalNumberOfIssuedSharesSummaryOfBusinessResults contextRef="CurrentYearInstant">12000000</jpcrp_cor:TotalNumberOfIssuedSharesSummaryOfBusinessResults>
+  <jpcrp_cor:TotalNumberOfIssuedSharesSummaryOfBusinessResults contextRef="CurrentYearInstant_NonConsolidatedMember">3000000</jpcrp_cor:TotalNumberOfIssuedSharesSummaryOfBusinessResults>
+  <jpcrp_cor:TotalNumberOfIssuedSharesSummaryOfBusinessResults contextRef="Prior1YearInstant">99000000</jpcrp_cor:TotalNumberOfIssuedSharesSummaryOfBusinessResults>
+  <jppfs_cor:NetAssets contextRef="Prior1YearInstant">4000000000</jppfs_cor:NetAssets>
+  <jppfs_cor:NetAssets contextRef="CurrentYearInstant">5000000000</jppfs_cor:NetAssets>
+</xbrli:xbrl>
+""".encode("utf-8")
+
+
+class TestCompanyInfoParsing:
+    """Tests for 有報/四半期 company fundamentals extraction."""
+
+    def setup_method(self):
+        self.client = EdinetClient()
+
+    def test_parse_company_info(self):
+        """Should take the largest current share count and skip prior periods."""
+        result = self.client.parse_xbrl_for_company_info(_make_xbrl_zip(SAMPLE_COMPANY_XBRL))
+
+        assert result["shares_outstanding"] == 12000000
+        assert result["net_assets"] == 5000000000
+        assert result["company_name"] == "サンプル工業株式会社"
+
+    def test_parse_company_info_no_xbrl(self):
+        """Should return empty fields when the ZIP has no PublicDoc XBRL."""
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("readme.txt", "nothing")
+        result = self.client.parse_xbrl_for_company_info(buf.getvalue())
+
+        assert result == {
+            "shares_outstanding": None,
+            "net_assets": None,
+            "company_name": None,
+        }
+
+    @pytest.mark.parametrize("zip_data", [
+        _make_xbrl_zip(SAMPLE_XBRL),
+        _make_xbrl_zip(SAMPLE_COMPANY_XBRL),
+        _make_inline_zip(SAMPLE_INLINE_XBRL),
+    ], ids=["holding", "company", "inline"])
+    def test_parse_xbrl_all_matches_separate_parsers(self, zip_data):
+        """One combined pass should return what the two parsers return."""
+        holding, company = self.client.parse_xbrl_all(zip_data)
+
+        assert holding == self.client.parse_xbrl_for_holding_data(zip_data)
+        assert company == self.client.parse_xbrl_for_company_info(zip_data)
+
+
+class TestHttpClient:
+    """Tests for the shared httpx client configuration."""
+
+    @pytest.mark.asyncio
+    async def test_client_is_reused_and_advertises_compression(self):
+        client = EdinetClient()
+        try:
+            http = await client._get_client()
+            assert await client._get_client() is http
+            assert "gzip" in http.headers["accept-encoding"]
+            assert http.timeout.connect == 5.0
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_client_recreated_after_close(self):
+        client = EdinetClient()
+        http = await client._get_client()
+        await client.close()
+        try:
+            assert await client._get_client() is not http
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_client_attaches_api_key_to_relative_urls(self):
+        client = EdinetClient()
+        client.api_key = "test-key"
+        try:
+            http = await client._get_client()
+            req = http.build_request("GET", "/documents/S100ABC1", params={"type": 1})
+            assert str(req.url).startswith(f"{client.base_url}/documents/S100ABC1")
+            assert req.url.params["Subscription-Key"] == "test-key"
+            assert req.url.params["type"] == "1"
+        finally:
+            await client.close()
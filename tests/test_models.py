@@ -2,6 +2,7 @@
 
 import pytest
 import pytest_asyncio
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy import select
 
 from app.models import CompanyInfo, Filing, TenderOffer, Watchlist
@@ -55,6 +56,21 @@ async def test_filing_ratio_change_negative():
     assert d["ratio_change"] == pytest.approx(-2.0)
 
 
+@pytest.mark.asyncio
+async def test_filing_created_at_set_client_side(db_session):
+    """created_at is sent with the INSERT, so it is known without a refresh."""
+    from datetime import UTC, datetime, timedelta
+
+    filing = Filing(doc_id="S100NEW1")
+    db_session.add(filing)
+    await db_session.flush()
+
+    assert "created_at" not in sa_inspect(filing).unloaded
+    now = datetime.now(UTC).replace(tzinfo=None)
+    assert now - timedelta(minutes=1) < filing.created_at <= now
+    assert filing.to_dict()["created_at"] == filing.created_at.isoformat()
+
+
 @pytest.mark.asyncio
 async def test_amendment_flag(sample_amendment):
     """Amendment filings should have is_amendment=True."""
@@ -1,6 +1,8 @@
 """Tests for the background poller and SSE broadcaster."""
 
 import asyncio
+import time
+from datetime import date
 
 import pytest
 import pytest_asyncio
@@ -10,7 +12,14 @@ from unittest.mock import AsyncMock, patch, MagicMock
 
 from app.database import Base
 from app.models import Filing
-from app.poller import SSEBroadcaster, broadcaster
+from app.poller import SSEBroadcaster, _StartGate, broadcaster
+
+
+@pytest.fixture(autouse=True)
+def _fresh_download_gate():
+    """Give each test its own gate: no spacing carried over between tests."""
+    with patch("app.poller._download_gate", _StartGate()):
+        yield
 
 
 class TestSSEBroadcaster:
@@ -50,8 +59,8 @@ class TestSSEBroadcaster:
 
         await b.broadcast("test_event", {"message": "hello"})
 
-        msg1 = q1.get_nowait()
-        msg2 = q2.get_nowait()
+        msg1 = q1.get_nowait().decode()
+        msg2 = q2.get_nowait().decode()
         assert msg1 == msg2
         assert "test_event" in msg1
         assert "hello" in msg1
@@ -63,28 +72,32 @@ class TestSSEBroadcaster:
 
         await b.broadcast("new_filing", {"doc_id": "X1"})
 
-        msg = q.get_nowait()
+        msg = q.get_nowait().decode()
         assert "id: " in msg
         assert "event: new_filing\n" in msg
         assert "data:" in msg
-        assert '"doc_id": "X1"' in msg
+        assert '"doc_id":"X1"' in msg
         assert msg.endswith("\n\n")
 
     @pytest.mark.asyncio
-    async def test_broadcast_drops_full_queues(self):
-        """Full queues should be dropped instead of blocking."""
+    async def test_broadcast_full_queue_drops_oldest_event(self):
+        """A full queue loses its oldest frame; the client stays connected."""
         b = SSEBroadcaster()
         # Manually inject a bounded queue to test overflow
         bounded_q = asyncio.Queue(maxsize=2)
         b._clients[999] = (bounded_q, 0.0)
 
         # Fill the queue to capacity
-        bounded_q.put_nowait("msg_1")
-        bounded_q.put_nowait("msg_2")
+        bounded_q.put_nowait(b"msg_1")
+        bounded_q.put_nowait(b"msg_2")
 
-        # This should not raise - it should drop the full client
+        # This should not raise or block
         await b.broadcast("test", {"x": 1})
-        assert b.client_count == 0
+        assert b.client_count == 1
+        assert bounded_q.get_nowait() == b"msg_2"
+        assert b"event: test\n" in bounded_q.get_nowait()
+        # Overflowing does not count as activity for stale eviction
+        assert b._clients[999][1] == 0.0
 
     @pytest.mark.asyncio
     async def test_broadcast_japanese(self):
@@ -94,9 +107,21 @@ class TestSSEBroadcaster:
 
         await b.broadcast("filing", {"name": "テスト証券"})
 
-        msg = q.get_nowait()
+        msg = q.get_nowait().decode()
         assert "テスト証券" in msg
 
+    @pytest.mark.asyncio
+    async def test_broadcast_non_str_keys_and_dates(self):
+        """Payload types the stdlib encoder accepted still serialise."""
+        b = SSEBroadcaster()
+        _id, q = await b.subscribe()
+
+        await b.broadcast("e", {"by_year": {2024: 1}, "day": date(2024, 3, 1)})
+
+        msg = q.get_nowait().decode()
+        assert '"by_year":{"2024":1}' in msg
+        assert '"day":"2024-03-01"' in msg
+
 
 class TestSSEBroadcasterReplay:
     """Tests for SSE event replay via Last-Event-ID."""
@@ -119,9 +144,9 @@ class TestSSEBroadcasterReplay:
         # Subscribe with Last-Event-ID = 1 (should replay events 2 and 3)
         _id, q = await b.subscribe(last_event_id=1)
         assert q.qsize() == 2
-        msg1 = q.get_nowait()
+        msg1 = q.get_nowait().decode()
         assert "id: 2\n" in msg1
-        msg2 = q.get_nowait()
+        msg2 = q.get_nowait().decode()
         assert "id: 3\n" in msg2
 
     @pytest.mark.asyncio
@@ -169,9 +194,11 @@ class TestSSEBroadcasterReplay:
             await b.broadcast("e", {"i": i})
 
         # Subscribe with Last-Event-ID = 0 (tries to replay all 150)
-        # Queue maxsize is 100, so only ~100 should be replayed
+        # into a queue of 100: the newest 100 should be kept
+        b._CLIENT_QUEUE_SIZE = 100
         _id, q = await b.subscribe(last_event_id=0)
         assert q.qsize() == 100  # bounded by queue maxsize
+        assert '"i":50' in q.get_nowait().decode()
 
 
 class TestPollerIntegration:
@@ -195,6 +222,7 @@ class TestPollerIntegration:
                 if r["docTypeCode"] in ("350", "360")
             ]
         )
+        mock_client.cached_xbrl_path = AsyncMock(return_value=None)
         mock_client.download_xbrl = AsyncMock(return_value=None)
 
         import app.poller as _poller_mod
@@ -205,6 +233,8 @@ class TestPollerIntegration:
              patch("app.poller.settings") as mock_settings:
             mock_settings.EDINET_API_KEY = "test"
             mock_settings.LARGE_HOLDING_DOC_TYPES = ["350", "360"]
+            mock_settings.XBRL_CONCURRENCY = 4
+            mock_settings.XBRL_MIN_INTERVAL = 0.0
 
             from app.poller import poll_edinet
             await poll_edinet()
@@ -248,6 +278,7 @@ class TestPollerIntegration:
 
         mock_client = AsyncMock()
         mock_client.fetch_document_list = AsyncMock(return_value=filings_data)
+        mock_client.cached_xbrl_path = AsyncMock(return_value=None)
         mock_client.download_xbrl = AsyncMock(return_value=None)
 
         import app.poller as _poller_mod
@@ -258,6 +289,8 @@ class TestPollerIntegration:
              patch("app.poller.settings") as mock_settings:
             mock_settings.EDINET_API_KEY = "test"
             mock_settings.LARGE_HOLDING_DOC_TYPES = ["350", "360"]
+            mock_settings.XBRL_CONCURRENCY = 4
+            mock_settings.XBRL_MIN_INTERVAL = 0.0
 
             from app.poller import poll_edinet
             # Poll twice
@@ -272,6 +305,76 @@ class TestPollerIntegration:
 
         await engine.dispose()
 
+    @pytest.mark.asyncio
+    async def test_poll_inserts_then_enriches_xbrl_rows(self):
+        """Rows are stored up front; XBRL is fetched concurrently, then UPDATEd."""
+        from tests.conftest import SAMPLE_EDINET_RESPONSE
+
+        engine = create_async_engine("sqlite+aiosqlite://", echo=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        mock_client = AsyncMock()
+        mock_client.fetch_document_list = AsyncMock(
+            return_value=[
+                r for r in SAMPLE_EDINET_RESPONSE["results"]
+                if r["docTypeCode"] in ("350", "360")
+            ]
+        )
+        in_flight = peak = 0
+
+        async def _download(doc_id):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return b"zip"
+
+        mock_client.cached_xbrl_path = AsyncMock(return_value=None)
+        mock_client.download_xbrl = AsyncMock(side_effect=_download)
+        mock_client.aparse_xbrl_for_holding_data = AsyncMock(
+            return_value={"holding_ratio": 7.5, "holder_name": "テスト保有者"}
+        )
+
+        import app.poller as _poller_mod
+        _poller_mod._poll_lock = None  # Reset lock for test isolation
+        b = SSEBroadcaster()
+        _id, q = await b.subscribe()
+
+        with patch("app.poller.async_session", session_factory), \
+             patch("app.poller.edinet_client", mock_client), \
+             patch("app.poller.broadcaster", b), \
+             patch("app.poller.settings") as mock_settings:
+            mock_settings.EDINET_API_KEY = "test"
+            mock_settings.LARGE_HOLDING_DOC_TYPES = ["350", "360"]
+            mock_settings.XBRL_CONCURRENCY = 4
+            mock_settings.XBRL_MIN_INTERVAL = 0.0
+
+            from app.poller import poll_edinet
+            await poll_edinet()
+
+        # Both downloads overlapped instead of running back to back
+        assert peak == 2
+
+        async with session_factory() as session:
+            filings = (await session.execute(select(Filing))).scalars().all()
+            assert len(filings) == 2
+            for f in filings:
+                assert f.xbrl_parsed is True
+                assert f.holding_ratio == 7.5
+                assert f.holder_name == "テスト保有者"
+
+        # One new_filing per row (carrying the XBRL data) plus stats_update
+        messages = [q.get_nowait().decode() for _ in range(q.qsize())]
+        assert sum("event: new_filing" in m for m in messages) == 2
+        assert all('"holding_ratio":7.5' in m for m in messages if "new_filing" in m)
+        assert "event: stats_update" in messages[-1]
+
+        await engine.dispose()
+
 
 class TestSSEBufferWraparound:
     """Tests for SSE ring buffer wraparound edge cases."""
@@ -295,7 +398,7 @@ class TestSSEBufferWraparound:
         # Reconnect: ask for events after ID just before oldest in buffer
         _id, q = await b.subscribe(last_event_id=oldest_event_id - 1)
         # Should get all events in buffer
-        assert q.qsize() == min(buf_size, 100)  # capped by queue maxsize
+        assert q.qsize() == min(buf_size, b._CLIENT_QUEUE_SIZE)  # capped by queue maxsize
 
     @pytest.mark.asyncio
     async def test_ring_buffer_old_last_event_id_replays_all_available(self):
@@ -344,6 +447,43 @@ class TestRetryLock:
         # Both should complete but the lock ensures sequential access
         assert call_count == 2
 
+    @pytest.mark.asyncio
+    async def test_retry_walks_pending_rows_by_id_and_wraps(self):
+        """Each cycle takes the next 5 pending ids, then starts over."""
+        import app.poller as _poller_mod
+
+        engine = create_async_engine("sqlite+aiosqlite://", echo=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_factory() as session:
+            session.add_all([
+                Filing(doc_id=f"S100RT{i:02d}", xbrl_flag=True, xbrl_parsed=(i == 3))
+                for i in range(1, 9)
+            ])
+            await session.commit()
+
+        attempted: list[list[str]] = []
+
+        async def _fake_enrich(filing, **kwargs):
+            attempted[-1].append(filing.doc_id)
+
+        _poller_mod._retry_last_id = 0
+        with patch("app.poller.async_session", session_factory), \
+             patch("app.poller._enrich_from_xbrl", _fake_enrich), \
+             patch("app.poller.asyncio.sleep", new_callable=AsyncMock):
+            for _ in range(3):
+                attempted.append([])
+                await _poller_mod._retry_xbrl_enrichment()
+
+        # S100RT03 is already parsed and never retried
+        assert attempted == [
+            ["S100RT01", "S100RT02", "S100RT04", "S100RT05", "S100RT06"],
+            ["S100RT07", "S100RT08"],
+            ["S100RT01", "S100RT02", "S100RT04", "S100RT05", "S100RT06"],
+        ]
+        await engine.dispose()
+
     @pytest.mark.asyncio
     async def test_retry_skips_when_locked(self):
         """_retry_xbrl_enrichment should skip if already running."""
@@ -355,3 +495,135 @@ class TestRetryLock:
             assert _retry_lock.locked()
             # We can't easily test the skip behavior without mocking
             # the entire DB, but we verify the lock state is correct
+
+
+class TestEnrichInFlight:
+    """Tests for skipping duplicate concurrent XBRL downloads."""
+
+    @pytest.mark.asyncio
+    async def test_same_doc_is_downloaded_once_while_in_flight(self):
+        from app.poller import _enrich_from_xbrl, _xbrl_in_flight
+
+        release = asyncio.Event()
+
+        async def _download(doc_id):
+            await release.wait()
+            return b"zip"
+
+        mock_client = MagicMock()
+        mock_client.cached_xbrl_path = AsyncMock(return_value=None)
+        mock_client.download_xbrl = AsyncMock(side_effect=_download)
+        mock_client.aparse_xbrl_for_holding_data = AsyncMock(
+            return_value={"holding_ratio": 5.5},
+        )
+        first = Filing(doc_id="S100DUP1", xbrl_flag=True, xbrl_parsed=False)
+        second = Filing(doc_id="S100DUP1", xbrl_flag=True, xbrl_parsed=False)
+
+        with patch("app.poller.edinet_client", mock_client):
+            task = asyncio.create_task(_enrich_from_xbrl(first))
+            await asyncio.sleep(0)
+            await _enrich_from_xbrl(second)  # returns at once: already in flight
+            release.set()
+            await task
+
+        assert mock_client.download_xbrl.await_count == 1
+        assert first.xbrl_parsed is True
+        assert second.xbrl_parsed is False
+        assert "S100DUP1" not in _xbrl_in_flight
+
+    @pytest.mark.asyncio
+    async def test_separate_callers_share_the_download_spacing(self):
+        """Back-to-back enrichments from different passes are still spaced."""
+        from app.poller import _enrich_from_xbrl
+
+        starts: list[float] = []
+
+        async def _download(doc_id):
+            starts.append(time.monotonic())
+            return None
+
+        mock_client = MagicMock()
+        mock_client.cached_xbrl_path = AsyncMock(return_value=None)
+        mock_client.download_xbrl = AsyncMock(side_effect=_download)
+        mock_settings = MagicMock()
+        mock_settings.XBRL_MIN_INTERVAL = 0.05
+
+        with patch("app.poller.edinet_client", mock_client), \
+             patch("app.poller.settings", mock_settings):
+            await _enrich_from_xbrl(Filing(doc_id="S100GAP1", xbrl_flag=True))
+            await _enrich_from_xbrl(Filing(doc_id="S100GAP2", xbrl_flag=True))
+
+        assert starts[1] - starts[0] >= 0.045
+
+    @pytest.mark.asyncio
+    async def test_download_timeout_excludes_the_wait_for_a_start_slot(self):
+        """Queuing behind other downloads must not eat into the download timeout."""
+        import app.poller as _poller_mod
+
+        async def _download(doc_id):
+            await asyncio.sleep(0.05)
+            return b"zip"
+
+        mock_client = MagicMock()
+        mock_client.cached_xbrl_path = AsyncMock(return_value=None)
+        mock_client.download_xbrl = AsyncMock(side_effect=_download)
+        mock_client.aparse_xbrl_for_holding_data = AsyncMock(
+            return_value={"holding_ratio": 5.5},
+        )
+        mock_settings = MagicMock()
+        mock_settings.XBRL_MIN_INTERVAL = 0.0
+        filing = Filing(doc_id="S100SLOT", xbrl_flag=True, xbrl_parsed=False)
+
+        # Another download just started: the next slot opens in 0.2s
+        await _poller_mod._download_gate.wait(0.2)
+        with patch("app.poller.edinet_client", mock_client), \
+             patch("app.poller.settings", mock_settings):
+            await _poller_mod._enrich_from_xbrl(filing, download_timeout=0.1)
+
+        assert filing.xbrl_parsed is True
+
+    @pytest.mark.asyncio
+    async def test_cache_hits_skip_the_download_spacing(self, tmp_path):
+        """A cached ZIP never reaches EDINET, so it does not wait on the gate."""
+        from app.poller import _download_xbrl_paced
+
+        cached = tmp_path / "S100HIT1.xbrl.zip"
+        mock_client = MagicMock()
+        mock_client.cached_xbrl_path = AsyncMock(return_value=cached)
+        mock_client.download_xbrl = AsyncMock()
+        mock_settings = MagicMock()
+        mock_settings.XBRL_MIN_INTERVAL = 10.0
+
+        with patch("app.poller.edinet_client", mock_client), \
+             patch("app.poller.settings", mock_settings):
+            t0 = time.monotonic()
+            for _ in range(3):
+                assert await _download_xbrl_paced("S100HIT1") == cached
+
+        assert time.monotonic() - t0 < 1.0
+        mock_client.download_xbrl.assert_not_awaited()
+
+
+class TestStartGate:
+    """Tests for the download start spacing used by XBRL enrichment."""
+
+    @pytest.mark.asyncio
+    async def test_starts_are_spaced_but_work_overlaps(self):
+        from app.poller import _StartGate
+
+        gate = _StartGate()
+        starts: list[float] = []
+
+        async def _job():
+            await gate.wait(0.05)
+            starts.append(time.monotonic())
+            await asyncio.sleep(0.2)  # longer than the gap: jobs overlap
+
+        t0 = time.monotonic()
+        await asyncio.gather(*(_job() for _ in range(3)))
+
+        assert len(starts) == 3
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        assert all(g >= 0.045 for g in gaps)
+        # Overlapping, not serialised: well under 3 x 0.2s
+        assert time.monotonic() - t0 < 0.5
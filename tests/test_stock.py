@@ -1,15 +1,22 @@
 """Tests for stock data endpoint helpers and cache logic."""
 
+import io
 import time
+import zipfile
 
 import pytest
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
+
+import httpx
 
 from app.routers.stock import (
     _cache,
     _cache_get,
     _cache_set,
+    _decode_csv_bytes,
+    _fetch_stooq_history,
     _format_market_cap,
+    _parse_edinet_code_list,
     _parse_float,
     _parse_int,
 )
@@ -110,3 +117,88 @@ class TestStockCache:
             # (none are expired, so all stay, plus the new one)
             _cache_set("new", {"i": "new"})
             assert "new" in _cache
+
+
+class TestStooqHistory:
+    """Tests for _fetch_stooq_history() CSV parsing."""
+
+    @staticmethod
+    def _client(text: str) -> AsyncMock:
+        client = AsyncMock()
+        client.get = AsyncMock(return_value=httpx.Response(
+            200, text=text, request=httpx.Request("GET", "https://stooq.com"),
+        ))
+        return client
+
+    @pytest.mark.asyncio
+    async def test_parses_rows_by_header_position(self):
+        text = (
+            "Date,Open,High,Low,Close,Volume\n"
+            "2026-02-13,1010,1050,990,1040,12000\n"
+            "2026-02-06,1000,1020,980,1005,9000\n"
+        )
+        rows = await _fetch_stooq_history(self._client(text), "7203")
+        assert [r["date"] for r in rows] == ["2026-02-06", "2026-02-13"]
+        assert rows[1] == {
+            "date": "2026-02-13", "open": 1010.0, "high": 1050.0,
+            "low": 990.0, "close": 1040.0, "volume": 12000,
+        }
+
+    @pytest.mark.asyncio
+    async def test_missing_columns_become_none(self):
+        text = "Date,Close\n2026-02-13,1040\n,999\n"
+        rows = await _fetch_stooq_history(self._client(text), "7203")
+        assert rows == [{
+            "date": "2026-02-13", "open": None, "high": None,
+            "low": None, "close": 1040.0, "volume": None,
+        }]
+
+
+class TestDecodeCsvBytes:
+    """Tests for _decode_csv_bytes() encoding detection."""
+
+    TEXT = "ＥＤＩＮＥＴコード,提出者名,証券コード\n"
+
+    def test_cp932(self):
+        assert _decode_csv_bytes(self.TEXT.encode("cp932")) == self.TEXT
+
+    def test_utf8_without_bom(self):
+        assert _decode_csv_bytes(self.TEXT.encode("utf-8")) == self.TEXT
+
+    def test_utf8_bom_is_stripped(self):
+        assert _decode_csv_bytes(self.TEXT.encode("utf-8-sig")) == self.TEXT
+
+    def test_explicit_encoding_skips_detection(self):
+        raw = self.TEXT.encode("cp932")
+        assert _decode_csv_bytes(raw, encoding="cp932") == self.TEXT
+
+
+class TestParseEdinetCodeList:
+    """Tests for _parse_edinet_code_list() (runs in a worker thread)."""
+
+    @staticmethod
+    def _zip(text: str) -> bytes:
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("EdinetcodeDlInfo.csv", text.encode("cp932"))
+        return buf.getvalue()
+
+    def test_maps_tickers_to_name_and_industry(self):
+        text = (
+            "ダウンロード実行日,2026年02月18日現在,件数,2件\n"
+            "ＥＤＩＮＥＴコード,提出者種別,上場区分,連結の有無,資本金,決算日,"
+            "提出者名,提出者名（英字）,提出者名（ヨミ）,所在地,提出者業種,"
+            "証券コード,提出者法人番号\n"
+            "E00001,内国法人,上場,有,100,3月31日,テスト工業株式会社,Test,"
+            "テスト,東京都,機械,77770,1234\n"
+            "E00002,内国法人,非上場,無,10,3月31日,非上場株式会社,X,X,東京都,"
+            "サービス業,,5678\n"
+        )
+        entries = _parse_edinet_code_list(self._zip(text))
+        assert entries == {"7777": {"name": "テスト工業株式会社", "industry": "機械"}}
+
+    def test_zip_without_csv_returns_empty(self):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("readme.txt", "none")
+        assert _parse_edinet_code_list(buf.getvalue()) == {}